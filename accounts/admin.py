@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Account
+from .models import Account, AccountBalanceSnapshot
 from transactions.models import Transaction
 
 
@@ -20,3 +20,11 @@ class AccountAdmin(admin.ModelAdmin):
     search_fields = ('name', 'user__email')
     ordering = ('name',)
     inlines = [TransactionInline]
+
+
+@admin.register(AccountBalanceSnapshot)
+class AccountBalanceSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('date', 'user', 'account', 'balance')
+    list_filter = ('date',)
+    search_fields = ('user__email', 'account__name')
+    ordering = ('-date',)
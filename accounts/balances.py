@@ -0,0 +1,199 @@
+from decimal import Decimal
+
+from django.db import IntegrityError
+from django.db import transaction as db_transaction
+from django.db.models import F, OuterRef, Q, Subquery, Sum, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+from transactions.models import Transaction, TransactionType
+
+from .models import Account, AccountBalanceSnapshot
+
+ZERO = Decimal('0.00')
+
+
+def signed_amount(amount, transaction_type):
+    if amount is None:
+        return ZERO
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    if transaction_type == TransactionType.INCOME:
+        return amount
+    if transaction_type == TransactionType.EXPENSE:
+        return -amount
+    return ZERO
+
+
+def apply_balance_delta(account_id, delta):
+    if not account_id or not delta:
+        return
+    Account.objects.filter(pk=account_id).update(current_balance=F('current_balance') + delta)
+
+
+def apply_snapshot_delta(account_id, user_id, day, delta, create=True):
+    """Add ``delta`` to the balance snapshots of ``account_id`` from ``day`` onwards.
+
+    With ``create`` the day's own row is inserted when missing, seeded from the
+    closest earlier snapshot (or the initial balance), so backdated changes
+    carry forward to every later day.
+    """
+    if not account_id or not delta:
+        return
+    snapshots = AccountBalanceSnapshot.objects.filter(account_id=account_id)
+    if not create:
+        snapshots.filter(date__gte=day).update(balance=F('balance') + delta)
+        return
+    snapshots.filter(date__gt=day).update(balance=F('balance') + delta)
+    if snapshots.filter(date=day).update(balance=F('balance') + delta):
+        return
+    opening = (
+        Account.objects.filter(pk=account_id)
+        .annotate(
+            carried=Subquery(snapshots.filter(date__lt=day).order_by('-date').values('balance')[:1]),
+        )
+        .values_list('initial_balance', 'carried')
+        .first()
+    )
+    if opening is None:
+        return
+    initial_balance, carried = opening
+    balance = (initial_balance if carried is None else carried) + delta
+    try:
+        with db_transaction.atomic():
+            AccountBalanceSnapshot.objects.create(
+                account_id=account_id, user_id=user_id, date=day, month=day.replace(day=1), balance=balance
+            )
+    except IntegrityError:
+        snapshots.filter(date=day).update(balance=F('balance') + delta)
+
+
+def apply_transaction_change(previous, current):
+    """Apply the balance effect of a transaction going from ``previous`` to ``current``.
+
+    Both arguments are ``TransactionState`` tuples, or ``None`` when the transaction
+    did not exist before (creation) or no longer exists (deletion).
+    """
+    deltas = {}
+    snapshot_deltas = {}
+    for state, sign in ((previous, -1), (current, 1)):
+        if not state:
+            continue
+        delta = sign * signed_amount(state.amount, state.type)
+        if not delta:
+            continue
+        deltas[state.account_id] = deltas.get(state.account_id, ZERO) + delta
+        # Only a day the transaction did not count on before may lack its row.
+        # Removals never create rows: the account may be going away in cascade.
+        key = (state.account_id, state.user_id, state.transaction_date)
+        snapshot_deltas.setdefault(key, [ZERO, sign > 0])[0] += delta
+    for account_id, delta in deltas.items():
+        apply_balance_delta(account_id, delta)
+    for (account_id, user_id, day), (delta, create) in snapshot_deltas.items():
+        apply_snapshot_delta(account_id, user_id, day, delta, create=create)
+
+
+def rebuild_balance_snapshots(accounts=None, since=None, batch_size=1000):
+    """Recompute the daily balance snapshots from raw transactions.
+
+    Covers every account or only ``accounts`` (a queryset); with ``since`` only
+    the snapshots from that day on are rewritten, carrying the balance of the
+    last earlier snapshot forward. Returns the number of rows written.
+    """
+    if accounts is None:
+        accounts = Account.objects.all()
+    snapshots = AccountBalanceSnapshot.objects.filter(account__in=accounts)
+    transactions = Transaction.objects.filter(account__in=accounts)
+    openings = accounts.order_by()
+    if since is not None:
+        snapshots = snapshots.filter(date__gte=since)
+        transactions = transactions.filter(transaction_date__gte=since)
+        openings = openings.annotate(
+            carried=Subquery(
+                AccountBalanceSnapshot.objects.filter(account=OuterRef('pk'), date__lt=since)
+                .order_by('-date')
+                .values('balance')[:1]
+            )
+        )
+    else:
+        openings = openings.annotate(carried=F('initial_balance'))
+    balances = {
+        account_id: (user_id, initial_balance if carried is None else carried)
+        for account_id, user_id, initial_balance, carried in openings.values_list(
+            'pk', 'user_id', 'initial_balance', 'carried'
+        )
+    }
+    daily_totals = (
+        transactions.values('account_id', 'transaction_date')
+        .annotate(
+            total_income=Coalesce(Sum('amount', filter=Q(type=TransactionType.INCOME)), ZERO),
+            total_expense=Coalesce(Sum('amount', filter=Q(type=TransactionType.EXPENSE)), ZERO),
+        )
+        .order_by('account_id', 'transaction_date')
+    )
+
+    def running_balances():
+        for row in daily_totals.iterator():
+            user_id, balance = balances[row['account_id']]
+            balance += row['total_income'] - row['total_expense']
+            balances[row['account_id']] = (user_id, balance)
+            day = row['transaction_date']
+            yield AccountBalanceSnapshot(
+                account_id=row['account_id'], user_id=user_id, date=day, month=day.replace(day=1), balance=balance
+            )
+
+    with db_transaction.atomic():
+        snapshots.delete()
+        created = AccountBalanceSnapshot.objects.bulk_create(running_balances(), batch_size=batch_size)
+    return len(created)
+
+
+def month_end_balances(user, until):
+    """``[(account_id, month, balance)]``: each account's last snapshot per month up to ``until``.
+
+    Reads at most one row per account and month, however many transactions
+    (and days with snapshots) the history holds.
+    """
+    return list(
+        AccountBalanceSnapshot.objects.filter(user=user, date__lte=until)
+        .annotate(
+            position=Window(RowNumber(), partition_by=[F('account_id'), F('month')], order_by=F('date').desc()),
+        )
+        .filter(position=1)
+        .order_by('month', 'account_id')
+        .values_list('account_id', 'month', 'balance')
+    )
+
+
+def annotate_expected_balance(queryset):
+    return queryset.annotate(
+        total_income=Coalesce(
+            Sum('transactions__amount', filter=Q(transactions__type=TransactionType.INCOME)),
+            ZERO,
+        ),
+        total_expense=Coalesce(
+            Sum('transactions__amount', filter=Q(transactions__type=TransactionType.EXPENSE)),
+            ZERO,
+        ),
+    )
+
+
+def recalculate_account_balance(account_id):
+    """Rebuild ``current_balance`` from scratch. Used as a repair tool only."""
+    account = annotate_expected_balance(Account.objects.filter(pk=account_id)).first()
+    if not account:
+        return None
+    balance = account.initial_balance + account.total_income - account.total_expense
+    Account.objects.filter(pk=account_id).update(current_balance=balance)
+    return balance
+
+
+def find_drifted_accounts(queryset=None):
+    """Return ``(account, expected_balance)`` pairs whose stored balance has drifted."""
+    if queryset is None:
+        queryset = Account.objects.all()
+    drifted = []
+    for account in annotate_expected_balance(queryset.order_by('pk')):
+        expected = (account.initial_balance + account.total_income - account.total_expense).quantize(ZERO)
+        if account.current_balance.quantize(ZERO) != expected:
+            drifted.append((account, expected))
+    return drifted
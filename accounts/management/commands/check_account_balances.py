@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from accounts.balances import find_drifted_accounts, recalculate_account_balance
+from accounts.models import Account
+
+
+class Command(BaseCommand):
+    help = 'Find accounts whose stored balance drifted from their transactions and optionally repair them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only check accounts belonging to this e-mail.')
+        parser.add_argument('--fix', action='store_true', help='Recompute the balance of every drifted account.')
+
+    def handle(self, *args, **options):
+        queryset = Account.objects.all()
+        if options['user']:
+            queryset = queryset.filter(user__email=options['user'])
+
+        drifted = find_drifted_accounts(queryset)
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All account balances are consistent.'))
+            return
+
+        for account, expected in drifted:
+            self.stdout.write(
+                f'Account {account.pk} ({account.name}): stored {account.current_balance}, expected {expected}'
+            )
+            if options['fix']:
+                recalculate_account_balance(account.pk)
+
+        if options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'Repaired {len(drifted)} account(s).'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} account(s) drifted. Run with --fix to repair.'))
@@ -0,0 +1,31 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.balances import rebuild_balance_snapshots
+from accounts.models import Account
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily account balance snapshots from raw transactions (backfills and repairs).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild snapshots of accounts belonging to this e-mail.')
+        parser.add_argument('--since', help='Only rewrite snapshots from this date on (YYYY-MM-DD).')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert.')
+
+    def handle(self, *args, **options):
+        accounts = Account.objects.all()
+        if options['user']:
+            accounts = accounts.filter(user__email=options['user'])
+            if not accounts.exists():
+                raise CommandError(f'No accounts found for "{options["user"]}".')
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError(f'Invalid date "{options["since"]}", expected YYYY-MM-DD.')
+
+        created = rebuild_balance_snapshots(accounts, since=since, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {created} balance snapshot row(s).'))
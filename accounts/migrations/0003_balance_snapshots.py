@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def backfill_balance_snapshots(apps, schema_editor):
+    Account = apps.get_model('accounts', 'Account')
+    AccountBalanceSnapshot = apps.get_model('accounts', 'AccountBalanceSnapshot')
+    Transaction = apps.get_model('transactions', 'Transaction')
+    balances = {
+        pk: (user_id, initial_balance)
+        for pk, user_id, initial_balance in Account.objects.values_list('pk', 'user_id', 'initial_balance')
+    }
+    rows = (
+        Transaction.objects.values('account_id', 'transaction_date')
+        .annotate(
+            total_income=Coalesce(Sum('amount', filter=Q(type='income')), Decimal('0.00')),
+            total_expense=Coalesce(Sum('amount', filter=Q(type='expense')), Decimal('0.00')),
+        )
+        .order_by('account_id', 'transaction_date')
+    )
+
+    def running_balances():
+        for row in rows.iterator():
+            user_id, balance = balances[row['account_id']]
+            balance += row['total_income'] - row['total_expense']
+            balances[row['account_id']] = (user_id, balance)
+            day = row['transaction_date']
+            yield AccountBalanceSnapshot(
+                account_id=row['account_id'], user_id=user_id, date=day, month=day.replace(day=1), balance=balance
+            )
+
+    AccountBalanceSnapshot.objects.bulk_create(running_balances(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('accounts', '0002_account_current_balance'),
+        ('transactions', '0003_monthlysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountBalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('month', models.DateField()),
+                ('balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='accounts.account')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Balance snapshot',
+                'verbose_name_plural': 'Balance snapshots',
+                'ordering': ['account', 'date'],
+                'indexes': [models.Index(fields=['user', 'date'], name='balance_snapshot_user_date_idx')],
+                'constraints': [
+                    models.UniqueConstraint(fields=('account', 'date'), name='balance_snapshot_account_date_key'),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_balance_snapshots, migrations.RunPython.noop),
+    ]
@@ -31,7 +31,96 @@ class Account(models.Model):
     def __str__(self):
         return f'{self.name} ({self.get_type_display()})'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._take_snapshot()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # The next save's delta must start from the balances just read.
+        loaded = getattr(self, '_loaded_balances', None)
+        if fields is None or loaded is None:
+            self._take_snapshot()
+        else:
+            loaded_initial, loaded_current = loaded
+            self._loaded_balances = (
+                self.initial_balance if 'initial_balance' in fields else loaded_initial,
+                self.current_balance if 'current_balance' in fields else loaded_current,
+            )
+
+    def _take_snapshot(self):
+        loaded = self.__dict__
+        if 'initial_balance' in loaded and 'current_balance' in loaded:
+            self._loaded_balances = (self.initial_balance, self.current_balance)
+        else:
+            self._loaded_balances = None
+
     def save(self, *args, **kwargs):
-        if self._state.adding and self.current_balance == Decimal('0.00'):
-            self.current_balance = self.initial_balance
+        if self._state.adding:
+            if self.current_balance == Decimal('0.00'):
+                self.current_balance = self.initial_balance
+            super().save(*args, **kwargs)
+            self._take_snapshot()
+            return
+
+        # Transactions move current_balance with F() deltas, so the loaded value
+        # may be stale: leave it untouched unless it was edited explicitly and
+        # fold initial balance edits in as a delta as well.
+        initial_delta = Decimal('0.00')
+        loaded = getattr(self, '_loaded_balances', None)
+        update_fields = kwargs.get('update_fields')
+        if loaded is not None and (update_fields is None or 'initial_balance' in update_fields):
+            loaded_initial, loaded_current = loaded
+            if self.current_balance == loaded_current:
+                initial_delta = Decimal(str(self.initial_balance)) - loaded_initial
+                if update_fields is None:
+                    update_fields = [field.name for field in self._meta.concrete_fields if not field.primary_key]
+                kwargs['update_fields'] = [name for name in update_fields if name != 'current_balance']
+                if initial_delta:
+                    kwargs['update_fields'].append('current_balance')
+                    self.current_balance = models.F('current_balance') + initial_delta
         super().save(*args, **kwargs)
+        if initial_delta:
+            self.balance_snapshots.update(balance=models.F('balance') + initial_delta)
+            self.current_balance = loaded[1] + initial_delta
+        self._take_snapshot()
+
+
+class AccountBalanceSnapshot(models.Model):
+    """End-of-day balance of an account, one row per day that has (or had) transactions.
+
+    A day without a row has the balance of the closest earlier row, or the
+    account's initial balance before the first one. Kept current by
+    ``accounts.signals``; ``rebuild_balance_snapshots`` recomputes it.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='balance_snapshots',
+    )
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.CASCADE,
+        related_name='balance_snapshots',
+    )
+    date = models.DateField()
+    # First day of ``date``'s month, stored so month-end reads need no date function.
+    month = models.DateField()
+    balance = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        ordering = ['account', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'date'], name='balance_snapshot_account_date_key'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'date'], name='balance_snapshot_user_date_idx'),
+        ]
+        verbose_name = 'Balance snapshot'
+        verbose_name_plural = 'Balance snapshots'
+
+    def __str__(self):
+        return f'{self.date:%d/%m/%Y} · {self.balance}'
@@ -1,11 +1,21 @@
+from datetime import date
 from decimal import Decimal
+from io import StringIO
 
 from django.contrib.auth import get_user_model
 from django.contrib.messages import get_messages
+from django.core.management import call_command
 from django.test import TestCase
 from django.urls import reverse
 
-from accounts.models import Account, AccountType
+from accounts.balances import (
+    find_drifted_accounts,
+    month_end_balances,
+    rebuild_balance_snapshots,
+    recalculate_account_balance,
+)
+from accounts.models import Account, AccountBalanceSnapshot, AccountType
+from transactions.models import Transaction, TransactionType
 
 
 class AccountTests(TestCase):
@@ -47,6 +57,22 @@ class AccountTests(TestCase):
         self.assertTrue(all(account.user == self.user for account in accounts))
         self.assertEqual(response.context['total_balance'], self.account.current_balance)
 
+    def test_list_view_answers_not_modified_until_an_account_changes(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('accounts:list'))
+        etag = response['ETag']
+
+        # Session and user only: no list query and no rendering.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('accounts:list'), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.account.name = 'Conta Renomeada'
+        self.account.save()
+        response = self.client.get(reverse('accounts:list'), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Conta Renomeada')
+
     def test_create_view_assigns_user_and_sets_message(self):
         self.client.force_login(self.user)
         response = self.client.post(
@@ -83,3 +109,254 @@ class AccountTests(TestCase):
             },
         )
         self.assertEqual(response.status_code, 404)
+
+
+class AccountBalanceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='balance@example.com', password='testpass123')
+        cls.account = Account.objects.create(
+            user=cls.user,
+            name='Conta Corrente',
+            initial_balance=Decimal('100.00'),
+            type=AccountType.CHECKING,
+        )
+        cls.other_account = Account.objects.create(
+            user=cls.user,
+            name='Poupança',
+            initial_balance=Decimal('0.00'),
+            type=AccountType.SAVINGS,
+        )
+
+    def _create_transaction(self, **overrides):
+        defaults = {
+            'user': self.user,
+            'account': self.account,
+            'amount': Decimal('40.00'),
+            'transaction_date': date(2024, 1, 1),
+            'type': TransactionType.EXPENSE,
+        }
+        defaults.update(overrides)
+        return Transaction.objects.create(**defaults)
+
+    def test_create_applies_signed_delta(self):
+        self._create_transaction(type=TransactionType.INCOME, amount=Decimal('25.00'))
+        self._create_transaction()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('85.00'))
+
+    def test_update_applies_only_the_difference(self):
+        transaction = self._create_transaction()
+        transaction.amount = Decimal('10.00')
+        transaction.type = TransactionType.INCOME
+        transaction.save()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('110.00'))
+
+    def test_moving_transaction_between_accounts(self):
+        transaction = self._create_transaction()
+        transaction.account = self.other_account
+        transaction.save()
+        self.account.refresh_from_db()
+        self.other_account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('100.00'))
+        self.assertEqual(self.other_account.current_balance, Decimal('-40.00'))
+
+    def test_delete_reverts_delta(self):
+        transaction = self._create_transaction()
+        transaction.delete()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('100.00'))
+
+    def test_initial_balance_change_shifts_current_balance(self):
+        self._create_transaction()
+        account = Account.objects.get(pk=self.account.pk)
+        account.initial_balance = Decimal('150.00')
+        account.save()
+        account.refresh_from_db()
+        self.assertEqual(account.current_balance, Decimal('110.00'))
+
+    def test_initial_balance_change_with_update_fields(self):
+        self._create_transaction()
+        account = Account.objects.get(pk=self.account.pk)
+        account.initial_balance = Decimal('200.00')
+        account.save(update_fields=['initial_balance'])
+        account.refresh_from_db()
+        self.assertEqual(account.current_balance, Decimal('160.00'))
+        self.assertEqual(find_drifted_accounts(), [])
+
+    def test_save_after_refresh_uses_the_refreshed_values(self):
+        transaction = self._create_transaction(amount=Decimal('5.00'))
+        other = Transaction.objects.get(pk=transaction.pk)
+        other.amount = Decimal('8.00')
+        other.save()
+        transaction.refresh_from_db()
+        transaction.amount = Decimal('9.00')
+        transaction.save()
+        transaction.refresh_from_db(fields=['amount'])
+        transaction.amount = Decimal('12.00')
+        transaction.save()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('88.00'))
+
+        account = Account.objects.get(pk=self.account.pk)
+        elsewhere = Account.objects.get(pk=self.account.pk)
+        elsewhere.initial_balance = Decimal('150.00')
+        elsewhere.save()
+        account.refresh_from_db()
+        account.initial_balance = Decimal('160.00')
+        account.save()
+        account.refresh_from_db()
+        self.assertEqual(account.current_balance, Decimal('148.00'))
+        self.assertEqual(find_drifted_accounts(), [])
+
+    def test_consistency_checker_reports_and_repairs_drift(self):
+        self._create_transaction()
+        self.assertEqual(find_drifted_accounts(), [])
+        Account.objects.filter(pk=self.account.pk).update(current_balance=Decimal('999.00'))
+
+        drifted = find_drifted_accounts()
+        self.assertEqual([(account.pk, expected) for account, expected in drifted], [(self.account.pk, Decimal('60.00'))])
+
+        self.assertEqual(recalculate_account_balance(self.account.pk), Decimal('60.00'))
+        self.assertEqual(find_drifted_accounts(), [])
+
+    def test_check_command_fixes_drift(self):
+        Account.objects.filter(pk=self.account.pk).update(current_balance=Decimal('1.00'))
+        output = StringIO()
+        call_command('check_account_balances', '--fix', stdout=output)
+        self.assertIn('Repaired 1 account(s).', output.getvalue())
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('100.00'))
+
+
+class AccountBalanceSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='snapshots@example.com', password='testpass123')
+        cls.account = Account.objects.create(
+            user=cls.user,
+            name='Conta Corrente',
+            initial_balance=Decimal('100.00'),
+            type=AccountType.CHECKING,
+        )
+        cls.other_account = Account.objects.create(
+            user=cls.user,
+            name='Poupança',
+            initial_balance=Decimal('0.00'),
+            type=AccountType.SAVINGS,
+        )
+
+    def _create_transaction(self, transaction_date, amount, transaction_type=TransactionType.EXPENSE, **overrides):
+        return Transaction.objects.create(
+            user=self.user,
+            account=overrides.pop('account', self.account),
+            amount=Decimal(amount),
+            transaction_date=transaction_date,
+            type=transaction_type,
+            **overrides,
+        )
+
+    def _snapshots(self, account=None):
+        return list(
+            AccountBalanceSnapshot.objects.filter(account=account or self.account).values_list('date', 'balance')
+        )
+
+    def assertMatchesRebuild(self):
+        # Incremental writes may leave rows for days that lost their transactions;
+        # they must still hold the balance a rebuild gives for that day.
+        stored = list(AccountBalanceSnapshot.objects.values_list('account_id', 'date', 'balance'))
+        rebuild_balance_snapshots()
+        rebuilt = list(AccountBalanceSnapshot.objects.values_list('account_id', 'date', 'balance'))
+        self.assertLessEqual(set(rebuilt), set(stored))
+        for account_id, day, balance in stored:
+            expected = (
+                AccountBalanceSnapshot.objects.filter(account_id=account_id, date__lte=day)
+                .order_by('-date')
+                .values_list('balance', flat=True)
+                .first()
+            )
+            if expected is None:
+                expected = Account.objects.get(pk=account_id).initial_balance
+            self.assertEqual(balance, expected, (account_id, day))
+
+    def test_writes_keep_one_end_of_day_row_per_day(self):
+        self._create_transaction(date(2024, 1, 10), '500.00', TransactionType.INCOME)
+        self._create_transaction(date(2024, 1, 10), '30.00')
+        self._create_transaction(date(2024, 2, 1), '70.00')
+        self.assertEqual(
+            self._snapshots(),
+            [(date(2024, 1, 10), Decimal('570.00')), (date(2024, 2, 1), Decimal('500.00'))],
+        )
+        self.assertMatchesRebuild()
+
+    def test_backdated_changes_carry_forward(self):
+        self._create_transaction(date(2024, 3, 1), '20.00')
+        self._create_transaction(date(2024, 1, 15), '50.00', TransactionType.INCOME)
+        transaction = self._create_transaction(date(2024, 2, 1), '10.00')
+        self.assertEqual(
+            self._snapshots(),
+            [
+                (date(2024, 1, 15), Decimal('150.00')),
+                (date(2024, 2, 1), Decimal('140.00')),
+                (date(2024, 3, 1), Decimal('120.00')),
+            ],
+        )
+
+        transaction.transaction_date = date(2023, 12, 31)
+        transaction.amount = Decimal('25.00')
+        transaction.save()
+        self.assertEqual(
+            self._snapshots(),
+            [
+                (date(2023, 12, 31), Decimal('75.00')),
+                (date(2024, 1, 15), Decimal('125.00')),
+                (date(2024, 2, 1), Decimal('125.00')),
+                (date(2024, 3, 1), Decimal('105.00')),
+            ],
+        )
+        self.assertMatchesRebuild()
+
+    def test_move_delete_and_initial_balance_edit(self):
+        transaction = self._create_transaction(date(2024, 1, 10), '40.00')
+        self._create_transaction(date(2024, 1, 20), '10.00')
+        transaction.account = self.other_account
+        transaction.save()
+        self.assertEqual(self._snapshots(self.other_account), [(date(2024, 1, 10), Decimal('-40.00'))])
+        self.assertEqual(self._snapshots()[-1], (date(2024, 1, 20), Decimal('90.00')))
+
+        transaction.delete()
+        self.assertEqual(self._snapshots(self.other_account), [(date(2024, 1, 10), Decimal('0.00'))])
+
+        account = Account.objects.get(pk=self.account.pk)
+        account.initial_balance = Decimal('150.00')
+        account.save()
+        self.assertEqual(self._snapshots()[-1], (date(2024, 1, 20), Decimal('140.00')))
+        self.assertMatchesRebuild()
+
+    def test_rebuild_since_keeps_earlier_rows(self):
+        self._create_transaction(date(2024, 1, 10), '10.00')
+        self._create_transaction(date(2024, 2, 10), '20.00')
+        AccountBalanceSnapshot.objects.filter(date=date(2024, 2, 10)).update(balance=Decimal('1.00'))
+        output = StringIO()
+        call_command('rebuild_balance_snapshots', '--since', '2024-02-01', stdout=output)
+        self.assertIn('Rebuilt 1 balance snapshot row(s).', output.getvalue())
+        self.assertEqual(
+            self._snapshots(),
+            [(date(2024, 1, 10), Decimal('90.00')), (date(2024, 2, 10), Decimal('70.00'))],
+        )
+
+    def test_month_end_balances_reads_one_row_per_account_and_month(self):
+        for day in range(1, 29):
+            self._create_transaction(date(2024, 1, day), '1.00')
+        self._create_transaction(date(2024, 3, 5), '5.00', account=self.other_account)
+        self._create_transaction(date(2024, 4, 5), '5.00')
+        with self.assertNumQueries(1):
+            rows = month_end_balances(self.user, date(2024, 3, 31))
+        self.assertEqual(
+            rows,
+            [
+                (self.account.pk, date(2024, 1, 1), Decimal('72.00')),
+                (self.other_account.pk, date(2024, 3, 1), Decimal('-5.00')),
+            ],
+        )
@@ -7,11 +7,13 @@ from django.db.models.functions import Coalesce
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 
+from core.conditional import ConditionalGetMixin
+
 from .forms import AccountForm
 from .models import Account
 
 
-class AccountListView(LoginRequiredMixin, ListView):
+class AccountListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Account
     template_name = 'accounts/account_list.html'
     context_object_name = 'accounts'
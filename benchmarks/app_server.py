@@ -0,0 +1,99 @@
+"""Throughput of ``manage.py runserver`` against gunicorn with ``gunicorn.conf.py``.
+
+Both servers run as they would in production (``DJANGO_DEBUG=false``, static
+files collected and served by WhiteNoise) against the same seeded database:
+
+    python -m benchmarks.app_server --rows 100000 --concurrency 16 --requests 400
+
+Use ``--workers`` to override the CPU-derived gunicorn worker count.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from .common import benchmark_database, free_port, run_load, seed_transactions, setup_django, wait_for_port
+
+END_DATE = date(2025, 6, 30)
+
+PATHS = {
+    'dashboard': '/dashboard/',
+    'transactions': '/transactions/',
+    'health_check': '/healthz/',
+}
+
+
+def start_server(kind, port, environment):
+    if kind == 'runserver':
+        command = [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload']
+    else:
+        command = [sys.executable, '-m', 'gunicorn', 'core.wsgi:application', '--bind', f'127.0.0.1:{port}']
+    process = subprocess.Popen(command, env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return wait_for_port(process, port, kind)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=400, help='Requests per page and server.')
+    parser.add_argument('--workers', type=int, help='Gunicorn workers (default: gunicorn.conf.py).')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import Client
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_file = Path(directory) / 'app_server.sqlite3' if settings.DB_ENGINE == 'sqlite3' else None
+        with benchmark_database(database_file=database_file) as connection:
+            user = seed_transactions(args.rows, seed=args.seed, end_date=END_DATE)
+            client = Client()
+            client.force_login(user)
+            cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+            database_variable = 'DJANGO_DB_NAME' if connection.vendor == 'sqlite' else 'POSTGRES_DB'
+            environment = dict(
+                os.environ,
+                DJANGO_DEBUG='false',
+                DJANGO_ALLOWED_HOSTS='127.0.0.1',
+                DJANGO_STATIC_ROOT=str(Path(directory) / 'static'),
+                DJANGO_REQUEST_LOG_LEVEL='WARNING',
+                GUNICORN_ACCESS_LOG='',
+            )
+            environment[database_variable] = str(connection.settings_dict['NAME'])
+            if args.workers:
+                environment['GUNICORN_WORKERS'] = str(args.workers)
+            connection.close()
+            subprocess.run(
+                [sys.executable, 'manage.py', 'collectstatic', '--noinput', '--verbosity', '0'],
+                env=environment,
+                check=True,
+            )
+            # The hashed name, as templates render it outside DEBUG.
+            manifest = json.loads((Path(environment['DJANGO_STATIC_ROOT']) / 'staticfiles.json').read_text())
+            chart_js = manifest['paths']['vendor/chart.js/chart.umd.min.js']
+            paths = dict(PATHS, static_chart_js=f'{settings.STATIC_URL}{chart_js}')
+
+            print(f'{args.rows} rows, {args.concurrency} concurrent clients, {args.requests} requests per page')
+            for kind in ('runserver', 'gunicorn'):
+                port = free_port()
+                process = start_server(kind, port, environment)
+                try:
+                    for page, path in paths.items():
+                        stats = run_load(f'http://127.0.0.1:{port}{path}', cookie, args.concurrency, args.requests)
+                        print(
+                            f'{kind:<10} {page:<16} p50={stats["p50_ms"]:8.1f}ms p95={stats["p95_ms"]:8.1f}ms '
+                            f'{stats["requests_per_second"]:7.1f} req/s'
+                        )
+                finally:
+                    process.terminate()
+                    process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Latency of the sync (WSGI) and async (ASGI) dashboard and reports under concurrent load.
+
+Both servers run in child processes against the same seeded database, with the
+derived-data cache disabled so every request aggregates from the database:
+
+    python -m benchmarks.async_views --rows 100000 --concurrency 16 --requests 400
+
+The WSGI side is a thread-per-request ``wsgiref`` server; the ASGI side is a
+single uvicorn worker (``pip install uvicorn``).
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from .common import benchmark_database, free_port, run_load, seed_transactions, setup_django, wait_for_port
+
+END_DATE = date(2025, 6, 30)
+
+SERVERS = {
+    'wsgi': {'dashboard': '/dashboard/', 'reports': '/reports/'},
+    'asgi': {'dashboard': '/async/dashboard/', 'reports': '/async/reports/'},
+}
+
+
+def serve_wsgi(port):
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    setup_django()
+    from django.core.wsgi import get_wsgi_application
+
+    server = make_server(
+        '127.0.0.1', port, get_wsgi_application(), server_class=ThreadingWSGIServer, handler_class=QuietHandler
+    )
+    server.request_queue_size = 128
+    server.serve_forever()
+
+
+def start_server(kind, port, environment):
+    if kind == 'wsgi':
+        command = [sys.executable, '-m', 'benchmarks.async_views', '--serve-wsgi', str(port)]
+    else:
+        command = [
+            sys.executable, '-m', 'uvicorn', 'core.asgi:application',
+            '--port', str(port), '--log-level', 'warning', '--no-access-log',
+        ]
+    return wait_for_port(subprocess.Popen(command, env=environment), port, kind)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=400, help='Requests per view and server.')
+    parser.add_argument('--serve-wsgi', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_wsgi:
+        serve_wsgi(args.serve_wsgi)
+        return
+
+    setup_django()
+    from django.conf import settings
+    from django.test import Client
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_file = Path(directory) / 'async_views.sqlite3' if settings.DB_ENGINE == 'sqlite3' else None
+        with benchmark_database(database_file=database_file) as connection:
+            user = seed_transactions(args.rows, seed=args.seed, end_date=END_DATE)
+            client = Client()
+            client.force_login(user)
+            cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+            database_variable = 'DJANGO_DB_NAME' if connection.vendor == 'sqlite' else 'POSTGRES_DB'
+            environment = dict(os.environ, DJANGO_DERIVED_DATA_CACHE_TIMEOUT='0')
+            environment[database_variable] = str(connection.settings_dict['NAME'])
+            connection.close()
+            query = f'?data_inicio={(END_DATE - timedelta(days=365)).isoformat()}&data_fim={END_DATE.isoformat()}'
+
+            print(f'{args.rows} rows, {args.concurrency} concurrent clients, {args.requests} requests per view')
+            for kind, paths in SERVERS.items():
+                port = free_port()
+                process = start_server(kind, port, environment)
+                try:
+                    for view, path in paths.items():
+                        url = f'http://127.0.0.1:{port}{path}' + (query if view == 'reports' else '')
+                        stats = run_load(url, cookie, args.concurrency, args.requests)
+                        print(
+                            f'{kind:<5} {view:<10} p50={stats["p50_ms"]:8.1f}ms p95={stats["p95_ms"]:8.1f}ms '
+                            f'{stats["requests_per_second"]:7.1f} req/s'
+                        )
+                finally:
+                    process.terminate()
+                    process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Cold start of a fresh process, with and without the template warm-up.
+
+Every sample is a new Python process that imports ``core.wsgi`` (which runs
+``core.warmup`` unless ``DJANGO_TEMPLATE_WARMUP=false``) and then serves one
+page twice. Boot time plus the first request is what a user hitting a freshly
+started worker waits for:
+
+    python -m benchmarks.cold_start --rows 10000 --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from .common import benchmark_database, seed_transactions, setup_django
+
+END_DATE = date(2025, 6, 30)
+
+PAGES = ('dashboard', 'reports', 'transactions:list', 'accounts:list', 'categories:list')
+
+
+def probe(page, cookie):
+    """Child process: boot the WSGI application and time two requests to ``page``."""
+    started = time.perf_counter()
+    from core.wsgi import application  # noqa: F401
+
+    boot_ms = (time.perf_counter() - started) * 1000
+    from django.conf import settings
+    from django.test import Client
+    from django.urls import reverse
+
+    # A plain process has no test environment, so 'testserver' is not an allowed host.
+    client = Client(HTTP_HOST='localhost')
+    client.cookies[settings.SESSION_COOKIE_NAME] = cookie
+    url = reverse(page)
+    timings = []
+    for _ in range(2):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, (url, response.status_code)
+    print(json.dumps({'boot_ms': boot_ms, 'first_ms': timings[0], 'second_ms': timings[1]}))
+
+
+def run_probe(page, cookie, environment):
+    command = [sys.executable, '-m', 'benchmarks.cold_start', '--probe', page, '--cookie', cookie]
+    output = subprocess.run(command, env=environment, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--runs', type=int, default=10, help='Fresh processes per page and case.')
+    parser.add_argument('--probe', help=argparse.SUPPRESS)
+    parser.add_argument('--cookie', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+        probe(args.probe, args.cookie)
+        return
+
+    setup_django()
+    from django.conf import settings
+    from django.test import Client
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_file = Path(directory) / 'cold_start.sqlite3' if settings.DB_ENGINE == 'sqlite3' else None
+        with benchmark_database(database_file=database_file) as connection:
+            user = seed_transactions(args.rows, seed=args.seed, end_date=END_DATE)
+            client = Client()
+            client.force_login(user)
+            cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+            database_variable = 'DJANGO_DB_NAME' if connection.vendor == 'sqlite' else 'POSTGRES_DB'
+            environment = dict(os.environ, DJANGO_SETTINGS_MODULE='core.settings')
+            environment[database_variable] = str(connection.settings_dict['NAME'])
+            connection.close()
+
+            print(f'{args.rows} rows, {args.runs} fresh processes per page and case (medians)')
+            for page in PAGES:
+                for case, warmup in (('no warm-up', 'false'), ('warm-up', 'true')):
+                    environment['DJANGO_TEMPLATE_WARMUP'] = warmup
+                    samples = [run_probe(page, cookie, environment) for _ in range(args.runs)]
+                    boot, first, second = (
+                        statistics.median(sample[key] for sample in samples)
+                        for key in ('boot_ms', 'first_ms', 'second_ms')
+                    )
+                    print(
+                        f'{page:<18} {case:<11} boot={boot:7.1f}ms first={first:7.1f}ms '
+                        f'boot+first={boot + first:7.1f}ms second={second:6.1f}ms'
+                    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Shared helpers for the scripts in ``benchmarks/``.
+
+Benchmarks run against a throwaway test database so they never touch the
+development ``db.sqlite3``. Run them from the repository root, for example::
+
+    python -m benchmarks.reports --rows 1000000
+"""
+import os
+import socket
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    django.setup()
+
+
+@contextmanager
+def benchmark_database(database_file=None, keepdb=False):
+    """Create a throwaway database, in memory unless ``database_file`` is given."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    if database_file:
+        connection.settings_dict['TEST']['NAME'] = str(database_file)
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def seed_transactions(rows, seed=42, years=5, end_date=None, batch_size=5000):
+    """Create one synthetic user with ``rows`` transactions and return it."""
+    from core.synthetic import generate_synthetic_data
+
+    dataset = generate_synthetic_data(
+        users=1,
+        transactions=rows,
+        seed=seed,
+        years=years,
+        end_date=end_date,
+        email_prefix='bench',
+        batch_size=batch_size,
+    )
+    return dataset.users[0]
+
+
+def measure(callable_, repeat=5, setup=None):
+    """Run ``callable_`` ``repeat`` times and return latency statistics in milliseconds.
+
+    ``setup`` runs before every sample and is not timed.
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        callable_()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'min_ms': samples[0],
+        'p50_ms': statistics.median(samples),
+        'p95_ms': samples[min(len(samples) - 1, round(0.95 * (len(samples) - 1)))],
+        'mean_ms': statistics.fmean(samples),
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(process, port, name, timeout=30):
+    """Wait until ``process`` listens on ``port``; exit if it dies or never does."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return process
+        except OSError:
+            if process.poll() is not None:
+                raise SystemExit(f'{name} server exited with code {process.returncode}')
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit(f'{name} server did not start on port {port}')
+
+
+def fetch(url, cookie=None):
+    request = urllib.request.Request(url, headers={'Cookie': cookie} if cookie else {})
+    started = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+        assert response.status == 200, (url, response.status)
+    return (time.perf_counter() - started) * 1000
+
+
+def run_load(url, cookie, concurrency, requests):
+    """Fetch ``url`` ``requests`` times from ``concurrency`` threads; return latency and throughput."""
+    fetch(url, cookie)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = sorted(pool.map(lambda _: fetch(url, cookie), range(requests)))
+    wall = time.perf_counter() - started
+    return {
+        'p50_ms': samples[len(samples) // 2],
+        'p95_ms': samples[min(len(samples) - 1, round(0.95 * (len(samples) - 1)))],
+        'requests_per_second': requests / wall,
+    }
@@ -0,0 +1,77 @@
+"""Dashboard and reports render time with the template fragments cold and warm.
+
+The summary payload and the report stay cached in both cases, so the difference
+is only the fragment querysets and template loops:
+
+    python -m benchmarks.fragments --rows 100000
+"""
+import argparse
+from datetime import date, timedelta
+
+from .common import benchmark_database, measure, seed_transactions, setup_django
+
+END_DATE = date(2025, 6, 30)
+
+DASHBOARD_FRAGMENTS = ('dashboard-recent-transactions', 'dashboard-categories', 'dashboard-accounts')
+REPORT_FRAGMENTS = ('reports-categories', 'reports-accounts')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import cache
+    from django.core.cache.utils import make_template_fragment_key
+    from django.db import connection, reset_queries
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    from core.cache import get_data_version
+
+    with benchmark_database():
+        user = seed_transactions(args.rows, seed=args.seed, end_date=END_DATE)
+        client = Client()
+        client.force_login(user)
+        report_range = {
+            'data_inicio': (END_DATE - timedelta(days=365)).isoformat(),
+            'data_fim': END_DATE.isoformat(),
+        }
+        pages = [
+            ('dashboard', reverse('dashboard'), None, DASHBOARD_FRAGMENTS, ()),
+            ('reports_12_months', reverse('reports'), report_range, REPORT_FRAGMENTS, tuple(report_range.values())),
+        ]
+        print(f'{args.rows} rows, {args.repeat} requests per case')
+        for name, url, params, fragments, extra_vary_on in pages:
+
+            def drop_fragments():
+                version = get_data_version(user.pk)
+                cache.delete_many(
+                    [make_template_fragment_key(fragment, [user.pk, version, *extra_vary_on]) for fragment in fragments]
+                )
+
+            def run():
+                response = client.get(url, params)
+                assert response.status_code == 200, (url, response.status_code)
+
+            run()
+            for case, setup in (('cold', drop_fragments), ('warm', None)):
+                if setup is not None:
+                    setup()
+                reset_queries()
+                with CaptureQueriesContext(connection) as captured:
+                    run()
+                queries = len(captured.captured_queries)
+                stats = measure(run, repeat=args.repeat, setup=setup)
+                print(
+                    f'{name:<18} fragments {case}  queries={queries:<3} '
+                    f'p50={stats["p50_ms"]:7.2f}ms p95={stats["p95_ms"]:7.2f}ms'
+                )
+
+
+if __name__ == '__main__':
+    main()
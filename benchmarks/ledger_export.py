@@ -0,0 +1,115 @@
+"""Measure peak memory of the streaming ledger export against an in-memory CSV.
+
+The dataset is seeded into a temporary SQLite file; each export then runs in a
+fresh child process so its peak RSS is not polluted by the seeding step.
+
+    python -m benchmarks.ledger_export --rows 1000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .common import benchmark_database, seed_transactions, setup_django
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_child(mode, user_id):
+    setup_django()
+    import csv
+    import io
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+
+    from transactions.models import Transaction
+
+    setup_test_environment()
+    user = get_user_model().objects.get(pk=user_id)
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    written = 0
+    if mode == 'streaming':
+        client = Client()
+        client.force_login(user)
+        response = client.get(reverse('reports_ledger_export'), {'data_inicio': '1900-01-01', 'data_fim': '2999-12-31'})
+        for chunk in response.streaming_content:
+            written += len(chunk)
+    else:
+        # What a plain HttpResponse export would do: materialize every row first.
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=';')
+        for transaction in Transaction.objects.filter(user=user).select_related('account', 'category'):
+            writer.writerow(
+                [
+                    transaction.transaction_date.strftime('%d/%m/%Y'),
+                    transaction.description,
+                    transaction.get_type_display(),
+                    f'{transaction.amount:.2f}',
+                    transaction.account.name,
+                    transaction.category.name if transaction.category else 'Sem categoria',
+                ]
+            )
+        written = len(buffer.getvalue().encode('utf-8'))
+    print(
+        json.dumps(
+            {
+                'mode': mode,
+                'bytes': written,
+                'seconds': time.perf_counter() - started,
+                'baseline_rss_mb': baseline,
+                'peak_rss_mb': peak_rss_mb(),
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--child', choices=['streaming', 'in-memory'], help=argparse.SUPPRESS)
+    parser.add_argument('--user-id', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.user_id)
+        return
+
+    setup_django()
+    with tempfile.TemporaryDirectory() as directory:
+        database_file = Path(directory) / 'ledger-benchmark.sqlite3'
+        with benchmark_database(database_file=database_file):
+            user = seed_transactions(args.rows, seed=args.seed)
+            print(f'{args.rows} transactions seeded')
+            environment = dict(os.environ, DJANGO_DB_NAME=str(database_file))
+            for mode in ('streaming', 'in-memory'):
+                output = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.ledger_export', '--child', mode, '--user-id', str(user.pk)],
+                    env=environment,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                result = json.loads(output.stdout.strip().splitlines()[-1])
+                print(
+                    f'{mode:<10} {result["bytes"] / 1e6:8.1f} MB of CSV in {result["seconds"]:.1f}s, '
+                    f'peak RSS {result["peak_rss_mb"]:.0f} MB '
+                    f'(+{result["peak_rss_mb"] - result["baseline_rss_mb"]:.0f} MB over baseline)'
+                )
+
+
+if __name__ == '__main__':
+    main()
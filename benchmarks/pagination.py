@@ -0,0 +1,58 @@
+"""Compare offset pagination with keyset pagination on deep pages of the ledger.
+
+    python -m benchmarks.pagination --rows 1000000 --pages 1 100 1000 10000
+"""
+import argparse
+
+from .common import benchmark_database, measure, seed_transactions, setup_django
+
+PAGE_SIZE = 15
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.paginator import Paginator
+
+    from transactions.models import Transaction
+    from transactions.pagination import NEXT, encode_cursor, paginate_by_keyset
+
+    with benchmark_database():
+        user = seed_transactions(args.rows, seed=args.seed)
+        queryset = (
+            Transaction.objects.filter(user=user)
+            .select_related('account', 'category')
+            .order_by('-transaction_date', '-created_at', '-pk')
+        )
+        print(f'{args.rows} transactions, {PAGE_SIZE} per page')
+        for number in args.pages:
+            offset = (number - 1) * PAGE_SIZE
+            if offset >= args.rows:
+                continue
+            # The row just before the page start; following a "next" link hands
+            # the view exactly this cursor.
+            cursor = encode_cursor(queryset[offset - 1], NEXT) if offset else None
+
+            def offset_page():
+                page = Paginator(queryset, PAGE_SIZE).page(number)
+                list(page.object_list)
+
+            def keyset_page():
+                list(paginate_by_keyset(queryset, PAGE_SIZE, cursor))
+
+            offset_stats = measure(offset_page, repeat=args.repeat)
+            keyset_stats = measure(keyset_page, repeat=args.repeat)
+            print(
+                f'page {number:>6}: offset p50={offset_stats["p50_ms"]:7.1f}ms p95={offset_stats["p95_ms"]:7.1f}ms | '
+                f'keyset p50={keyset_stats["p50_ms"]:5.1f}ms p95={keyset_stats["p95_ms"]:5.1f}ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
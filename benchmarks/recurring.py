@@ -0,0 +1,105 @@
+"""Posting due recurring transactions for many users at once.
+
+    python -m benchmarks.recurring --users 2000 --schedules 5
+
+Seeds ``--users`` users with one account and ``--schedules`` monthly
+schedules each, all due since ``--months`` months ago, then runs
+``materialize_due_transactions`` and prints rows and schedules per second.
+A second run shows that nothing is posted twice. ``--baseline`` schedules of
+extra users are first posted one ``Transaction.save()`` at a time, the path
+that runs every signal per row, for comparison.
+"""
+import argparse
+from datetime import date
+from decimal import Decimal
+
+from .common import benchmark_database, setup_django
+
+TODAY = date(2025, 6, 30)
+
+
+def seed_schedules(users, schedules, months, prefix):
+    from django.contrib.auth import get_user_model
+
+    from accounts.models import Account, AccountType
+    from transactions.dates import add_months
+    from transactions.models import RecurringTransaction, TransactionType
+
+    start_date = add_months(TODAY, -(months - 1))
+    User = get_user_model()
+    created = User.objects.bulk_create([User(email=f'{prefix}{index}@example.com') for index in range(users)])
+    accounts = Account.objects.bulk_create(
+        [Account(user=user, name='Conta Corrente', type=AccountType.CHECKING) for user in created]
+    )
+    RecurringTransaction.objects.bulk_create(
+        [
+            # bulk_create skips save(), so the first due date is set here.
+            RecurringTransaction(
+                user_id=account.user_id,
+                account=account,
+                amount=Decimal('10.00') + index,
+                description=f'Assinatura {index}',
+                type=TransactionType.EXPENSE,
+                start_date=start_date,
+                next_occurrence=start_date,
+            )
+            for account in accounts
+            for index in range(schedules)
+        ],
+        batch_size=5000,
+    )
+    return created
+
+
+def post_one_by_one(users):
+    """Post the due occurrences with ``save()``, one transaction per row."""
+    from django.db import transaction as db_transaction
+
+    from transactions.recurring import due_schedules
+
+    created = 0
+    for schedule in due_schedules(TODAY, users):
+        with db_transaction.atomic():
+            while schedule.next_occurrence and schedule.next_occurrence <= TODAY:
+                schedule.build_transaction(schedule.next_occurrence).save()
+                schedule.occurrence_count += 1
+                schedule.last_occurrence = schedule.next_occurrence
+                schedule.save()
+                created += 1
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--schedules', type=int, default=5, help='schedules per user')
+    parser.add_argument('--months', type=int, default=3, help='due occurrences per schedule')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--baseline', type=int, default=200, help='schedules posted one by one, 0 to skip')
+    args = parser.parse_args()
+
+    setup_django()
+    import time
+
+    from transactions.recurring import materialize_due_transactions
+
+    with benchmark_database():
+        if args.baseline:
+            users = seed_schedules(max(1, args.baseline // args.schedules), args.schedules, args.months, 'baseline')
+            started = time.perf_counter()
+            created = post_one_by_one(users)
+            elapsed = time.perf_counter() - started
+            print(f'one by one   {created:>8} rows in {elapsed:7.2f}s ({created / elapsed:9.0f} rows/s)')
+
+        users = seed_schedules(args.users, args.schedules, args.months, 'bench')
+        for label in ('batched', 'rerun'):
+            result = materialize_due_transactions(today=TODAY, users=users, batch_size=args.batch_size)
+            print(
+                f'{label:<12} {result.created:>8} rows in {result.elapsed:7.2f}s ({result.rows_per_second:9.0f} rows/s, '
+                f'{result.schedules_per_second:8.0f} schedules/s, {result.batches} batches, '
+                f'{len(result.user_ids)} users)'
+            )
+
+
+if __name__ == '__main__':
+    main()
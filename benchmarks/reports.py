@@ -0,0 +1,62 @@
+"""Compare the single-pass report engine with the previous four-query report path.
+
+    python -m benchmarks.reports --rows 1000000 --repeat 5
+"""
+import argparse
+from datetime import date, timedelta
+from decimal import Decimal
+
+from .common import benchmark_database, measure, seed_transactions, setup_django
+
+
+def legacy_report(user, start_date, end_date):
+    """The report as computed before the engine: four queries over raw rows."""
+    from django.db.models import Q, Sum
+    from django.db.models.functions import Coalesce
+
+    from transactions.models import Transaction, TransactionType
+
+    totals = {
+        'total_income': Coalesce(Sum('amount', filter=Q(type=TransactionType.INCOME)), Decimal('0.00')),
+        'total_expense': Coalesce(Sum('amount', filter=Q(type=TransactionType.EXPENSE)), Decimal('0.00')),
+    }
+    transactions = Transaction.objects.filter(user=user, transaction_date__range=(start_date, end_date))
+    transactions.aggregate(**totals)
+    list(transactions.values('category__id', 'category__name', 'category__color', 'category__type').annotate(**totals))
+    list(transactions.values('account__id', 'account__name', 'account__type').annotate(**totals))
+    transactions.exists()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from core.reports import build_report
+
+    with benchmark_database():
+        user = seed_transactions(args.rows, seed=args.seed)
+        end_date = date.today() - timedelta(days=3)
+        start_date = end_date - timedelta(days=365)
+        print(f'{args.rows} transactions, report range {start_date} → {end_date}')
+        for label, run in (
+            ('legacy (4 raw queries)', lambda: legacy_report(user, start_date, end_date)),
+            ('engine (rollup + edges)', lambda: build_report(user, start_date, end_date)),
+        ):
+            with CaptureQueriesContext(connection) as captured:
+                run()
+            stats = measure(run, repeat=args.repeat)
+            print(
+                f'{label:<26} queries={len(captured.captured_queries):<3} '
+                f'p50={stats["p50_ms"]:.1f}ms p95={stats["p95_ms"]:.1f}ms min={stats["min_ms"]:.1f}ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
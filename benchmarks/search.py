@@ -0,0 +1,51 @@
+"""Ranked full-text search against an ``icontains`` scan of the descriptions.
+
+    python -m benchmarks.search --rows 1000000 --queries aluguel "conta de luz" uber
+
+Times the uncached ranked search (the best ``SEARCH_RESULT_LIMIT`` ids), the
+first page the view renders from them and the ``icontains`` filter it replaces.
+"""
+import argparse
+
+from .common import benchmark_database, measure, seed_transactions, setup_django
+
+PAGE_SIZE = 15
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--queries', nargs='+', default=['aluguel', 'conta de luz', 'farmacia', 'conta', 'uber'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db.models import Q
+
+    from transactions.models import Transaction
+    from transactions.search import fetch_in_order, ranked_transaction_ids, search_filter, search_terms
+
+    with benchmark_database():
+        user = seed_transactions(args.rows, seed=args.seed)
+        print(f'{args.rows} transactions')
+        for query in args.queries:
+            condition = Q()
+            for term in query.split():
+                condition &= Q(description__icontains=term)
+            scan = Transaction.objects.filter(condition, user=user).order_by('-transaction_date', '-pk')
+            ids = ranked_transaction_ids(user, query)
+            matches = Transaction.objects.filter(search_filter(query, user=user), user=user).count()
+
+            ranked_stats = measure(lambda: ranked_transaction_ids(user, query), repeat=args.repeat)
+            page_stats = measure(lambda: fetch_in_order(ids[:PAGE_SIZE]), repeat=args.repeat)
+            scan_stats = measure(lambda: list(scan[:PAGE_SIZE]), repeat=args.repeat)
+            print(
+                f'{query!r:<16} terms={"+".join(search_terms(query)):<14} matches={matches:>7} | '
+                f'ranked p50={ranked_stats["p50_ms"]:7.1f}ms page p50={page_stats["p50_ms"]:5.1f}ms | '
+                f'icontains first page p50={scan_stats["p50_ms"]:7.1f}ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Concurrent writers against SQLite, with Django's defaults and with the tuned settings.
+
+Each worker process creates transactions through the ORM (signals included). Every
+write reads the account first and then inserts inside one database transaction:
+the read-then-write shape that a deferred transaction cannot upgrade while
+another writer holds the lock.
+
+    python -m benchmarks.sqlite_writers --workers 8 --writes 200
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .common import benchmark_database, setup_django
+
+CONFIGURATIONS = {
+    # What a bare DATABASES entry gets: rollback journal, full sync, deferred
+    # transactions and Python's default 5 second busy timeout.
+    'defaults': {
+        'DJANGO_SQLITE_JOURNAL_MODE': 'DELETE',
+        'DJANGO_SQLITE_SYNCHRONOUS': 'FULL',
+        'DJANGO_SQLITE_CACHE_SIZE': '-2000',
+        'DJANGO_SQLITE_MMAP_SIZE': '0',
+        'DJANGO_SQLITE_TEMP_STORE': 'DEFAULT',
+        'DJANGO_SQLITE_TRANSACTION_MODE': 'DEFERRED',
+        'DJANGO_SQLITE_BUSY_TIMEOUT': '5000',
+        'DJANGO_CONN_MAX_AGE': '0',
+    },
+    # Empty: whatever core/settings.py (and the caller's environment) configures.
+    'tuned': {},
+}
+
+
+def run_worker(user_id, writes, start_at):
+    setup_django()
+    from datetime import date
+    from decimal import Decimal
+
+    from django.db import OperationalError, transaction
+
+    from accounts.models import Account
+    from transactions.models import Transaction, TransactionType
+
+    account_id = Account.objects.filter(user_id=user_id).values_list('pk', flat=True).first()
+    time.sleep(max(0.0, start_at - time.time()))
+    written = errors = 0
+    started = time.perf_counter()
+    for index in range(writes):
+        try:
+            with transaction.atomic():
+                account = Account.objects.get(pk=account_id)
+                Transaction.objects.create(
+                    user_id=user_id,
+                    account=account,
+                    amount=Decimal('1.00') + index % 50,
+                    description='Stress',
+                    transaction_date=date(2025, 1, 15),
+                    type=TransactionType.EXPENSE,
+                )
+            written += 1
+        except OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            errors += 1
+    print(json.dumps({'written': written, 'errors': errors, 'seconds': time.perf_counter() - started}))
+
+
+def run_configuration(name, database_file, user_id, workers, writes):
+    from django.conf import settings
+
+    # Switching the journal mode needs exclusive access, so do it before the
+    # workers connect rather than from every worker's init_command.
+    journal_mode = CONFIGURATIONS[name].get('DJANGO_SQLITE_JOURNAL_MODE', settings.SQLITE_PRAGMAS['journal_mode'])
+    with sqlite3.connect(database_file) as raw:
+        raw.execute(f'PRAGMA journal_mode={journal_mode}')
+    environment = dict(os.environ, DJANGO_DB_NAME=str(database_file), **CONFIGURATIONS[name])
+    start_at = time.time() + 2
+    processes = [
+        subprocess.Popen(
+            [
+                sys.executable, '-m', 'benchmarks.sqlite_writers', '--worker',
+                '--user-id', str(user_id), '--writes', str(writes), '--start-at', str(start_at),
+            ],
+            env=environment,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(workers)
+    ]
+    results = []
+    for process in processes:
+        output, _ = process.communicate()
+        if process.returncode:
+            raise SystemExit(f'{name}: a worker failed with exit code {process.returncode}')
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    written = sum(result['written'] for result in results)
+    errors = sum(result['errors'] for result in results)
+    wall = max(result['seconds'] for result in results)
+    print(
+        f'{name:<9} {written:>6} writes, {errors:>5} "database is locked" errors, '
+        f'{wall:6.2f}s wall, {written / wall:8.1f} writes/s'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200, help='Writes per worker.')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--user-id', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--start-at', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.user_id, args.writes, args.start_at)
+        return
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+
+    from accounts.models import Account, AccountType
+
+    with tempfile.TemporaryDirectory() as directory:
+        template = Path(directory) / 'template.sqlite3'
+        with benchmark_database(database_file=template) as connection:
+            user = get_user_model().objects.create_user(email='writers@example.com', password='benchpass123')
+            Account.objects.create(user=user, name='Conta Corrente', type=AccountType.CHECKING)
+            connection.close()
+            print(f'{args.workers} workers x {args.writes} writes')
+            for name in CONFIGURATIONS:
+                database_file = Path(directory) / f'{name}.sqlite3'
+                with sqlite3.connect(template) as raw:
+                    raw.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                shutil.copyfile(template, database_file)
+                run_configuration(name, database_file, user.pk, args.workers, args.writes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""Time finanpy's hot paths through the test client and record the results as JSON.
+
+    python -m benchmarks.suite --rows 100000 --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.suite --rows 100000 --compare benchmarks/results/<older>.json
+
+Each scenario reports p50/p95 latency and the number of queries of one request,
+so result files from different commits can be diffed side by side. The
+``worker_boot`` entry times fresh ``core.wsgi`` processes against
+``STARTUP_BUDGET_MS``.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+from datetime import date, timedelta
+from pathlib import Path
+
+from .common import benchmark_database, measure, seed_transactions, setup_django
+
+END_DATE = date(2025, 6, 30)
+
+
+def git_revision():
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def build_scenarios(client, user):
+    """Return ``(name, setup, run)`` triples; ``setup`` is untimed and may be ``None``."""
+    from django.urls import reverse
+
+    from accounts.models import Account
+    from categories.models import Category
+    from core.cache import bump_data_version
+    from transactions.models import Transaction, TransactionType
+    from transactions.pagination import NEXT, encode_cursor
+
+    account = Account.objects.filter(user=user).order_by('pk').first()
+    category = Category.objects.filter(user=user, type='expense').order_by('pk').first()
+    report_range = {
+        'data_inicio': (END_DATE - timedelta(days=365)).isoformat(),
+        'data_fim': END_DATE.isoformat(),
+    }
+    ledger_range = {'data_inicio': END_DATE.replace(day=1).isoformat(), 'data_fim': END_DATE.isoformat()}
+    list_filters = dict(report_range, account=account.pk, category=category.pk, min_amount='20')
+    transactions = Transaction.objects.filter(user=user).order_by('-transaction_date', '-created_at', '-pk')
+    deep_row = transactions[min(transactions.count() - 1, 15 * 1000)]
+    form_data = {
+        'transaction_date': END_DATE.isoformat(),
+        'type': TransactionType.EXPENSE,
+        'account': account.pk,
+        'category': category.pk,
+        'amount': '42.50',
+        'description': 'Benchmark',
+    }
+    dashboard_charts = [reverse('dashboard_chart', args=[chart]) for chart in ('categories', 'accounts', 'monthly')]
+    backdated_form_data = dict(form_data, transaction_date=(END_DATE - timedelta(days=4 * 365)).isoformat())
+    scratch = {}
+
+    def get(url, params=None):
+        def run():
+            response = client.get(url, params)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            assert response.status_code == 200, (url, response.status_code)
+
+        return run
+
+    def get_all(urls):
+        runs = [get(url) for url in urls]
+
+        def run():
+            for run_one in runs:
+                run_one()
+
+        return run
+
+    def remember_etag(url):
+        def setup():
+            scratch['etag'] = client.get(url)['ETag']
+
+        return setup
+
+    def get_not_modified(url):
+        def run():
+            response = client.get(url, headers={'If-None-Match': scratch['etag']})
+            assert response.status_code == 304, (url, response.status_code)
+
+        return run
+
+    def post(url_factory, data=None):
+        def run():
+            response = client.post(url_factory(), data)
+            assert response.status_code == 302, response.status_code
+
+        return run
+
+    def create_scratch_transaction():
+        scratch['pk'] = Transaction.objects.create(
+            user=user,
+            account=account,
+            category=category,
+            amount='10.00',
+            transaction_date=END_DATE,
+            type=TransactionType.EXPENSE,
+        ).pk
+
+    return [
+        ('dashboard_cold', lambda: bump_data_version(user.pk), get(reverse('dashboard'))),
+        ('dashboard_warm', None, get(reverse('dashboard'))),
+        ('dashboard_charts_cold', lambda: bump_data_version(user.pk), get_all(dashboard_charts)),
+        ('dashboard_chart_not_modified', remember_etag(dashboard_charts[-1]), get_not_modified(dashboard_charts[-1])),
+        (
+            'dashboard_balance_history_cold',
+            lambda: bump_data_version(user.pk),
+            get(reverse('dashboard_chart', args=['balance'])),
+        ),
+        ('reports_12_months', None, get(reverse('reports'), report_range)),
+        ('reports_export_csv', None, get(reverse('reports_export'), report_range)),
+        ('ledger_export_1_month', None, get(reverse('reports_ledger_export'), ledger_range)),
+        ('transaction_list_first_page', None, get(reverse('transactions:list'))),
+        (
+            'transaction_list_filtered_cold',
+            lambda: bump_data_version(user.pk),
+            get(reverse('transactions:list'), list_filters),
+        ),
+        (
+            'transaction_list_page_1000',
+            None,
+            get(reverse('transactions:list'), {'cursor': encode_cursor(deep_row, NEXT)}),
+        ),
+        ('transaction_create', None, post(lambda: reverse('transactions:create'), form_data)),
+        # Four years back: every later balance snapshot of the account moves.
+        ('transaction_create_backdated', None, post(lambda: reverse('transactions:create'), backdated_form_data)),
+        (
+            'transaction_update',
+            create_scratch_transaction,
+            post(lambda: reverse('transactions:update', args=[scratch['pk']]), form_data),
+        ),
+        (
+            'transaction_delete',
+            create_scratch_transaction,
+            post(lambda: reverse('transactions:delete', args=[scratch['pk']])),
+        ),
+    ]
+
+
+def run_suite(rows, repeat, seed):
+    import django
+    from django.db import connection, reset_queries
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    with benchmark_database():
+        user = seed_transactions(rows, seed=seed, end_date=END_DATE)
+        client = Client()
+        client.force_login(user)
+        results = {}
+        for name, setup, run in build_scenarios(client, user):
+            if setup is not None:
+                setup()
+            # DEBUG keeps a bounded query log; once it is full the captured slice is empty.
+            reset_queries()
+            with CaptureQueriesContext(connection) as captured:
+                run()
+            # Read the count now: every request of the timed runs empties the log again.
+            queries = len(captured.captured_queries)
+            stats = measure(run, repeat=repeat, setup=setup)
+            stats['queries'] = queries
+            results[name] = stats
+            print(f'{name:<30} queries={stats["queries"]:<3} p50={stats["p50_ms"]:8.2f}ms p95={stats["p95_ms"]:8.2f}ms')
+        results['worker_boot'] = measure_worker_boot(runs=min(repeat, 5))
+        return {
+            'meta': {
+                'revision': git_revision(),
+                'rows': rows,
+                'repeat': repeat,
+                'seed': seed,
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'results': results,
+        }
+
+
+def measure_worker_boot(runs):
+    """Boot time of fresh ``core.wsgi`` processes, checked against ``STARTUP_BUDGET_MS``."""
+    from django.conf import settings
+
+    from core.startup import profile_startup
+
+    samples = sorted(profile_startup('wsgi', importtime=False).boot_ms for _ in range(runs))
+    stats = {
+        'min_ms': samples[0],
+        'p50_ms': statistics.median(samples),
+        'p95_ms': samples[min(len(samples) - 1, round(0.95 * (len(samples) - 1)))],
+        'mean_ms': statistics.fmean(samples),
+        'queries': 0,
+        'budget_ms': settings.STARTUP_BUDGET_MS,
+    }
+    status = 'within' if stats['p50_ms'] <= stats['budget_ms'] else 'OVER'
+    print(f'{"worker_boot":<30} {"":<10} p50={stats["p50_ms"]:8.2f}ms {status} budget of {stats["budget_ms"]}ms')
+    return stats
+
+
+def print_comparison(current, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f'\nCompared with {baseline_path} (revision {baseline["meta"].get("revision")}):')
+    for name, stats in current['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            print(f'{name:<30} new scenario')
+            continue
+        change = (stats['p50_ms'] - previous['p50_ms']) / previous['p50_ms'] * 100 if previous['p50_ms'] else 0.0
+        queries = stats['queries'] - previous['queries']
+        print(f'{name:<30} p50 {change:+7.1f}%  queries {queries:+d}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--compare', help='Print p50 and query count changes against an earlier JSON file.')
+    args = parser.parse_args()
+
+    setup_django()
+    report = run_suite(args.rows, args.repeat, args.seed)
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        print(f'\nResults written to {path}')
+    if args.compare:
+        print_comparison(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""First page and totals of the transaction list across filter combinations.
+
+    python -m benchmarks.transaction_filters --rows 1000000
+
+Every scenario is a query string of the list page. For each one it prints the
+matching rows, the first keyset page, the uncached totals of the filter
+(rollups where the filter allows) and the indexes the page query uses.
+"""
+import argparse
+import re
+from datetime import date
+
+from .common import benchmark_database, measure, seed_transactions, setup_django
+
+PAGE_SIZE = 15
+END_DATE = date(2025, 6, 30)
+
+# Account and category values are names, resolved to the seeded user's ids.
+SCENARIOS = {
+    'none': {},
+    'month': {'month': '3', 'year': '2025'},
+    'year': {'year': '2024'},
+    'dates': {'data_inicio': '2024-02-10', 'data_fim': '2024-11-20'},
+    'type': {'type': 'income'},
+    'account': {'account': 'Poupança'},
+    'category': {'category': 'Educação'},
+    'account+category': {'account': 'Poupança', 'category': 'Rendimentos'},
+    'category+month': {'category': 'Mercado', 'month': '3', 'year': '2025'},
+    'amount': {'min_amount': '4000'},
+    'type+amount+year': {'type': 'expense', 'min_amount': '500', 'max_amount': '800', 'year': '2024'},
+    'text': {'q': 'aluguel'},
+    'text+account+dates': {'q': 'farmacia', 'account': 'Cartão de Crédito', 'data_inicio': '2024-01-01', 'data_fim': '2024-12-31'},
+    'everything': {
+        'type': 'expense',
+        'account': 'Conta Corrente',
+        'category': 'Moradia',
+        'min_amount': '1000',
+        'max_amount': '3000',
+        'q': 'aluguel',
+        'data_inicio': '2023-06-01',
+        'data_fim': '2025-05-15',
+    },
+}
+
+# Index names in SQLite (``USING INDEX x``, ``SCAN x VIRTUAL TABLE``) and
+# PostgreSQL (``Index Scan using x``, ``Bitmap Index Scan on x``) plans.
+INDEX_PATTERN = re.compile(
+    r'USING (?:COVERING )?INDEX (\w+)|Scan(?: Backward)? using (\w+)|Index Scan on (\w+)|SCAN (\w+) VIRTUAL TABLE'
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.http import QueryDict
+
+    from accounts.models import Account
+    from categories.models import Category
+    from transactions.filters import TransactionFilterForm
+    from transactions.models import Transaction
+    from transactions.pagination import paginate_by_keyset
+
+    with benchmark_database():
+        user = seed_transactions(args.rows, seed=args.seed, end_date=END_DATE)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        accounts = dict(Account.objects.filter(user=user).values_list('name', 'pk'))
+        categories = dict(Category.objects.filter(user=user).values_list('name', 'pk'))
+        print(f'{args.rows} transactions, {PAGE_SIZE} per page')
+        for name in args.scenarios:
+            params = dict(SCENARIOS[name])
+            if 'account' in params:
+                params['account'] = accounts[params['account']]
+            if 'category' in params:
+                params['category'] = categories[params['category']]
+            query = QueryDict(mutable=True)
+            query.update(params)
+            transaction_filter = TransactionFilterForm(query, user=user).to_filter()
+            queryset = (
+                transaction_filter.apply(Transaction.objects.filter(user=user), user)
+                .select_related('account', 'category')
+                .order_by('-transaction_date', '-created_at', '-pk')
+            )
+            matches = transaction_filter.totals(user)['transaction_count']
+            plan = queryset[: PAGE_SIZE + 1].explain()
+            indexes = sorted({name for match in INDEX_PATTERN.findall(plan) for name in match if name}) or ['-']
+
+            page_stats = measure(lambda: list(paginate_by_keyset(queryset, PAGE_SIZE)), repeat=args.repeat)
+            totals_stats = measure(lambda: transaction_filter.totals(user), repeat=args.repeat)
+            print(
+                f'{name:<20} matches={matches:>8} | first page p50={page_stats["p50_ms"]:7.1f}ms | '
+                f'totals p50={totals_stats["p50_ms"]:7.1f}ms ({"rollups" if transaction_filter.uses_rollups else "rows"}) | '
+                f'{", ".join(indexes)}'
+            )
+
+
+if __name__ == '__main__':
+    main()
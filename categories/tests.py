@@ -37,6 +37,22 @@ class CategoryTests(TestCase):
         categories = list(response.context['categories'])
         self.assertEqual(len(categories), 2)
 
+    def test_list_view_is_not_revalidated_while_showing_messages(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('categories:create'),
+            data={'name': 'Lazer', 'type': CategoryType.EXPENSE, 'color': CATEGORY_COLOR_CHOICES[2][0]},
+            follow=True,
+        )
+        self.assertEqual(len(response.context['messages']), 1)
+        self.assertFalse(response.has_header('ETag'))
+
+        response = self.client.get(reverse('categories:list'))
+        self.assertTrue(response.has_header('ETag'))
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('categories:list'), headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
     def test_create_view_assigns_user_and_message(self):
         self.client.force_login(self.user)
         response = self.client.post(
@@ -3,11 +3,13 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 
+from core.conditional import ConditionalGetMixin
+
 from .forms import CategoryForm
 from .models import Category, CategoryType
 
 
-class CategoryListView(LoginRequiredMixin, ListView):
+class CategoryListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Category
     template_name = 'categories/category_list.html'
     context_object_name = 'categories'
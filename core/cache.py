@@ -0,0 +1,115 @@
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+KEY_PREFIX = 'finanpy'
+
+
+def _version_key(user_id):
+    return f'{KEY_PREFIX}:data-version:{user_id}'
+
+
+def _stats_key(name, outcome):
+    return f'{KEY_PREFIX}:cache-stats:{name}:{outcome}'
+
+
+def _store_new_version(user_id):
+    key = _version_key(user_id)
+    # Versions are microsecond timestamps so a version lost to eviction can never
+    # be reissued while payloads cached under it are still around.
+    previous = cache.get(key) or 0
+    version = max(time.time_ns() // 1000, previous + 1)
+    cache.set(key, version, timeout=None)
+    return version
+
+
+def get_data_version(user_id):
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        version = _store_new_version(user_id)
+    return version
+
+
+def fragment_cache_context(user_id):
+    """Context for ``{% cache fragment_cache_timeout <name> user.pk data_version %}`` blocks.
+
+    Keying fragments on the data version skips both the querysets and the loops
+    of unchanged sections; any write moves every fragment of the user to new keys.
+    """
+    return {
+        'data_version': get_data_version(user_id),
+        'fragment_cache_timeout': settings.DERIVED_DATA_CACHE_TIMEOUT,
+    }
+
+
+def bump_data_version(user_id):
+    """Invalidate every payload derived from the user's accounts, categories or transactions."""
+    if not user_id:
+        return
+    _store_new_version(user_id)
+    if connection.in_atomic_block:
+        # Readers outside the transaction may cache pre-commit data under the new
+        # version, so bump once more when the write becomes visible.
+        transaction.on_commit(lambda: _store_new_version(user_id))
+
+
+def record_cache_event(name, outcome):
+    key = _stats_key(name, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_cache_stats(name):
+    hits = cache.get(_stats_key(name, 'hits')) or 0
+    misses = cache.get(_stats_key(name, 'misses')) or 0
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / lookups if lookups else 0.0,
+    }
+
+
+def reset_cache_stats(name):
+    cache.delete_many([_stats_key(name, 'hits'), _stats_key(name, 'misses')])
+
+
+def _payload_key(name, user_id, version, key_parts):
+    return ':'.join([KEY_PREFIX, name, str(user_id), str(version), *map(str, key_parts)])
+
+
+def get_or_build(name, user_id, build, *key_parts, timeout=None):
+    """Return the payload cached for the user's current data version, building it on a miss."""
+    key = _payload_key(name, user_id, get_data_version(user_id), key_parts)
+    payload = cache.get(key)
+    if payload is not None:
+        record_cache_event(name, 'hits')
+        return payload
+    record_cache_event(name, 'misses')
+    payload = build()
+    if timeout is None:
+        timeout = settings.DERIVED_DATA_CACHE_TIMEOUT
+    cache.set(key, payload, timeout)
+    return payload
+
+
+async def aget_or_build(name, user_id, build, *key_parts, timeout=None):
+    """Async ``get_or_build``; ``build`` is a coroutine function."""
+    version = await sync_to_async(get_data_version)(user_id)
+    key = _payload_key(name, user_id, version, key_parts)
+    payload = await cache.aget(key)
+    if payload is not None:
+        await sync_to_async(record_cache_event)(name, 'hits')
+        return payload
+    await sync_to_async(record_cache_event)(name, 'misses')
+    payload = await build()
+    if timeout is None:
+        timeout = settings.DERIVED_DATA_CACHE_TIMEOUT
+    await cache.aset(key, payload, timeout)
+    return payload
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Backends whose entries live in one process only.
+PROCESS_LOCAL_CACHES = {'django.core.cache.backends.locmem.LocMemCache'}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """The per-user data versions in ``core.cache`` must be seen by every worker.
+
+    With a process-local cache, a write served by one worker leaves the others
+    on the old version, serving stale payloads and 304s until the entries expire.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            f'The default cache ({backend}) is local to each process, so workers do not share data versions.',
+            hint='Set DJANGO_CACHE_BACKEND to redis, file (on a volume every worker sees) or db.',
+            id='core.E001',
+        )
+    ]
@@ -0,0 +1,75 @@
+import functools
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.middleware.csrf import get_token
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_data_version
+
+
+@functools.cache
+def _static_manifest_digest():
+    try:
+        return hashlib.sha256((Path(settings.STATIC_ROOT) / 'staticfiles.json').read_bytes()).hexdigest()
+    except OSError:
+        return ''
+
+
+def release_version():
+    """The deployed build: ``RELEASE``, or else the digest of the collected static manifest."""
+    return settings.RELEASE or _static_manifest_digest()
+
+
+def data_version_etag(request, version):
+    """Strong ETag for a response built from the user's data at ``version``.
+
+    Besides the version it covers the user, the URL with its query string, the
+    day (pages default to the current month), the CSRF secret embedded in the
+    page's forms and the deployed release, whose templates rendered the page.
+    """
+    # Make sure the secret exists now rather than when the template renders.
+    get_token(request)
+    values = [
+        str(request.user.pk),
+        str(version),
+        timezone.localdate().isoformat(),
+        request.get_full_path(),
+        request.META.get('CSRF_COOKIE', ''),
+        release_version(),
+    ]
+    return quote_etag(hashlib.sha256('\n'.join(values).encode()).hexdigest()[:32])
+
+
+class ConditionalGetMixin:
+    """Answer GET and HEAD with 304 Not Modified while the user's data is unchanged.
+
+    The data version is bumped on every write to accounts, categories and
+    transactions, so it works as a last-modified watermark. It is read from the
+    cache before the view runs any query or renders anything. Place the mixin
+    after ``LoginRequiredMixin``.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        # A page carrying flash messages must not be revalidated later, or the
+        # browser would show the same messages again.
+        if request.method not in ('GET', 'HEAD') or not request.user.is_authenticated or get_messages(request):
+            return super().dispatch(request, *args, **kwargs)
+        version = get_data_version(request.user.pk)
+        etag = data_version_etag(request, version)
+        last_modified = version // 1_000_000
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Browsers keep the page but revalidate it on every visit.
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Cookie',))
+        return response
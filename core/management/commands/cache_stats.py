@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.cache import get_cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Show hit/miss counters of the per-user derived data caches. Counters live in the '
+        'configured cache backend, so the locmem backend only reports the current process.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', default=['dashboard'], help='Cache names to report.')
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them.')
+
+    def handle(self, *args, **options):
+        for name in options['names']:
+            stats = get_cache_stats(name)
+            self.stdout.write(
+                f'{name}: {stats["hits"]} hit(s), {stats["misses"]} miss(es), hit ratio {stats["hit_ratio"]:.1%}'
+            )
+            if options['reset']:
+                reset_cache_stats(name)
@@ -0,0 +1,55 @@
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import STARTUP_TARGETS, median_boot_ms, profile_startup
+
+
+class Command(BaseCommand):
+    help = (
+        'Boot a fresh worker process and report where its import time goes, grouped by package. '
+        'Fails when the median boot time is over the budget (STARTUP_BUDGET_MS).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=sorted(STARTUP_TARGETS), default='wsgi', help='Entry point to boot.')
+        parser.add_argument(
+            '--first-request', action='store_true', help='Also load the URLconf and the views, as the first request does.'
+        )
+        parser.add_argument('--limit', type=int, default=15, help='Rows in the package and module tables.')
+        parser.add_argument('--runs', type=int, default=5, help='Untraced boots used for the budget check.')
+        parser.add_argument('--budget-ms', type=float, help='Defaults to the STARTUP_BUDGET_MS setting.')
+
+    def profile(self, target, **kwargs):
+        try:
+            return profile_startup(target, **kwargs)
+        except subprocess.CalledProcessError as error:
+            raise CommandError(
+                f'Booting {target} failed with exit code {error.returncode}:\n{(error.stderr or "").strip()}'
+            )
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1.')
+        target, first_request, limit = options['target'], options['first_request'], options['limit']
+        profile = self.profile(target, first_request=first_request)
+        self.stdout.write(
+            f'{target}{" + first request" if first_request else ""}: {len(profile.records)} modules imported, '
+            f'{profile.import_ms:.1f}ms import time (traced)'
+        )
+        self.stdout.write('\nBy package (self time):')
+        for package, self_ms, count in profile.by_package()[:limit]:
+            self.stdout.write(f'  {package:<28} {self_ms:8.1f}ms  {count:4} modules')
+        self.stdout.write('\nSlowest modules (self time):')
+        for record in profile.slowest(limit):
+            self.stdout.write(f'  {record.module:<48} {record.self_us / 1000:8.1f}ms')
+
+        budget_ms = options['budget_ms'] if options['budget_ms'] is not None else settings.STARTUP_BUDGET_MS
+        boot_ms = median_boot_ms(
+            self.profile(target, first_request=first_request, importtime=False) for _ in range(options['runs'])
+        )
+        summary = f'\nBoot time: {boot_ms:.1f}ms median of {options["runs"]} run(s), budget {budget_ms:.0f}ms'
+        if boot_ms > budget_ms:
+            raise CommandError(summary.strip() + ' (over budget)')
+        self.stdout.write(self.style.SUCCESS(summary))
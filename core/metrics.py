@@ -0,0 +1,116 @@
+import bisect
+import threading
+import time
+
+# Log-spaced bucket bounds in milliseconds: four buckets per doubling from
+# 0.25 ms to about 17 minutes, so percentiles are accurate to roughly 19%.
+BUCKET_BOUNDS_MS = tuple(0.25 * 2 ** (step / 4) for step in range(90))
+PERCENTILES = (50, 95, 99)
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` hook that times every statement of a request.
+
+    Works with ``DEBUG`` off, unlike ``connection.queries``.
+    """
+
+    def __init__(self, slowest=3):
+        self.slowest_limit = slowest
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.total_ms += duration
+            if self.slowest_limit:
+                self._keep_if_slow(duration, sql)
+
+    def _keep_if_slow(self, duration, sql):
+        if len(self.slowest) < self.slowest_limit:
+            self.slowest.append((duration, sql))
+        elif duration > self.slowest[-1][0]:
+            self.slowest[-1] = (duration, sql)
+        else:
+            return
+        self.slowest.sort(key=lambda item: item[0], reverse=True)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.queries = 0
+
+    def add(self, duration_ms, queries=0):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.queries += queries
+
+    def percentile(self, percent):
+        """Upper bound of the bucket holding the ``percent``-th request, capped at the maximum seen."""
+        if not self.count:
+            return 0.0
+        rank = percent / 100 * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                bound = BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max_ms
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        summary = {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'max_ms': self.max_ms,
+            'mean_queries': self.queries / self.count if self.count else 0.0,
+        }
+        for percent in PERCENTILES:
+            summary[f'p{percent}_ms'] = self.percentile(percent)
+        return summary
+
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+def record_request(name, duration_ms, queries):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = LatencyHistogram()
+        histogram.add(duration_ms, queries)
+
+
+def request_summaries():
+    """``{url_name: summary}`` for every URL name seen by this process, slowest p95 first."""
+    with _lock:
+        summaries = {name: histogram.summary() for name, histogram in _histograms.items()}
+    return dict(sorted(summaries.items(), key=lambda item: item[1]['p95_ms'], reverse=True))
+
+
+def reset_request_metrics():
+    with _lock:
+        _histograms.clear()
+
+
+def format_summary_table(summaries):
+    header = f'{"view":<40} {"count":>7} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"max ms":>9} {"queries":>8}'
+    lines = [header, '-' * len(header)]
+    for name, summary in summaries.items():
+        lines.append(
+            f'{name:<40} {summary["count"]:>7} {summary["p50_ms"]:>9.1f} {summary["p95_ms"]:>9.1f} '
+            f'{summary["p99_ms"]:>9.1f} {summary["max_ms"]:>9.1f} {summary["mean_queries"]:>8.1f}'
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,97 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from .metrics import QueryRecorder, record_request
+
+logger = logging.getLogger('finanpy.requests')
+
+
+class RequestMetricsMiddleware:
+    """Time each request and its SQL, then report it in logs, headers and histograms.
+
+    Statements are counted through ``connection.execute_wrapper`` so the numbers
+    are available with ``DEBUG`` off. For streaming responses only the time to
+    the first byte is measured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.slowest = getattr(settings, 'REQUEST_METRICS_SLOWEST_QUERIES', 3)
+        self.slow_request_ms = getattr(settings, 'REQUEST_METRICS_SLOW_MS', 500)
+        self.server_timing = getattr(settings, 'REQUEST_METRICS_SERVER_TIMING', True)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder(slowest=self.slowest)
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        return self.finish(request, response, started, recorder)
+
+    async def __acall__(self, request):
+        # Async views run their queries in sync_to_async threads, whose
+        # connections only exist once a query needs them; recording through the
+        # thread-sensitive executor keeps the wrappers on those connections.
+        recorder = QueryRecorder(slowest=self.slowest)
+        started = time.perf_counter()
+        stack = ExitStack()
+        await sync_to_async(self._install_wrappers)(stack, recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, started, recorder)
+
+    def _install_wrappers(self, stack, recorder):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+
+    def finish(self, request, response, started, recorder):
+        duration_ms = (time.perf_counter() - started) * 1000
+        name = self.url_name(request)
+        record_request(name, duration_ms, recorder.count)
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'app;dur={duration_ms:.1f}, '
+                f'db;dur={recorder.total_ms:.1f};desc="{recorder.count} queries"'
+            )
+        self.log(request, response, name, duration_ms, recorder)
+        return response
+
+    def url_name(self, request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return '<unresolved>'
+        return match.view_name or match._func_path
+
+    def log(self, request, response, name, duration_ms, recorder):
+        level = logging.WARNING if duration_ms >= self.slow_request_ms else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        payload = {
+            'view': name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+            'queries': recorder.count,
+            'sql_ms': round(recorder.total_ms, 2),
+            'slowest_queries': [
+                {'duration_ms': round(duration, 2), 'sql': sql[:500]} for duration, sql in recorder.slowest
+            ],
+        }
+        logger.log(level, json.dumps(payload, ensure_ascii=False), extra={'request_metrics': payload})
@@ -0,0 +1,227 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+
+from accounts.models import AccountType
+from categories.models import CategoryType
+from transactions.postgres import grouping_set_totals, is_postgresql
+from transactions.rollups import agrouped_totals, grouped_totals
+
+TAILWIND_TO_HEX = {
+    'bg-indigo-500': '#6366F1',
+    'bg-blue-500': '#3B82F6',
+    'bg-purple-500': '#8B5CF6',
+    'bg-green-500': '#22C55E',
+    'bg-emerald-500': '#10B981',
+    'bg-amber-500': '#F59E0B',
+    'bg-pink-500': '#EC4899',
+    'bg-red-500': '#EF4444',
+}
+
+FALLBACK_COLORS = [
+    '#6366F1',
+    '#3B82F6',
+    '#8B5CF6',
+    '#22C55E',
+    '#10B981',
+    '#F59E0B',
+    '#EC4899',
+    '#EF4444',
+]
+
+REPORT_ACCOUNT_FIELDS = ('account__id', 'account__name', 'account__type')
+REPORT_CATEGORY_FIELDS = ('category__id', 'category__name', 'category__color', 'category__type')
+REPORT_GROUP_FIELDS = REPORT_ACCOUNT_FIELDS + REPORT_CATEGORY_FIELDS
+
+
+def resolve_chart_color(tailwind_class, index):
+    color = None
+    if tailwind_class:
+        color = TAILWIND_TO_HEX.get(tailwind_class)
+    if not color:
+        color = FALLBACK_COLORS[index % len(FALLBACK_COLORS)]
+    return color
+
+
+@dataclass
+class Report:
+    total_income: Decimal = Decimal('0.00')
+    total_expense: Decimal = Decimal('0.00')
+    transaction_count: int = 0
+    category_summary: list = field(default_factory=list)
+    account_summary: list = field(default_factory=list)
+    category_chart: dict = field(default_factory=dict)
+    account_chart: dict = field(default_factory=dict)
+
+    @property
+    def balance(self):
+        return self.total_income - self.total_expense
+
+    @property
+    def has_transactions(self):
+        return self.transaction_count > 0
+
+
+def build_report(user, start_date, end_date):
+    """Build every report section from a single grouped result set.
+
+    Rows are grouped by (account, category) once and folded in Python into the
+    totals, the per-category and per-account summaries and the chart payloads.
+    On PostgreSQL the database computes those groupings itself with
+    ``GROUPING SETS``.
+    """
+    if is_postgresql():
+        return build_report_with_grouping_sets(user, start_date, end_date)
+    return fold_report_rows(grouped_totals(user, start_date, end_date, fields=REPORT_GROUP_FIELDS))
+
+
+async def abuild_report(user, start_date, end_date):
+    if is_postgresql():
+        return await sync_to_async(build_report_with_grouping_sets)(user, start_date, end_date)
+    return fold_report_rows(await agrouped_totals(user, start_date, end_date, fields=REPORT_GROUP_FIELDS))
+
+
+def build_report_with_grouping_sets(user, start_date, end_date):
+    groups = grouping_set_totals(
+        user,
+        start_date,
+        end_date,
+        {'total': (), 'category': REPORT_CATEGORY_FIELDS, 'account': REPORT_ACCOUNT_FIELDS},
+    )
+    totals = groups['total'][0]
+    report = Report(
+        total_income=totals['total_income'],
+        total_expense=totals['total_expense'],
+        transaction_count=totals['transaction_count'],
+    )
+    categories = []
+    for row in groups['category']:
+        entry = _category_entry(row)
+        entry['income'] = row['total_income']
+        entry['expense'] = row['total_expense']
+        categories.append(entry)
+    accounts = []
+    for row in groups['account']:
+        entry = _account_entry(row)
+        entry['income'] = row['total_income']
+        entry['expense'] = row['total_expense']
+        accounts.append(entry)
+    return _finish_report(report, categories, accounts)
+
+
+def fold_report_rows(rows):
+    report = Report()
+    categories = {}
+    accounts = {}
+    for row in rows:
+        income = row['total_income']
+        expense = row['total_expense']
+        report.total_income += income
+        report.total_expense += expense
+        report.transaction_count += row['transaction_count']
+
+        category = categories.get(row['category__id'])
+        if category is None:
+            category = categories[row['category__id']] = _category_entry(row)
+        category['income'] += income
+        category['expense'] += expense
+
+        account = accounts.get(row['account__id'])
+        if account is None:
+            account = accounts[row['account__id']] = _account_entry(row)
+        account['income'] += income
+        account['expense'] += expense
+    return _finish_report(report, categories.values(), accounts.values())
+
+
+def _category_entry(row):
+    return {
+        'name': row['category__name'] or 'Sem categoria',
+        'category_type': row['category__type'],
+        'color_class': row['category__color'],
+        'income': Decimal('0.00'),
+        'expense': Decimal('0.00'),
+    }
+
+
+def _account_entry(row):
+    return {
+        'name': row['account__name'],
+        'account_type': row['account__type'],
+        'income': Decimal('0.00'),
+        'expense': Decimal('0.00'),
+    }
+
+
+def _finish_report(report, categories, accounts):
+    report.category_summary = _category_summary(categories)
+    report.account_summary = _account_summary(accounts)
+    report.category_chart, report.account_chart = build_chart_payloads(
+        report.category_summary, report.account_summary
+    )
+    return report
+
+
+def _category_summary(categories):
+    category_type_map = dict(CategoryType.choices)
+    ordered = sorted(categories, key=lambda item: (item['income'], item['expense']), reverse=True)
+    category_summary = []
+    for index, item in enumerate(ordered):
+        category_summary.append(
+            {
+                'name': item['name'],
+                'type_label': category_type_map.get(item['category_type'], 'Não classificada'),
+                'color_class': item['color_class'],
+                'income': item['income'],
+                'expense': item['expense'],
+                'balance': item['income'] - item['expense'],
+                'chart_color': resolve_chart_color(item['color_class'], index),
+            }
+        )
+    return category_summary
+
+
+def _account_summary(accounts):
+    account_type_map = dict(AccountType.choices)
+    account_summary = []
+    for item in sorted(accounts, key=lambda item: item['name']):
+        account_summary.append(
+            {
+                'name': item['name'],
+                'type_label': account_type_map.get(item['account_type'], 'Conta'),
+                'income': item['income'],
+                'expense': item['expense'],
+                'balance': item['income'] - item['expense'],
+            }
+        )
+    return account_summary
+
+
+def build_chart_payloads(category_summary, account_summary):
+    category_chart_data = {
+        'labels': [],
+        'income': [],
+        'expense': [],
+        'colors': [],
+    }
+    for item in category_summary:
+        if item['income'] > 0 or item['expense'] > 0:
+            category_chart_data['labels'].append(item['name'])
+            category_chart_data['income'].append(float(item['income']))
+            category_chart_data['expense'].append(float(item['expense']))
+            category_chart_data['colors'].append(item['chart_color'])
+
+    account_chart_data = {
+        'labels': [],
+        'income': [],
+        'expense': [],
+        'balance': [],
+    }
+    for item in account_summary:
+        if item['income'] > 0 or item['expense'] > 0:
+            account_chart_data['labels'].append(item['name'])
+            account_chart_data['income'].append(float(item['income']))
+            account_chart_data['expense'].append(float(item['expense']))
+            account_chart_data['balance'].append(float(item['balance']))
+    return category_chart_data, account_chart_data
@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 DEFAULT_DB_PATH = BASE_DIR / 'db.sqlite3'
@@ -25,18 +28,22 @@ DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-*c9^kggk!xp598sy2u8v57i0n4n8233l&5pq%#!5-^!yh=je51'
+SECRET_KEY = os.getenv(
+    'DJANGO_SECRET_KEY', 'django-insecure-*c9^kggk!xp598sy2u8v57i0n4n8233l&5pq%#!5-^!yh=je51'
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DJANGO_DEBUG', 'true').lower() in ('1', 'true', 'yes')
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host.strip() for host in os.getenv('DJANGO_ALLOWED_HOSTS', '').split(',') if host.strip()]
 
 
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # Admin modules are discovered by core.urls, so management commands and
+    # worker boot do not import them.
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -45,13 +52,17 @@ INSTALLED_APPS = [
 
     'accounts',
     'categories',
+    'core',
     'profiles',
     'transactions',
     'users',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Serves collected static files before sessions and auth run.
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -66,30 +77,169 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'core' / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compiled templates are kept for the life of the process; in DEBUG the
+            # autoreloader clears them when a template file changes.
+            'loaders': [
+                (
+                    'django.template.loaders.cached.Loader',
+                    [
+                        'django.template.loaders.filesystem.Loader',
+                        'django.template.loaders.app_directories.Loader',
+                    ],
+                ),
+            ],
         },
     },
 ]
 
+# core.wsgi and core.asgi compile every template of the project's apps at
+# process start (core.warmup), so the first request does not pay for it.
+TEMPLATE_WARMUP = os.getenv('DJANGO_TEMPLATE_WARMUP', 'true').lower() in ('1', 'true', 'yes')
+
 WSGI_APPLICATION = 'core.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# SQLite tuning for concurrent writers. WAL lets readers and one writer work at
+# the same time, IMMEDIATE transactions take the write lock up front (a deferred
+# transaction that upgrades from read to write fails with "database is locked"
+# instead of waiting) and the busy timeout makes writers queue for the lock.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('DJANGO_SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('DJANGO_SQLITE_SYNCHRONOUS', 'NORMAL'),
+    # Negative values are KiB: -20000 is about 20 MB of page cache per connection.
+    'cache_size': os.getenv('DJANGO_SQLITE_CACHE_SIZE', '-20000'),
+    'mmap_size': os.getenv('DJANGO_SQLITE_MMAP_SIZE', str(128 * 1024 * 1024)),
+    'temp_store': os.getenv('DJANGO_SQLITE_TEMP_STORE', 'MEMORY'),
+}
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('DJANGO_SQLITE_BUSY_TIMEOUT', '5000'))
+
+DB_ENGINE = os.getenv('DJANGO_DB_ENGINE', 'sqlite3')
+
+if DB_ENGINE == 'postgresql':
+    # Requires psycopg 3 (`pip install "psycopg[binary,pool]"`). With the pool
+    # enabled, connections are reused through psycopg_pool and CONN_MAX_AGE must
+    # stay 0.
+    DB_POOL = os.getenv('DJANGO_DB_POOL', 'true').lower() in ('1', 'true', 'yes')
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'finanpy'),
+            'USER': os.getenv('POSTGRES_USER', 'finanpy'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DJANGO_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': os.getenv('DJANGO_CONN_HEALTH_CHECKS', 'true').lower() in ('1', 'true', 'yes'),
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.getenv('DJANGO_DB_POOL_MIN_SIZE', '2')),
+                    'max_size': int(os.getenv('DJANGO_DB_POOL_MAX_SIZE', '10')),
+                    'timeout': float(os.getenv('DJANGO_DB_POOL_TIMEOUT', '10')),
+                }
+                if DB_POOL
+                else False,
+            },
+        }
+    }
+elif DB_ENGINE == 'sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': str(DB_PATH),
+            'CONN_MAX_AGE': int(os.getenv('DJANGO_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': os.getenv('DJANGO_CONN_HEALTH_CHECKS', 'true').lower() in ('1', 'true', 'yes'),
+            'OPTIONS': {
+                'init_command': ''.join(f'PRAGMA {name}={value};' for name, value in SQLITE_PRAGMAS.items()),
+                'transaction_mode': os.getenv('DJANGO_SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+                'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f'DJANGO_DB_ENGINE must be "sqlite3" or "postgresql", not "{DB_ENGINE}".')
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# DJANGO_CACHE_BACKEND selects locmem (default, per process), redis, file or db
+# (run `python manage.py createcachetable` first).
+#
+# The cache also holds the per-user data versions (core.cache) that invalidate
+# every cached payload, ETag and fragment on writes, so every process serving
+# requests must share it: locmem is only fit for DEBUG and a single process.
+# `python manage.py check --deploy` fails on locmem (core.E001).
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'finanpy'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'finanpy_cache'),
+}
+# Identifies the deployed build (a git SHA or image tag). Cache keys are prefixed
+# with it and conditional-GET ETags cover it, so a deploy never serves payloads,
+# fragments or 304s produced by the previous code; without it the ETags fall
+# back to the collected static manifest.
+RELEASE = os.getenv('DJANGO_RELEASE', '')
+
+CACHE_BACKEND = os.getenv('DJANGO_CACHE_BACKEND', 'locmem')
+CACHE_ENGINE, CACHE_DEFAULT_LOCATION = CACHE_BACKENDS[CACHE_BACKEND]
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': str(DB_PATH),
+        'BACKEND': CACHE_ENGINE,
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', CACHE_DEFAULT_LOCATION),
+        'KEY_PREFIX': RELEASE,
     }
 }
 
+# Lifetime of per-user derived payloads (dashboard, charts). Entries are keyed by
+# a data version bumped on every write, so this only bounds memory usage.
+DERIVED_DATA_CACHE_TIMEOUT = int(os.getenv('DJANGO_DERIVED_DATA_CACHE_TIMEOUT', '3600'))
+
+# Budget for booting a worker (importing core.wsgi in a fresh process), checked by
+# `manage.py profile_startup` and recorded by benchmarks.suite.
+STARTUP_BUDGET_MS = int(os.getenv('DJANGO_STARTUP_BUDGET_MS', '750'))
+
+
+# Request metrics
+# core.middleware.RequestMetricsMiddleware logs one JSON line per request on the
+# "finanpy.requests" logger, adds a Server-Timing header and feeds the
+# per-view latency histograms served at /ops/metrics/ (staff only).
+
+REQUEST_METRICS_SLOWEST_QUERIES = 3
+REQUEST_METRICS_SLOW_MS = int(os.getenv('DJANGO_REQUEST_SLOW_MS', '500'))
+REQUEST_METRICS_SERVER_TIMING = True
+
+# `manage.py test` sends the request log nowhere, so slow test requests do not
+# print JSON lines between the test dots; tests read it with assertLogs.
+TESTING = sys.argv[1:2] == ['test']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        'null': {'class': 'logging.NullHandler'},
+    },
+    'loggers': {
+        'finanpy.requests': {
+            'handlers': ['null' if TESTING else 'console'],
+            # Every request is logged at INFO and slow ones at WARNING; the dev
+            # server already prints request lines, so only slow ones show there.
+            'level': os.getenv('DJANGO_REQUEST_LOG_LEVEL', 'WARNING' if DEBUG else 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -126,9 +276,24 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
-STATICFILES_DIRS = [
-    BASE_DIR / 'core' / 'static',
-]
+STATIC_ROOT = Path(os.getenv('DJANGO_STATIC_ROOT', BASE_DIR / 'staticfiles'))
+
+# Outside DEBUG, `collectstatic` writes content-hashed, pre-compressed (gzip and
+# Brotli when available) copies that WhiteNoise serves with a one-year max-age.
+# Tests run before any `collectstatic`, so they keep the plain storage and let
+# WhiteNoise look files up per request instead of warning about the missing
+# STATIC_ROOT.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage'
+            if DEBUG or TESTING
+            else 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+WHITENOISE_AUTOREFRESH = DEBUG or TESTING
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import Account
+from categories.models import Category
+from transactions.models import RecurringTransaction, Transaction
+
+from .cache import bump_data_version
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Transaction)
+@receiver(post_save, sender=RecurringTransaction)
+def bump_version_on_save(sender, instance, **kwargs):
+    bump_data_version(instance.user_id)
+
+
+@receiver(post_delete, sender=Account)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=RecurringTransaction)
+def bump_version_on_delete(sender, instance, **kwargs):
+    bump_data_version(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def start_version_for_new_user(sender, instance, created, **kwargs):
+    # Start from a fresh version so nothing cached under a recycled primary key
+    # can leak into a new account.
+    if created:
+        bump_data_version(instance.pk)
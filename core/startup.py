@@ -0,0 +1,142 @@
+"""Import-time profile of a fresh worker process.
+
+A child interpreter boots one of the ``STARTUP_TARGETS`` while timing every
+module import. Its stderr report, in the ``python -X importtime`` format, is
+parsed into per-module rows and grouped by top-level package.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+
+from django.conf import settings
+
+STARTUP_TARGETS = {
+    # What every manage.py command pays before it runs.
+    'setup': 'import django\ndjango.setup()',
+    'wsgi': 'import core.wsgi',
+    'asgi': 'import core.asgi',
+}
+
+# What the first request adds to the target: the URLconf and every view it imports.
+FIRST_REQUEST = '\nfrom django.urls import get_resolver\nget_resolver().url_patterns'
+
+# ``-X importtime`` only sees ``import`` statements, not ``importlib.import_module()``,
+# which is how Django loads apps, models, admin modules and the URLconf. The child
+# wraps ``_find_and_load`` instead, the function both paths end up in, and writes
+# the same report format to stderr.
+CHILD_SCRIPT = """
+import importlib._bootstrap as bootstrap, json, sys, time
+timer = time.perf_counter_ns
+stack = []
+find_and_load = bootstrap._find_and_load
+
+def traced(name, import_):
+    if name in sys.modules:
+        return find_and_load(name, import_)
+    stack.append(0)
+    started = timer()
+    try:
+        return find_and_load(name, import_)
+    finally:
+        elapsed = (timer() - started) // 1000
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        sys.stderr.write(f'import time: {{elapsed - children:9}} | {{elapsed:10}} | {{"  " * len(stack)}} {{name}}\\n')
+
+if {trace}:
+    bootstrap._find_and_load = traced
+started = time.perf_counter()
+{code}
+boot_ms = (time.perf_counter() - started) * 1000
+bootstrap._find_and_load = find_and_load
+print(json.dumps({{'boot_ms': boot_ms, 'modules': sorted(sys.modules)}}))
+"""
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self):
+        return self.module.split('.')[0]
+
+
+@dataclass
+class StartupProfile:
+    boot_ms: float
+    records: list
+    modules: list
+
+    @property
+    def import_ms(self):
+        return sum(record.self_us for record in self.records) / 1000
+
+    def by_package(self):
+        """``[(package, self_ms, module_count)]``, slowest package first."""
+        totals = {}
+        for record in self.records:
+            entry = totals.setdefault(record.package, [0, 0])
+            entry[0] += record.self_us
+            entry[1] += 1
+        rows = [(package, self_us / 1000, count) for package, (self_us, count) in totals.items()]
+        return sorted(rows, key=lambda row: row[1], reverse=True)
+
+    def slowest(self, limit):
+        return sorted(self.records, key=lambda record: record.self_us, reverse=True)[:limit]
+
+
+def parse_importtime(output):
+    """Parse a ``python -X importtime`` style report into ``ImportRecord`` rows."""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        columns = line[len('import time:'):].split('|')
+        if len(columns) != 3 or not columns[0].strip().isdigit():
+            continue
+        name = columns[2].rstrip()
+        stripped = name.lstrip()
+        records.append(
+            ImportRecord(
+                module=stripped,
+                self_us=int(columns[0]),
+                cumulative_us=int(columns[1]),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return records
+
+
+def profile_startup(target='wsgi', first_request=False, importtime=True, environment=None):
+    """Boot ``target`` in a fresh interpreter and return its ``StartupProfile``.
+
+    Tracing slows the imports down, so pass ``importtime=False`` to time the
+    boot as a worker would see it (``records`` is then empty).
+    """
+    code = STARTUP_TARGETS[target] + (FIRST_REQUEST if first_request else '')
+    env = dict(os.environ if environment is None else environment)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT.format(code=code, trace=importtime)],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return StartupProfile(
+        boot_ms=report['boot_ms'], records=parse_importtime(result.stderr), modules=report['modules']
+    )
+
+
+def median_boot_ms(profiles):
+    return statistics.median(profile.boot_ms for profile in profiles)
@@ -108,6 +108,22 @@
         };
     }
 
+    function loadChartData(url, render) {
+        // The endpoints answer with ETag/Last-Modified, so the browser cache
+        // revalidates repeat views and gets a 304 while the data is unchanged.
+        return fetch(url, { credentials: 'same-origin', headers: { Accept: 'application/json' } })
+            .then((response) => {
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(render)
+            .catch((error) => {
+                console.warn(`[FinanpyCharts] Não foi possível carregar ${url}:`, error);
+            });
+    }
+
     const layoutPadding = { top: 16, right: 20, bottom: 16, left: 20 };
     const chartInstances = new Map();
 
@@ -136,8 +152,10 @@
             renderDonutChart: () => {},
             renderHorizontalBarChart: () => {},
             renderLineChart: () => {},
+            renderBalanceChart: () => {},
             renderGroupedBars: () => {},
             renderComboBarLine: () => {},
+            load: () => Promise.resolve(),
             destroy: destroyChart,
             destroyAll() {
                 chartInstances.forEach((_, key) => destroyChart(key));
@@ -368,6 +386,52 @@
         });
     }
 
+    function renderBalanceChart(canvasId, labels, balanceSeries) {
+        if (!Array.isArray(balanceSeries) || !balanceSeries.length) {
+            destroyChart(canvasId);
+            return;
+        }
+        const bounds = computeAxisBounds([balanceSeries]);
+        registerChart(canvasId, {
+            type: 'line',
+            data: {
+                labels,
+                datasets: [
+                    {
+                        label: 'Saldo total',
+                        data: balanceSeries,
+                        borderColor: '#38BDF8',
+                        backgroundColor: 'rgba(56, 189, 248, 0.16)',
+                        fill: 'origin',
+                        pointRadius: balanceSeries.length > 24 ? 0 : 3,
+                        pointBackgroundColor: '#38BDF8',
+                    },
+                ],
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                layout: { padding: layoutPadding },
+                interaction: { mode: 'index', intersect: false },
+                scales: {
+                    x: {
+                        grid: { color: 'rgba(148, 163, 184, 0.12)' },
+                        ticks: { color: '#CBD5F5', autoSkip: true, maxTicksLimit: 12 },
+                    },
+                    y: {
+                        grid: { color: 'rgba(148, 163, 184, 0.15)' },
+                        ticks: buildCurrencyTicks(),
+                        ...bounds,
+                    },
+                },
+                plugins: {
+                    legend: { display: false },
+                    tooltip: buildCurrencyTooltip(),
+                },
+            },
+        });
+    }
+
     function renderGroupedBars(canvasId, labels, datasetConfigs) {
         if (!Array.isArray(datasetConfigs) || !datasetConfigs.length) {
             destroyChart(canvasId);
@@ -510,8 +574,10 @@
         renderDonutChart,
         renderHorizontalBarChart,
         renderLineChart,
+        renderBalanceChart,
         renderGroupedBars,
         renderComboBarLine,
+        load: loadChartData,
         destroy: destroyChart,
         destroyAll() {
             chartInstances.forEach((_, key) => destroyChart(key));
@@ -0,0 +1,162 @@
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from accounts.balances import rebuild_balance_snapshots, recalculate_account_balance
+from accounts.models import Account, AccountType
+from categories.models import CATEGORY_COLOR_CHOICES, Category, CategoryType
+from core.cache import bump_data_version
+from transactions.models import Transaction, TransactionType
+from transactions.rollups import rebuild_monthly_summaries
+
+DEFAULT_PASSWORD = 'finanpy123'
+
+ACCOUNT_PROFILES = (
+    ('Conta Corrente', AccountType.CHECKING, 0.6),
+    ('Poupança', AccountType.SAVINGS, 0.15),
+    ('Cartão de Crédito', AccountType.CREDIT, 0.25),
+)
+
+# (name, weight, minimum amount, maximum amount, descriptions)
+INCOME_PROFILES = (
+    ('Salário', 3, 2500, 15000, ('Salário mensal', 'Adiantamento salarial', '13º salário')),
+    ('Freelance', 2, 150, 4000, ('Projeto freelance', 'Consultoria', 'Aula particular')),
+    ('Rendimentos', 1, 5, 600, ('Rendimento da poupança', 'Dividendos', 'Juros CDB')),
+)
+EXPENSE_PROFILES = (
+    ('Mercado', 8, 15, 900, ('Supermercado', 'Feira', 'Padaria', 'Hortifruti')),
+    ('Transporte', 6, 5, 350, ('Combustível', 'Aplicativo de transporte', 'Estacionamento', 'Metrô')),
+    ('Alimentação', 7, 12, 250, ('Restaurante', 'Lanchonete', 'Delivery', 'Café')),
+    ('Moradia', 2, 80, 4500, ('Aluguel', 'Condomínio', 'Conta de luz', 'Conta de água', 'Internet')),
+    ('Saúde', 2, 20, 1200, ('Farmácia', 'Consulta médica', 'Plano de saúde', 'Exames')),
+    ('Lazer', 3, 20, 800, ('Cinema', 'Streaming', 'Show', 'Viagem')),
+    ('Educação', 1, 50, 2000, ('Mensalidade', 'Curso online', 'Livros')),
+)
+INCOME_SHARE = 0.15
+
+
+@dataclass
+class SyntheticDataset:
+    users: list = field(default_factory=list)
+    accounts: int = 0
+    categories: int = 0
+    transactions: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return self.transactions / self.elapsed
+
+
+def _weighted(profiles, weight_index):
+    return [profile[weight_index] for profile in profiles]
+
+
+def _amount(rng, minimum, maximum):
+    # Log-uniform: many small purchases, few large ones.
+    value = minimum * (maximum / minimum) ** rng.random()
+    return Decimal(str(round(value, 2))).quantize(Decimal('0.01'))
+
+
+def generate_synthetic_data(
+    users=1,
+    transactions=10_000,
+    seed=42,
+    years=3,
+    end_date=None,
+    email_prefix='synthetic',
+    password=DEFAULT_PASSWORD,
+    batch_size=5000,
+):
+    """Create ``users`` users with accounts, categories and ``transactions`` rows split among them.
+
+    The same ``seed`` and ``end_date`` always produce the same data. Rows are
+    written with ``bulk_create``, so balances, balance snapshots and rollups are
+    rebuilt once at the end instead of per row.
+    """
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    end_date = end_date or timezone.localdate()
+    span = max(1, int(years * 365))
+    hashed_password = make_password(password)
+    dataset = SyntheticDataset()
+    user_model = get_user_model()
+
+    with db_transaction.atomic():
+        for index in range(users):
+            user = user_model(email=f'{email_prefix}-{seed}-{index}@example.com', password=hashed_password)
+            user.save()
+            dataset.users.append(user)
+
+            accounts = [
+                Account.objects.create(
+                    user=user,
+                    name=name,
+                    type=account_type,
+                    initial_balance=Decimal(rng.randint(0, 500000)) / 100,
+                )
+                for name, account_type, _ in ACCOUNT_PROFILES
+            ]
+            account_weights = _weighted(ACCOUNT_PROFILES, 2)
+            profiles = []
+            for category_type, category_profiles in (
+                (CategoryType.INCOME, INCOME_PROFILES),
+                (CategoryType.EXPENSE, EXPENSE_PROFILES),
+            ):
+                categories = [
+                    Category.objects.create(
+                        user=user,
+                        name=profile[0],
+                        type=category_type,
+                        color=CATEGORY_COLOR_CHOICES[position % len(CATEGORY_COLOR_CHOICES)][0],
+                    )
+                    for position, profile in enumerate(category_profiles)
+                ]
+                profiles.append((categories, category_profiles, _weighted(category_profiles, 1)))
+            dataset.accounts += len(accounts)
+            dataset.categories += sum(len(categories) for categories, _, _ in profiles)
+
+            rows = transactions // users + (1 if index < transactions % users else 0)
+            batch = []
+            for _ in range(rows):
+                is_income = rng.random() < INCOME_SHARE
+                categories, category_profiles, weights = profiles[0 if is_income else 1]
+                position = rng.choices(range(len(categories)), weights=weights)[0]
+                _, _, minimum, maximum, descriptions = category_profiles[position]
+                batch.append(
+                    Transaction(
+                        user=user,
+                        account=rng.choices(accounts, weights=account_weights)[0],
+                        # Roughly one row in twenty is left without a category.
+                        category=None if rng.random() < 0.05 else categories[position],
+                        amount=_amount(rng, minimum, maximum),
+                        description=rng.choice(descriptions),
+                        transaction_date=end_date - timedelta(days=rng.randrange(span)),
+                        type=TransactionType.INCOME if is_income else TransactionType.EXPENSE,
+                    )
+                )
+                if len(batch) >= batch_size:
+                    Transaction.objects.bulk_create(batch)
+                    dataset.transactions += len(batch)
+                    batch = []
+            if batch:
+                Transaction.objects.bulk_create(batch)
+                dataset.transactions += len(batch)
+
+        rebuild_monthly_summaries(users=dataset.users, batch_size=batch_size)
+        for account_id in Account.objects.filter(user__in=dataset.users).values_list('pk', flat=True):
+            recalculate_account_balance(account_id)
+        rebuild_balance_snapshots(Account.objects.filter(user__in=dataset.users), batch_size=batch_size)
+        for user in dataset.users:
+            bump_data_version(user.pk)
+    dataset.elapsed = time.perf_counter() - started
+    return dataset
@@ -1,13 +1,47 @@
-from datetime import date
+import json
+import tempfile
+import warnings
+from datetime import date, timedelta
 from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
+from unittest.mock import patch
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache, caches
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.db.models import Sum
+from django.template import engines
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from whitenoise.middleware import WhiteNoiseMiddleware
 
+from accounts.balances import find_drifted_accounts
 from accounts.models import Account, AccountType
 from categories.models import CATEGORY_COLOR_CHOICES, Category, CategoryType
-from transactions.models import Transaction, TransactionType
+from core.cache import bump_data_version, get_cache_stats, get_data_version, reset_cache_stats
+from core.checks import check_shared_cache
+from core.metrics import LatencyHistogram, request_summaries, reset_request_metrics
+from core.reports import REPORT_GROUP_FIELDS, build_report, fold_report_rows
+from core.startup import StartupProfile, parse_importtime, profile_startup
+from core.synthetic import generate_synthetic_data
+from core.views import BALANCE_HISTORY_MONTHS, MONTH_LABELS, DashboardDataMixin
+from core.warmup import template_names, warm_templates
+from transactions.dates import month_bounds
+from transactions.models import MonthlySummary, Transaction, TransactionType
+from transactions.pagination import NEXT, PREVIOUS, encode_cursor
+from transactions.postgres import grouping_set_totals
+from transactions.rollups import grouped_totals
+
+REPORT_QUERIES = 3 if connection.vendor == 'postgresql' else 4
+# Session + user, the three dashboard plan queries and the recent transactions.
+DASHBOARD_COLD_QUERIES = 6
 
 
 class CoreViewTests(TestCase):
@@ -66,7 +100,8 @@ class CoreViewTests(TestCase):
         self.assertIn('recent_transactions', response.context)
         self.assertEqual(response.context['category_counts']['income'], 1)
         self.assertEqual(response.context['category_counts']['expense'], 1)
-        monthly_chart = response.context['dashboard_monthly_chart']
+        self.assertContains(response, reverse('dashboard_chart', args=['monthly']))
+        monthly_chart = self.client.get(reverse('dashboard_chart', args=['monthly'])).json()
         self.assertEqual(len(monthly_chart['labels']), 6)
         self.assertAlmostEqual(monthly_chart['income'][-1], 1000.00)
         self.assertAlmostEqual(monthly_chart['expense'][-1], 250.00)
@@ -94,3 +129,802 @@ class CoreViewTests(TestCase):
         self.assertIn('Categoria;Salário;Receita;1000.00;0.00;1000.00', payload)
         self.assertIn('Categoria;Alimentação;Despesa;0.00;250.00;-250.00', payload)
         self.assertIn('Conta;Conta Corrente;Conta corrente;1000.00;250.00;750.00', payload)
+
+    def test_ledger_export_streams_raw_transactions(self):
+        other_user = get_user_model().objects.create_user(email='ledger-other@example.com', password='testpass123')
+        other_account = Account.objects.create(user=other_user, name='Outra', type=AccountType.CHECKING)
+        Transaction.objects.create(
+            user=other_user,
+            account=other_account,
+            amount=Decimal('5.00'),
+            transaction_date=date.today(),
+            type=TransactionType.EXPENSE,
+            description='Não deve aparecer',
+        )
+        self.client.force_login(self.user)
+        query = {'data_inicio': date.today().isoformat(), 'data_fim': date.today().isoformat()}
+        response = self.client.get(reverse('reports_ledger_export'), query)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        today_stamp = date.today().strftime('%Y%m%d')
+        self.assertIn(f'lancamentos-{today_stamp}-{today_stamp}.csv', response['Content-Disposition'])
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(lines[0], 'Data;Descrição;Tipo;Valor;Conta;Categoria')
+        today_label = date.today().strftime('%d/%m/%Y')
+        self.assertEqual(
+            lines[1:],
+            [
+                f'{today_label};;Receita;1000.00;Conta Corrente;Salário',
+                f'{today_label};;Despesa;250.00;Conta Corrente;Alimentação',
+            ],
+        )
+
+
+def create_report_transactions(cls):
+    """Two accounts, two categories and five transactions spread over January-March 2024."""
+    cls.user = get_user_model().objects.create_user(email='engine@example.com', password='testpass123')
+    cls.checking = Account.objects.create(user=cls.user, name='Conta Corrente', type=AccountType.CHECKING)
+    cls.savings = Account.objects.create(user=cls.user, name='Poupança', type=AccountType.SAVINGS)
+    cls.salary = Category.objects.create(user=cls.user, name='Salário', type=CategoryType.INCOME)
+    cls.food = Category.objects.create(user=cls.user, name='Alimentação', type=CategoryType.EXPENSE)
+    rows = [
+        (cls.checking, cls.salary, '3000.00', date(2024, 1, 5), TransactionType.INCOME),
+        (cls.checking, cls.food, '120.00', date(2024, 1, 20), TransactionType.EXPENSE),
+        (cls.savings, cls.food, '80.00', date(2024, 2, 10), TransactionType.EXPENSE),
+        (cls.savings, None, '15.00', date(2024, 3, 2), TransactionType.EXPENSE),
+        (cls.checking, cls.salary, '3000.00', date(2024, 3, 5), TransactionType.INCOME),
+    ]
+    for account, category, amount, transaction_date, transaction_type in rows:
+        Transaction.objects.create(
+            user=cls.user,
+            account=account,
+            category=category,
+            amount=Decimal(amount),
+            transaction_date=transaction_date,
+            type=transaction_type,
+        )
+
+
+class ReportEngineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_report_transactions(cls)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_report_sections_are_folded_from_one_result_set(self):
+        report = build_report(self.user, date(2024, 1, 10), date(2024, 3, 3))
+        self.assertEqual(report.total_income, Decimal('0.00'))
+        self.assertEqual(report.total_expense, Decimal('215.00'))
+        self.assertEqual(report.transaction_count, 3)
+        self.assertEqual(
+            [(item['name'], item['expense']) for item in report.category_summary],
+            [('Alimentação', Decimal('200.00')), ('Sem categoria', Decimal('15.00'))],
+        )
+        self.assertEqual(
+            [(item['name'], item['balance']) for item in report.account_summary],
+            [('Conta Corrente', Decimal('-120.00')), ('Poupança', Decimal('-95.00'))],
+        )
+        self.assertEqual(report.category_chart['labels'], ['Alimentação', 'Sem categoria'])
+        self.assertEqual(report.account_chart['expense'], [120.0, 95.0])
+
+    def test_reports_view_query_count(self):
+        self.client.force_login(self.user)
+        params = {'data_inicio': '2024-01-10', 'data_fim': '2024-03-03'}
+        # Session + user, then one rollup query for February and one raw query
+        # for the partial edge months; PostgreSQL merges both into one query.
+        with self.assertNumQueries(REPORT_QUERIES):
+            response = self.client.get(reverse('reports'), params)
+        self.assertTrue(response.context['has_transactions'])
+
+    def test_reports_export_query_count(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(REPORT_QUERIES):
+            response = self.client.get(reverse('reports_export'), {'data_inicio': '2024-01-10', 'data_fim': '2024-03-03'})
+        self.assertIn('Conta;Poupança;Poupança;0.00;95.00;-95.00', response.content.decode('utf-8'))
+
+
+class AsyncViewTests(TestCase):
+    DASHBOARD_KEYS = (
+        'total_balance',
+        'monthly_income',
+        'monthly_expense',
+        'monthly_net_balance',
+        'category_counts',
+    )
+    REPORT_KEYS = (
+        'total_income',
+        'total_expense',
+        'balance',
+        'category_summary',
+        'account_summary',
+        'category_chart_url',
+        'account_chart_url',
+        'export_url',
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        create_report_transactions(cls)
+        Transaction.objects.create(
+            user=cls.user,
+            account=cls.checking,
+            category=cls.food,
+            amount=Decimal('42.00'),
+            transaction_date=timezone.localdate(),
+            type=TransactionType.EXPENSE,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_async_dashboard_matches_sync_dashboard(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('dashboard_async'))
+        self.assertEqual(response.status_code, 200)
+        await sync_to_async(cache.clear)()
+        expected = await sync_to_async(self.sync_context)(reverse('dashboard'))
+        for key in self.DASHBOARD_KEYS:
+            self.assertEqual(response.context[key], expected[key], key)
+        self.assertEqual(response.context['monthly_expense'], Decimal('42.00'))
+
+    async def test_async_reports_match_sync_reports(self):
+        await self.async_client.aforce_login(self.user)
+        params = {'data_inicio': '2024-01-10', 'data_fim': '2024-03-03'}
+        response = await self.async_client.get(reverse('reports_async'), params)
+        self.assertEqual(response.status_code, 200)
+        expected = await sync_to_async(self.sync_context)(reverse('reports'), params)
+        for key in self.REPORT_KEYS:
+            self.assertEqual(response.context[key], expected[key], key)
+        self.assertEqual(response.context['total_expense'], Decimal('215.00'))
+
+    async def test_async_views_require_authentication(self):
+        for name in ('dashboard_async', 'reports_async'):
+            response = await self.async_client.get(reverse(name))
+            self.assertEqual(response.status_code, 302)
+            self.assertTrue(response.url.startswith(reverse('users:login')))
+
+    async def test_async_views_are_timed_by_request_metrics(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('reports_async'))
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
+
+    def sync_context(self, url, params=None):
+        self.client.force_login(self.user)
+        return self.client.get(url, params).context
+
+
+class ChartDataTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_report_transactions(cls)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_dashboard_page_leaves_charts_to_the_endpoints(self):
+        with self.assertNumQueries(DASHBOARD_COLD_QUERIES):
+            response = self.client.get(reverse('dashboard'))
+        self.assertNotIn('dashboard_monthly_chart', response.context)
+        for chart in ('categories', 'accounts', 'monthly'):
+            self.assertContains(response, reverse('dashboard_chart', args=[chart]))
+
+    def test_charts_revalidate_against_the_data_version(self):
+        url = reverse('dashboard_chart', args=['accounts'])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['labels'], ['Conta Corrente', 'Poupança'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        etag = response['ETag']
+
+        # Session + user only: the ETag is checked before anything is built.
+        with self.assertNumQueries(2):
+            response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        response = self.client.get(url, headers={'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(response.status_code, 304)
+
+        Account.objects.create(user=self.user, name='Carteira', type=AccountType.CHECKING)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Carteira', response.json()['labels'])
+
+    def test_etag_changes_with_the_release(self):
+        url = reverse('dashboard_chart', args=['accounts'])
+        with self.settings(RELEASE='2024.1'):
+            etag = self.client.get(url)['ETag']
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+        with self.settings(RELEASE='2024.2'):
+            response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_report_charts_reuse_the_report_built_by_the_page(self):
+        response = self.client.get(reverse('reports'), {'data_inicio': '2024-01-10', 'data_fim': '2024-03-03'})
+        with self.assertNumQueries(2):
+            data = self.client.get(response.context['category_chart_url']).json()
+        self.assertEqual(data['labels'], ['Alimentação', 'Sem categoria'])
+        data = self.client.get(response.context['account_chart_url']).json()
+        self.assertEqual(data['expense'], [120.0, 95.0])
+
+    def test_report_chart_etag_depends_on_the_period(self):
+        url = reverse('reports_chart', args=['categories'])
+        january = self.client.get(url, {'data_inicio': '2024-01-01', 'data_fim': '2024-01-31'})
+        response = self.client.get(
+            url, {'data_inicio': '2024-02-01', 'data_fim': '2024-02-29'}, headers={'If-None-Match': january['ETag']}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['expense'], [80.0])
+
+    def test_unknown_chart_and_anonymous_requests(self):
+        self.assertEqual(self.client.get(reverse('dashboard_chart', args=['unknown'])).status_code, 404)
+        self.client.logout()
+        response = self.client.get(reverse('reports_chart', args=['categories']))
+        self.assertEqual(response.status_code, 302)
+
+
+class DashboardQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_report_transactions(cls)
+        cls.travel = Category.objects.create(user=cls.user, name='Viagem', type=CategoryType.EXPENSE, color='bg-red-500')
+        today = timezone.localdate()
+        last_month = (today.replace(day=1) - timedelta(days=1)).replace(day=5)
+        rows = [
+            (cls.checking, cls.food, '42.00', today, TransactionType.EXPENSE),
+            (cls.savings, cls.travel, '300.00', today, TransactionType.EXPENSE),
+            (cls.checking, cls.salary, '2500.00', today, TransactionType.INCOME),
+            (cls.checking, cls.travel, '99.00', last_month, TransactionType.EXPENSE),
+        ]
+        for account, category, amount, transaction_date, transaction_type in rows:
+            Transaction.objects.create(
+                user=cls.user,
+                account=account,
+                category=category,
+                amount=Decimal(amount),
+                transaction_date=transaction_date,
+                type=transaction_type,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_page_and_charts_share_one_fixed_plan(self):
+        # Session + user, accounts, categories, the grouped six-month query and the
+        # recent transactions.
+        with self.assertNumQueries(DASHBOARD_COLD_QUERIES):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['total_balance'], Decimal('7844.00'))
+        self.assertEqual(response.context['category_counts'], {'income': 1, 'expense': 2})
+        today = timezone.localdate()
+        month_totals = grouped_totals(self.user, *month_bounds(today.year, today.month))[0]
+        self.assertEqual(response.context['monthly_income'], month_totals['total_income'])
+        self.assertEqual(response.context['monthly_expense'], Decimal('342.00'))
+        self.assertEqual(response.context['monthly_net_balance'], Decimal('2158.00'))
+
+        # Session + user only: every chart reads the plan the page built.
+        with self.assertNumQueries(2):
+            categories = self.client.get(reverse('dashboard_chart', args=['categories'])).json()
+        self.assertEqual(categories['labels'], ['Viagem', 'Alimentação'])
+        self.assertEqual(categories['values'], [300.0, 42.0])
+        self.assertEqual(categories['colors'][0], '#EF4444')
+        with self.assertNumQueries(2):
+            accounts = self.client.get(reverse('dashboard_chart', args=['accounts'])).json()
+        self.assertEqual(accounts['labels'], ['Conta Corrente', 'Poupança'])
+        with self.assertNumQueries(2):
+            monthly = self.client.get(reverse('dashboard_chart', args=['monthly'])).json()
+        self.assertEqual(monthly['income'][-1], 2500.0)
+        self.assertEqual(monthly['expense'][-2:], [99.0, 342.0])
+
+    def test_page_leaves_chart_payloads_to_the_chart_endpoint(self):
+        chart_payload = DashboardDataMixin.chart_payload
+        with patch.object(DashboardDataMixin, 'chart_payload', autospec=True, side_effect=chart_payload) as shaped:
+            self.client.get(reverse('dashboard'))
+            self.assertEqual(shaped.call_count, 0)
+            for chart in ('categories', 'accounts', 'monthly'):
+                self.client.get(reverse('dashboard_chart', args=[chart]))
+        self.assertEqual(shaped.call_count, 1)
+
+    def test_balance_chart_reads_month_end_snapshots(self):
+        # Session + user, the accounts' initial balances and the month-end snapshots;
+        # the page's plan is neither built nor read.
+        with self.assertNumQueries(4):
+            balance = self.client.get(reverse('dashboard_chart', args=['balance'])).json()
+        today = timezone.localdate()
+        months = (today.year - 2024) * 12 + today.month
+        self.assertEqual(len(balance['labels']), min(months, BALANCE_HISTORY_MONTHS))
+        self.assertEqual(balance['labels'][-1], f'{MONTH_LABELS[today.month - 1]}/{today.year}')
+        self.assertEqual(balance['balances'][-2:], [5686.0, 7844.0])
+        if months <= BALANCE_HISTORY_MONTHS:
+            self.assertEqual(balance['balances'][:3], [2880.0, 2800.0, 5785.0])
+        with self.assertNumQueries(2):
+            self.client.get(reverse('dashboard_chart', args=['balance']))
+
+    def test_chart_requested_first_builds_the_plan(self):
+        # Session + user and the three plan queries; no recent transactions.
+        with self.assertNumQueries(5):
+            self.client.get(reverse('dashboard_chart', args=['monthly']))
+        with self.assertNumQueries(DASHBOARD_COLD_QUERIES - 3):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['monthly_expense'], Decimal('342.00'))
+
+    def test_more_than_six_categories_are_listed_from_the_same_fetch(self):
+        for index in range(5):
+            Category.objects.create(user=self.user, name=f'Extra {index}', type=CategoryType.EXPENSE)
+        with self.assertNumQueries(DASHBOARD_COLD_QUERIES):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['category_counts'], {'income': 1, 'expense': 7})
+        self.assertContains(response, 'Exibindo primeiras categorias')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'GROUPING SETS paths only run on PostgreSQL.')
+class PostgresAggregationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_report_transactions(cls)
+
+    def test_grouping_sets_match_portable_totals(self):
+        start, end = date(2024, 1, 10), date(2024, 3, 3)
+        fields = ('account__name', 'category__name')
+        groups = grouping_set_totals(self.user, start, end, {'total': (), 'pairs': fields})
+        self.assertEqual(groups['total'], grouped_totals(self.user, start, end))
+
+        def key(row):
+            return tuple(str(row[field]) for field in fields)
+
+        self.assertEqual(
+            sorted(groups['pairs'], key=key),
+            sorted(grouped_totals(self.user, start, end, fields=fields), key=key),
+        )
+
+    def test_report_matches_folded_rows(self):
+        start, end = date(2024, 1, 10), date(2024, 3, 3)
+        report = build_report(self.user, start, end)
+        folded = fold_report_rows(grouped_totals(self.user, start, end, fields=REPORT_GROUP_FIELDS))
+        self.assertEqual(report, folded)
+
+
+class DashboardCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='cache@example.com', password='testpass123')
+        cls.account = Account.objects.create(
+            user=cls.user,
+            name='Conta Corrente',
+            initial_balance=Decimal('100.00'),
+            type=AccountType.CHECKING,
+        )
+
+    def setUp(self):
+        reset_cache_stats('dashboard')
+        self.client.force_login(self.user)
+
+    def _dashboard_queries(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('dashboard'))
+        return response, len(captured.captured_queries)
+
+    def assertCachedUntilWrite(self):
+        _, cold_queries = self._dashboard_queries()
+        response, warm_queries = self._dashboard_queries()
+        self.assertLess(warm_queries, cold_queries)
+        self.assertEqual(response.context['total_balance'], Decimal('100.00'))
+        self.assertEqual(get_cache_stats('dashboard'), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            amount=Decimal('40.00'),
+            transaction_date=date.today(),
+            type=TransactionType.EXPENSE,
+        )
+        response, _ = self._dashboard_queries()
+        self.assertEqual(response.context['total_balance'], Decimal('60.00'))
+        self.assertEqual(response.context['monthly_expense'], Decimal('40.00'))
+        self.assertEqual(get_cache_stats('dashboard')['misses'], 2)
+
+    def test_locmem_backend(self):
+        self.assertCachedUntilWrite()
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            with override_settings(CACHES={'default': backend}):
+                self.assertCachedUntilWrite()
+
+    def test_database_backend(self):
+        backend = {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'test_finanpy_cache'}
+        with override_settings(CACHES={'default': backend}):
+            call_command('createcachetable', verbosity=0)
+            self.assertCachedUntilWrite()
+
+    def test_category_and_account_writes_bump_version(self):
+        version = get_data_version(self.user.pk)
+        category = Category.objects.create(user=self.user, name='Lazer', type=CategoryType.EXPENSE)
+        self.assertGreater(get_data_version(self.user.pk), version)
+        version = get_data_version(self.user.pk)
+        category.delete()
+        self.assertGreater(get_data_version(self.user.pk), version)
+        version = get_data_version(self.user.pk)
+        self.account.name = 'Conta Principal'
+        self.account.save()
+        self.assertGreater(get_data_version(self.user.pk), version)
+
+    def test_versions_survive_cache_eviction(self):
+        version = get_data_version(self.user.pk)
+        cache.clear()
+        self.assertGreater(get_data_version(self.user.pk), version)
+
+    def test_conditional_get_sees_versions_bumped_by_another_process(self):
+        with tempfile.TemporaryDirectory() as location:
+            backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            with override_settings(CACHES={'default': backend}):
+                etag = self.client.get(reverse('accounts:list'))['ETag']
+                response = self.client.get(reverse('accounts:list'), headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 304)
+
+                # Another worker's cache client, sharing only the backend's storage.
+                other_worker = caches.create_connection('default')
+                with patch('core.cache.cache', other_worker):
+                    bump_data_version(self.user.pk)
+                response = self.client.get(reverse('accounts:list'), headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_deploy_check_requires_a_shared_cache(self):
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'finanpy_cache'}}
+        with override_settings(DEBUG=False, CACHES=locmem):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['core.E001'])
+        with override_settings(DEBUG=True, CACHES=locmem):
+            self.assertEqual(check_shared_cache(None), [])
+        with override_settings(DEBUG=False, CACHES=shared):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_report_transactions(cls)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_warm_dashboard_skips_the_fragment_querysets(self):
+        self.client.get(reverse('dashboard'))
+        # Session and user only: summary and all three fragments come from the cache.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Poupança')
+
+        Transaction.objects.create(
+            user=self.user,
+            account=self.savings,
+            amount=Decimal('9.90'),
+            description='Padaria',
+            transaction_date=timezone.localdate(),
+            type=TransactionType.EXPENSE,
+        )
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Padaria')
+
+    def test_report_tables_are_cached_per_period(self):
+        params = {'data_inicio': '2024-01-10', 'data_fim': '2024-03-03'}
+        self.client.get(reverse('reports'), params)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('reports'), params)
+        self.assertContains(response, 'R$ 200,00')
+
+        response = self.client.get(reverse('reports'), {'data_inicio': '2024-02-01', 'data_fim': '2024-02-29'})
+        self.assertContains(response, 'R$ 80,00')
+        self.assertNotContains(response, 'R$ 200,00')
+
+
+class TemplateWarmupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_report_transactions(cls)
+
+    def setUp(self):
+        self.loader = engines['django'].engine.template_loaders[0]
+        self.loader.reset()
+
+    def test_warmup_compiles_every_app_template(self):
+        count, _ = warm_templates()
+        self.assertEqual(count, len(template_names()))
+        self.assertIn('base.html', self.loader.get_template_cache)
+        self.assertIn('transactions/transaction_list.html', self.loader.get_template_cache)
+
+    def test_first_render_after_warmup_loads_nothing(self):
+        warm_templates()
+        warmed = set(self.loader.get_template_cache)
+        self.client.force_login(self.user)
+        for url in (reverse('dashboard'), reverse('reports'), reverse('transactions:list')):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(set(self.loader.get_template_cache), warmed)
+
+
+class StartupProfileTests(TestCase):
+    def test_parse_importtime(self):
+        records = parse_importtime(
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     django.utils.functional\n'
+            'import time:       300 |        420 |   django.conf\n'
+            'import time:        80 |         80 | csv\n'
+        )
+        self.assertEqual(
+            [(record.module, record.self_us, record.cumulative_us, record.depth) for record in records],
+            [('django.utils.functional', 120, 120, 2), ('django.conf', 300, 420, 1), ('csv', 80, 80, 0)],
+        )
+        profile = StartupProfile(boot_ms=1.0, records=records, modules=[])
+        self.assertEqual(profile.by_package(), [('django', 0.42, 2), ('csv', 0.08, 1)])
+
+    def test_worker_boot_leaves_heavy_modules_for_first_use(self):
+        profile = profile_startup('wsgi')
+        self.assertIn('core.wsgi', {record.module for record in profile.records})
+        # Apps and models are loaded with importlib.import_module(); the tracer must see them too.
+        self.assertIn('transactions.models', {record.module for record in profile.records})
+        for module in ('PIL', 'core.views', 'core.reports', 'transactions.importers', 'django.contrib.auth.admin'):
+            self.assertNotIn(module, profile.modules)
+
+    def test_command_fails_over_budget(self):
+        with self.assertRaisesMessage(CommandError, 'over budget'):
+            call_command('profile_startup', target='setup', runs=1, budget_ms=0, stdout=StringIO())
+
+    def test_command_reports_a_failed_boot(self):
+        with patch.dict('os.environ', {'DJANGO_SETTINGS_MODULE': 'core.missing_settings'}):
+            with self.assertRaisesMessage(CommandError, "No module named 'core.missing_settings'"):
+                call_command('profile_startup', target='setup', runs=1, stdout=StringIO())
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific.')
+class TransactionQueryPlanTests(TestCase):
+    tables = ('transactions_transaction', 'transactions_monthlysummary')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='plan@example.com', password='testpass123')
+        # Several accounts and categories, so the statistics show them as selective.
+        accounts = [
+            Account.objects.create(user=cls.user, name=f'Conta {index}', type=AccountType.CHECKING) for index in range(4)
+        ]
+        categories = [
+            Category.objects.create(user=cls.user, name=f'Mercado {index}', type=CategoryType.EXPENSE)
+            for index in range(4)
+        ]
+        cls.account, cls.category = accounts[0], categories[0]
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=cls.user,
+                account=account,
+                category=category,
+                amount=Decimal('10.00'),
+                transaction_date=date(2024, month, 1),
+                type=TransactionType.EXPENSE,
+            )
+            for month in range(1, 13)
+            for account in accounts
+            for category in categories
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertTransactionsNeverScanned(self, url, params=None):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        checked = 0
+        with connection.cursor() as cursor:
+            for query in captured.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or not any(f'"{table}"' in sql for table in self.tables):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                details = [row[-1] for row in cursor.fetchall()]
+                scans = [detail for detail in details if detail.startswith(tuple(f'SCAN {table}' for table in self.tables))]
+                self.assertEqual(scans, [], f'Full table scan in: {sql}\n{details}')
+                checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_dashboard_queries_use_indexes(self):
+        self.assertTransactionsNeverScanned(reverse('dashboard'))
+
+    def test_transaction_list_queries_use_indexes(self):
+        self.assertTransactionsNeverScanned(reverse('transactions:list'), {'month': '3', 'year': '2024'})
+
+    def test_transaction_list_filter_queries_use_indexes(self):
+        for params in (
+            {'account': self.account.pk, 'type': 'expense'},
+            {'category': self.category.pk, 'data_inicio': '2024-02-10', 'data_fim': '2024-07-20'},
+            {'account': self.account.pk, 'category': self.category.pk, 'year': '2024', 'min_amount': '5', 'max_amount': '50'},
+        ):
+            with self.subTest(params=params):
+                self.assertTransactionsNeverScanned(reverse('transactions:list'), params)
+
+    def test_transaction_list_cursor_queries_use_indexes(self):
+        middle = Transaction.objects.filter(user=self.user, transaction_date=date(2024, 6, 1)).earliest('pk')
+        for direction in (NEXT, PREVIOUS):
+            self.assertTransactionsNeverScanned(
+                reverse('transactions:list'), {'cursor': encode_cursor(middle, direction)}
+            )
+
+    def test_reports_queries_use_indexes(self):
+        self.assertTransactionsNeverScanned(reverse('reports'), {'data_inicio': '2024-01-15', 'data_fim': '2024-06-20'})
+
+
+class SyntheticDataTests(TestCase):
+    def _generate(self, **options):
+        defaults = {'users': 2, 'transactions': 301, 'seed': 7, 'years': 1, 'end_date': date(2024, 12, 31)}
+        defaults.update(options)
+        return generate_synthetic_data(**defaults)
+
+    def test_generates_consistent_dataset(self):
+        dataset = self._generate()
+        self.assertEqual(dataset.transactions, 301)
+        self.assertEqual(Transaction.objects.filter(user__in=dataset.users).count(), 301)
+        self.assertEqual(
+            sorted(Transaction.objects.filter(user=user).count() for user in dataset.users), [150, 151]
+        )
+        self.assertEqual(find_drifted_accounts(Account.objects.filter(user__in=dataset.users)), [])
+        rollup_count = MonthlySummary.objects.filter(user__in=dataset.users).aggregate(total=Sum('transaction_count'))
+        self.assertEqual(rollup_count['total'], 301)
+        first_date = Transaction.objects.filter(user__in=dataset.users).earliest('transaction_date').transaction_date
+        self.assertGreaterEqual(first_date, date(2024, 1, 1))
+
+    def test_same_seed_reproduces_rows(self):
+        def rows(dataset):
+            return list(
+                Transaction.objects.filter(user=dataset.users[0])
+                .order_by('pk')
+                .values_list('transaction_date', 'amount', 'type', 'account__name', 'category__name', 'description')
+            )
+
+        first = self._generate(email_prefix='first')
+        second = self._generate(email_prefix='second')
+        third = self._generate(email_prefix='third', seed=8)
+        self.assertEqual(rows(first), rows(second))
+        self.assertNotEqual(rows(first), rows(third))
+
+    def test_command_refuses_to_reuse_emails(self):
+        output = StringIO()
+        call_command('generate_synthetic_data', transactions=20, seed=3, stdout=output)
+        self.assertIn('20 transaction(s)', output.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('generate_synthetic_data', transactions=20, seed=3, stdout=StringIO())
+
+
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='metrics@example.com', password='testpass123')
+        cls.staff = get_user_model().objects.create_user(
+            email='staff@example.com', password='testpass123', is_staff=True
+        )
+        Account.objects.create(user=cls.user, name='Conta', type=AccountType.CHECKING)
+
+    def setUp(self):
+        reset_request_metrics()
+
+    def test_server_timing_and_log_line_report_queries(self):
+        self.client.force_login(self.user)
+        with self.assertLogs('finanpy.requests', level='INFO') as logs:
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(reverse('accounts:list'))
+        timing = response['Server-Timing']
+        self.assertIn('app;dur=', timing)
+        self.assertIn(f'desc="{len(captured.captured_queries)} queries"', timing)
+        payload = logs.records[0].request_metrics
+        self.assertEqual(payload['view'], 'accounts:list')
+        self.assertEqual(payload['status'], 200)
+        self.assertEqual(payload['queries'], len(captured.captured_queries))
+        self.assertLessEqual(len(payload['slowest_queries']), 3)
+        self.assertIn('"view": "accounts:list"', logs.output[0])
+
+    def test_histograms_are_grouped_by_url_name(self):
+        self.client.force_login(self.user)
+        for _ in range(3):
+            self.client.get(reverse('accounts:list'))
+        self.client.get(reverse('dashboard'))
+        summaries = request_summaries()
+        self.assertEqual(summaries['accounts:list']['count'], 3)
+        self.assertEqual(summaries['dashboard']['count'], 1)
+        self.assertGreater(summaries['dashboard']['mean_queries'], 0)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('dashboard'))
+        self.assertEqual(self.client.get(reverse('request_metrics')).status_code, 403)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('request_metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('p95 ms', response.content.decode())
+        self.assertIn('dashboard', response.content.decode())
+        data = self.client.get(reverse('request_metrics'), {'format': 'json'}).json()
+        self.assertEqual(data['dashboard']['count'], 1)
+
+    def test_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        for duration in range(1, 101):
+            histogram.add(float(duration))
+        summary = histogram.summary()
+        self.assertEqual(summary['count'], 100)
+        self.assertEqual(summary['max_ms'], 100.0)
+        # Buckets are ~19% wide, so percentiles land within one bucket of the truth.
+        self.assertGreaterEqual(summary['p50_ms'], 50)
+        self.assertLess(summary['p50_ms'], 50 * 1.2)
+        self.assertGreaterEqual(summary['p99_ms'], 99)
+        self.assertLessEqual(summary['p99_ms'], 100)
+
+
+class HealthCheckTests(TestCase):
+    def test_reports_ok_without_login(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('health_check'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok', 'database': 'ok'})
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_reports_unavailable_when_the_database_fails(self):
+        def fail(execute, sql, params, many, context):
+            raise DatabaseError('connection refused')
+
+        with connection.execute_wrapper(fail):
+            response = self.client.get(reverse('health_check'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['status'], 'unavailable')
+
+
+class StaticFilesTests(TestCase):
+    def test_whitenoise_serves_static_files_before_the_session_middleware(self):
+        middleware = settings.MIDDLEWARE
+        self.assertLess(
+            middleware.index('whitenoise.middleware.WhiteNoiseMiddleware'),
+            middleware.index('django.contrib.sessions.middleware.SessionMiddleware'),
+        )
+
+    def test_collectstatic_writes_hashed_compressed_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            storages = {
+                **settings.STORAGES,
+                'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+            }
+            with override_settings(STATIC_ROOT=directory, STORAGES=storages):
+                call_command('collectstatic', interactive=False, verbosity=0)
+                manifest = json.loads((Path(directory) / 'staticfiles.json').read_text())
+            hashed = manifest['paths']['js/finanpy-charts.js']
+            self.assertNotEqual(hashed, 'js/finanpy-charts.js')
+            self.assertTrue((Path(directory) / f'{hashed}.gz').exists())
+
+    def test_missing_static_root_does_not_warn(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(STATIC_ROOT=Path(directory) / 'missing'), warnings.catch_warnings():
+                warnings.simplefilter('error')
+                WhiteNoiseMiddleware(lambda request: None)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite tuning only applies to the sqlite3 backend.')
+class SQLiteTuningTests(TestCase):
+    def test_connection_applies_configured_pragmas(self):
+        # journal_mode and mmap_size do not apply to the in-memory test database.
+        expected = {
+            'synchronous': 1,
+            'cache_size': int(settings.SQLITE_PRAGMAS['cache_size']),
+            'temp_store': 2,
+            'busy_timeout': settings.SQLITE_BUSY_TIMEOUT_MS,
+        }
+        with connection.cursor() as cursor:
+            for pragma, value in expected.items():
+                cursor.execute(f'PRAGMA {pragma}')
+                self.assertEqual(cursor.fetchone()[0], value, pragma)
+
+    def test_writes_take_the_lock_up_front(self):
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+        self.assertTrue(settings.DATABASES['default']['CONN_HEALTH_CHECKS'])
@@ -17,14 +17,35 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
-from .views import DashboardView, HomeView, ReportsExportView, ReportsView
+from .views import (
+    AsyncDashboardView,
+    AsyncReportsView,
+    DashboardChartView,
+    DashboardView,
+    HealthCheckView,
+    HomeView,
+    ReportsChartView,
+    ReportsExportView,
+    ReportsLedgerExportView,
+    ReportsView,
+    RequestMetricsView,
+)
+
+admin.autodiscover()
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', HomeView.as_view(), name='home'),
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('dashboard/charts/<slug:chart>/', DashboardChartView.as_view(), name='dashboard_chart'),
+    path('async/dashboard/', AsyncDashboardView.as_view(), name='dashboard_async'),
     path('reports/export/', ReportsExportView.as_view(), name='reports_export'),
+    path('reports/export/ledger/', ReportsLedgerExportView.as_view(), name='reports_ledger_export'),
     path('reports/', ReportsView.as_view(), name='reports'),
+    path('reports/charts/<slug:chart>/', ReportsChartView.as_view(), name='reports_chart'),
+    path('async/reports/', AsyncReportsView.as_view(), name='reports_async'),
+    path('ops/metrics/', RequestMetricsView.as_view(), name='request_metrics'),
+    path('healthz/', HealthCheckView.as_view(), name='health_check'),
     path('accounts/', include(('accounts.urls', 'accounts'), namespace='accounts')),
     path('categories/', include(('categories.urls', 'categories'), namespace='categories')),
     path('transactions/', include(('transactions.urls', 'transactions'), namespace='transactions')),
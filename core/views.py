@@ -1,41 +1,31 @@
+import asyncio
+import csv
 from datetime import date, datetime
 from decimal import Decimal
 
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpResponse
+from asgiref.sync import sync_to_async
+from django.contrib.auth.mixins import AccessMixin, LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db import DatabaseError, connection
 from django.db.models import Q, Sum
-from django.db.models.functions import Coalesce, TruncMonth
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.cache import add_never_cache_headers
+from django.utils.http import urlencode
 from django.urls import reverse
 from django.views.generic import TemplateView, View
 
-import csv
-
-from accounts.models import Account, AccountType
+from accounts.balances import month_end_balances
+from accounts.models import Account
 from categories.models import Category, CategoryType
-from transactions.models import Transaction, TransactionType
-
-TAILWIND_TO_HEX = {
-    'bg-indigo-500': '#6366F1',
-    'bg-blue-500': '#3B82F6',
-    'bg-purple-500': '#8B5CF6',
-    'bg-green-500': '#22C55E',
-    'bg-emerald-500': '#10B981',
-    'bg-amber-500': '#F59E0B',
-    'bg-pink-500': '#EC4899',
-    'bg-red-500': '#EF4444',
-}
-
-FALLBACK_COLORS = [
-    '#6366F1',
-    '#3B82F6',
-    '#8B5CF6',
-    '#22C55E',
-    '#10B981',
-    '#F59E0B',
-    '#EC4899',
-    '#EF4444',
-]
+from transactions.dates import shift_month
+from transactions.models import MonthlySummary, Transaction, TransactionType
+
+from .cache import aget_or_build, fragment_cache_context, get_or_build
+from .conditional import ConditionalGetMixin
+from .metrics import format_summary_table, request_summaries
+from .reports import abuild_report, build_report, resolve_chart_color
 
 MONTH_LABELS = [
     'Jan',
@@ -54,81 +44,52 @@ MONTH_LABELS = [
 
 EXPENSE_TARGET_RATIO = Decimal('0.80')
 
+BALANCE_HISTORY_MONTHS = 60
 
-def resolve_chart_color(tailwind_class, index):
-    color = None
-    if tailwind_class:
-        color = TAILWIND_TO_HEX.get(tailwind_class)
-    if not color:
-        color = FALLBACK_COLORS[index % len(FALLBACK_COLORS)]
-    return color
+LEDGER_CHUNK_SIZE = 2000
 
 
 class HomeView(TemplateView):
     template_name = 'core/home.html'
 
 
-class DashboardView(LoginRequiredMixin, TemplateView):
+class AsyncLoginRequiredMixin(AccessMixin):
+    """``LoginRequiredMixin`` for async views: the user is loaded with ``request.auser()``."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), self.get_login_url(), self.get_redirect_field_name())
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class DashboardDataMixin:
+    """Dashboard figures built by a fixed plan of three queries.
+
+    One accounts fetch feeds the list, the total balance and the per-account chart;
+    one categories fetch feeds the list and the per-type counts; one grouped
+    ``MonthlySummary`` query over the last six months yields the current-month
+    totals, the expense breakdown by category and the six-month series. The
+    result is cached per user and data version, so the page and its chart
+    endpoints share it; the chart payloads are only shaped from it when a chart
+    endpoint asks, so a cold page render never waits on them. The
+    balance-over-time chart is only fetched by its endpoint and read from the
+    account balance snapshots instead.
+    """
+
     template_name = 'core/dashboard.html'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        accounts = Account.objects.filter(user=self.request.user).order_by('name')
-        total_balance = accounts.aggregate(
-            total=Coalesce(Sum('current_balance'), Decimal('0.00'))
-        )['total']
-        categories = Category.objects.filter(user=self.request.user).order_by('name')
-        category_counts = {
-            'income': categories.filter(type=CategoryType.INCOME).count(),
-            'expense': categories.filter(type=CategoryType.EXPENSE).count(),
-        }
-        today = timezone.localdate()
-        monthly_transactions = Transaction.objects.filter(
-            user=self.request.user,
-            transaction_date__year=today.year,
-            transaction_date__month=today.month,
-        )
-        monthly_totals = monthly_transactions.aggregate(
-            total_income=Coalesce(
-                Sum('amount', filter=Q(type=TransactionType.INCOME)),
-                Decimal('0.00'),
+    def get_lazy_context(self, user):
+        """Querysets evaluated by the template while it renders."""
+        return {
+            'recent_transactions': (
+                Transaction.objects.filter(user=user)
+                .select_related('account', 'category')
+                .order_by('-transaction_date', '-created_at')[:10]
             ),
-            total_expense=Coalesce(
-                Sum('amount', filter=Q(type=TransactionType.EXPENSE)),
-                Decimal('0.00'),
-            ),
-        )
-        monthly_net_balance = (
-            monthly_totals['total_income'] - monthly_totals['total_expense']
-        )
-        recent_transactions = (
-            Transaction.objects.filter(user=self.request.user)
-            .select_related('account', 'category')
-            .order_by('-transaction_date', '-created_at')[:10]
-        )
-        expense_by_category = (
-            monthly_transactions.filter(type=TransactionType.EXPENSE)
-            .values('category__name', 'category__color')
-            .annotate(
-                total=Coalesce(Sum('amount'), Decimal('0.00')),
-            )
-            .order_by('-total')
-        )
-        category_labels = []
-        category_values = []
-        category_colors = []
-        for index, item in enumerate(expense_by_category):
-            total = item['total']
-            if total <= 0:
-                continue
-            category_labels.append(item['category__name'] or 'Sem categoria')
-            category_values.append(float(total))
-            category_colors.append(resolve_chart_color(item['category__color'], index))
-        account_labels = []
-        account_balances = []
-        for account in accounts:
-            account_labels.append(account.name)
-            account_balances.append(float(account.current_balance))
+        }
+
+    def get_month_starts(self, today):
         current_month_start = today.replace(day=1)
         month_starts = []
         year_cursor = current_month_start.year
@@ -140,39 +101,151 @@ class DashboardView(LoginRequiredMixin, TemplateView):
                 month_cursor = 12
                 year_cursor -= 1
         month_starts.sort()
-        monthly_series = (
-            Transaction.objects.filter(
-                user=self.request.user,
-                transaction_date__gte=month_starts[0],
+        return month_starts
+
+    def monthly_category_queryset(self, user, first_month, last_month):
+        return (
+            MonthlySummary.objects.filter(
+                user=user,
+                month__range=(first_month, last_month),
+                transaction_count__gt=0,
             )
-            .annotate(month=TruncMonth('transaction_date'))
-            .values('month')
+            .values('month', 'category__name', 'category__color')
             .annotate(
                 total_income=Coalesce(
-                    Sum('amount', filter=Q(type=TransactionType.INCOME)),
+                    Sum('total_amount', filter=Q(type=TransactionType.INCOME)),
                     Decimal('0.00'),
                 ),
                 total_expense=Coalesce(
-                    Sum('amount', filter=Q(type=TransactionType.EXPENSE)),
+                    Sum('total_amount', filter=Q(type=TransactionType.EXPENSE)),
                     Decimal('0.00'),
                 ),
             )
-            .order_by('month')
+            .order_by()
+        )
+
+    def get_plan_querysets(self, user, month_starts):
+        return (
+            Account.objects.filter(user=user).order_by('name'),
+            Category.objects.filter(user=user).order_by('name'),
+            self.monthly_category_queryset(user, month_starts[0], month_starts[-1]),
         )
+
+    def build_dashboard(self, user, today):
+        month_starts = self.get_month_starts(today)
+        accounts, categories, monthly_rows = (list(queryset) for queryset in self.get_plan_querysets(user, month_starts))
+        return self.dashboard_payload(month_starts, accounts, categories, monthly_rows)
+
+    async def abuild_dashboard(self, user, today):
+        """Async ``build_dashboard``: the three queries are awaited together."""
+        month_starts = self.get_month_starts(today)
+        accounts, categories, monthly_rows = await asyncio.gather(
+            *(self.alist(queryset) for queryset in self.get_plan_querysets(user, month_starts))
+        )
+        return self.dashboard_payload(month_starts, accounts, categories, monthly_rows)
+
+    def get_dashboard(self, user, today):
+        return get_or_build('dashboard', user.pk, lambda: self.build_dashboard(user, today), today)
+
+    async def aget_dashboard(self, user, today):
+        return await aget_or_build('dashboard', user.pk, lambda: self.abuild_dashboard(user, today), today)
+
+    def get_dashboard_charts(self, user, today):
+        return get_or_build(
+            'dashboard_charts',
+            user.pk,
+            lambda: self.chart_payload(*self.get_dashboard(user, today)['chart_inputs']),
+            today,
+        )
+
+    def build_balance_history(self, user, today):
+        """Month-end total balance of the user's accounts over the last ``BALANCE_HISTORY_MONTHS``.
+
+        Read from the daily balance snapshots (one row per account and month),
+        never from the transactions themselves.
+        """
+        balances = dict(Account.objects.filter(user=user).values_list('pk', 'initial_balance'))
+        rows = month_end_balances(user, today)
+        labels = []
+        totals = []
+        if not rows:
+            return {'labels': labels, 'balances': totals}
+        first_month = max(rows[0][1], shift_month(today.replace(day=1), 1 - BALANCE_HISTORY_MONTHS))
+        month = rows[0][1]
+        position = 0
+        while month <= today:
+            while position < len(rows) and rows[position][1] == month:
+                account_id, _, balance = rows[position]
+                balances[account_id] = balance
+                position += 1
+            if month >= first_month:
+                labels.append(f"{MONTH_LABELS[month.month - 1]}/{month.year}")
+                totals.append(float(sum(balances.values(), Decimal('0.00'))))
+            month = shift_month(month, 1)
+        return {'labels': labels, 'balances': totals}
+
+    def get_balance_history(self, user, today):
+        return get_or_build('balance_history', user.pk, lambda: self.build_balance_history(user, today), today)
+
+    @staticmethod
+    async def alist(queryset):
+        return [row async for row in queryset]
+
+    def dashboard_payload(self, month_starts, accounts, categories, monthly_rows):
+        """``{'page': template context, 'chart_inputs': chart_payload() arguments}``."""
+        current_month_start = month_starts[-1]
+        series_map = {}
+        expense_by_category = []
+        for row in monthly_rows:
+            totals = series_map.setdefault(
+                row['month'], {'total_income': Decimal('0.00'), 'total_expense': Decimal('0.00')}
+            )
+            totals['total_income'] += row['total_income']
+            totals['total_expense'] += row['total_expense']
+            if row['month'] == current_month_start:
+                expense_by_category.append(row)
+        monthly_totals = series_map.get(
+            current_month_start, {'total_income': Decimal('0.00'), 'total_expense': Decimal('0.00')}
+        )
+        category_types = [category.type for category in categories]
+        account_rows = [(account.name, account.current_balance) for account in accounts]
+        return {
+            'page': {
+                'accounts': accounts,
+                'categories': categories,
+                'total_balance': sum((balance for _, balance in account_rows), Decimal('0.00')),
+                'category_counts': {
+                    'income': category_types.count(CategoryType.INCOME),
+                    'expense': category_types.count(CategoryType.EXPENSE),
+                },
+                'monthly_income': monthly_totals['total_income'],
+                'monthly_expense': monthly_totals['total_expense'],
+                'monthly_net_balance': monthly_totals['total_income'] - monthly_totals['total_expense'],
+            },
+            'chart_inputs': (month_starts, account_rows, expense_by_category, series_map),
+        }
+
+    def chart_payload(self, month_starts, account_rows, expense_by_category, series_map):
+        expense_by_category = sorted(expense_by_category, key=lambda item: item['total_expense'], reverse=True)
+        category_labels = []
+        category_values = []
+        category_colors = []
+        for index, item in enumerate(expense_by_category):
+            total = item['total_expense']
+            if total <= 0:
+                continue
+            category_labels.append(item['category__name'] or 'Sem categoria')
+            category_values.append(float(total))
+            category_colors.append(resolve_chart_color(item['category__color'], index))
+        account_labels = []
+        account_balances = []
+        for name, balance in account_rows:
+            account_labels.append(name)
+            account_balances.append(float(balance))
         monthly_income_points = []
         monthly_expense_points = []
         monthly_target_points = []
         month_labels = []
-        series_map = {}
-        for item in monthly_series:
-            month_value = item['month']
-            if isinstance(month_value, datetime):
-                month_key = month_value.date()
-            elif isinstance(month_value, date):
-                month_key = month_value
-            else:
-                month_key = datetime.strptime(str(month_value), '%Y-%m-%d').date()
-            series_map[month_key] = item
         for month_start in month_starts:
             summary = series_map.get(month_start, None)
             income_value = summary['total_income'] if summary else Decimal('0.00')
@@ -182,36 +255,76 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             monthly_income_points.append(float(income_value))
             monthly_expense_points.append(float(expense_value))
             monthly_target_points.append(float(target_value))
-        context.update(
-            {
-                'accounts': accounts,
-                'total_balance': total_balance,
-                'categories': categories,
-                'category_counts': category_counts,
-                'recent_transactions': recent_transactions,
-                'monthly_income': monthly_totals['total_income'],
-                'monthly_expense': monthly_totals['total_expense'],
-                'monthly_net_balance': monthly_net_balance,
-                'dashboard_category_chart': {
-                    'labels': category_labels,
-                    'values': category_values,
-                    'colors': category_colors,
-                },
-                'dashboard_account_chart': {
-                    'labels': account_labels,
-                    'balances': account_balances,
-                },
-                'dashboard_monthly_chart': {
-                    'labels': month_labels,
-                    'income': monthly_income_points,
-                    'expense': monthly_expense_points,
-                    'target': monthly_target_points,
-                },
-            }
-        )
+        return {
+            'categories': {
+                'labels': category_labels,
+                'values': category_values,
+                'colors': category_colors,
+            },
+            'accounts': {
+                'labels': account_labels,
+                'balances': account_balances,
+            },
+            'monthly': {
+                'labels': month_labels,
+                'income': monthly_income_points,
+                'expense': monthly_expense_points,
+                'target': monthly_target_points,
+            },
+        }
+
+
+class DashboardView(LoginRequiredMixin, DashboardDataMixin, TemplateView):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        context.update(self.get_lazy_context(user))
+        context.update(fragment_cache_context(user.pk))
+        context.update(self.get_dashboard(user, timezone.localdate())['page'])
         return context
 
 
+class AsyncDashboardView(AsyncLoginRequiredMixin, DashboardDataMixin, TemplateView):
+    """``DashboardView`` for ASGI servers, sharing its cache entries."""
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        context = self.get_context_data(**kwargs)
+        context.update(self.get_lazy_context(user))
+        context.update(await sync_to_async(fragment_cache_context)(user.pk))
+        context.update((await self.aget_dashboard(user, timezone.localdate()))['page'])
+        return self.render_to_response(context)
+
+
+class ChartDataView(LoginRequiredMixin, ConditionalGetMixin, View):
+    """JSON payload of one chart, fetched by the page after it renders."""
+
+    charts = ()
+
+    def get_key_parts(self):
+        return ()
+
+    def get_chart_data(self, chart, *key_parts):
+        raise NotImplementedError
+
+    def get(self, request, chart):
+        if chart not in self.charts:
+            raise Http404
+        return JsonResponse(self.get_chart_data(chart, *self.get_key_parts()))
+
+
+class DashboardChartView(DashboardDataMixin, ChartDataView):
+    charts = ('categories', 'accounts', 'monthly', 'balance')
+
+    def get_key_parts(self):
+        return (timezone.localdate(),)
+
+    def get_chart_data(self, chart, today):
+        if chart == 'balance':
+            return self.get_balance_history(self.request.user, today)
+        return self.get_dashboard_charts(self.request.user, today)[chart]
+
+
 class ReportDataMixin:
     def get_date_range(self):
         today = timezone.localdate()
@@ -240,173 +353,82 @@ class ReportDataMixin:
 
         return start_date, end_date
 
-    def get_transactions_queryset(self, start_date, end_date):
-        return (
-            Transaction.objects.filter(
-                user=self.request.user,
-                transaction_date__range=(start_date, end_date),
-            )
-            .select_related('account', 'category')
-        )
+    def get_report(self, start_date, end_date):
+        user = self.request.user
+        return get_or_build('report', user.pk, lambda: build_report(user, start_date, end_date), start_date, end_date)
 
-    def get_summary_totals(self, transactions):
-        summary = transactions.aggregate(
-            total_income=Coalesce(
-                Sum('amount', filter=Q(type=TransactionType.INCOME)),
-                Decimal('0.00'),
-            ),
-            total_expense=Coalesce(
-                Sum('amount', filter=Q(type=TransactionType.EXPENSE)),
-                Decimal('0.00'),
-            ),
+    async def aget_report(self, user, start_date, end_date):
+        return await aget_or_build(
+            'report', user.pk, lambda: abuild_report(user, start_date, end_date), start_date, end_date
         )
-        balance = summary['total_income'] - summary['total_expense']
-        return summary, balance
 
-    def build_category_summary(self, transactions):
-        raw_category_summary = (
-            transactions.values(
-                'category__id',
-                'category__name',
-                'category__color',
-                'category__type',
-            )
-            .annotate(
-                total_income=Coalesce(
-                    Sum('amount', filter=Q(type=TransactionType.INCOME)),
-                    Decimal('0.00'),
-                ),
-                total_expense=Coalesce(
-                    Sum('amount', filter=Q(type=TransactionType.EXPENSE)),
-                    Decimal('0.00'),
-                ),
-            )
-            .order_by('-total_income', '-total_expense')
-        )
-        category_type_map = dict(CategoryType.choices)
-        category_summary = []
-        for index, item in enumerate(raw_category_summary):
-            income = item['total_income']
-            expense = item['total_expense']
-            category_summary.append(
-                {
-                    'name': item['category__name'] or 'Sem categoria',
-                    'type_label': category_type_map.get(item['category__type'], 'Não classificada'),
-                    'color_class': item['category__color'],
-                    'income': income,
-                    'expense': expense,
-                    'balance': income - expense,
-                    'chart_color': resolve_chart_color(item['category__color'], index),
-                }
-            )
-        return category_summary
-
-    def build_account_summary(self, transactions):
-        raw_account_summary = (
-            transactions.values(
-                'account__id',
-                'account__name',
-                'account__type',
-            )
-            .annotate(
-                total_income=Coalesce(
-                    Sum('amount', filter=Q(type=TransactionType.INCOME)),
-                    Decimal('0.00'),
-                ),
-                total_expense=Coalesce(
-                    Sum('amount', filter=Q(type=TransactionType.EXPENSE)),
-                    Decimal('0.00'),
-                ),
-            )
-            .order_by('account__name')
-        )
-        account_type_map = dict(AccountType.choices)
-        account_summary = []
-        for item in raw_account_summary:
-            income = item['total_income']
-            expense = item['total_expense']
-            account_summary.append(
-                {
-                    'name': item['account__name'],
-                    'type_label': account_type_map.get(item['account__type'], 'Conta'),
-                    'income': income,
-                    'expense': expense,
-                    'balance': income - expense,
-                }
-            )
-        return account_summary
-
-    def build_chart_payloads(self, category_summary, account_summary):
-        category_chart_data = {
-            'labels': [],
-            'income': [],
-            'expense': [],
-            'colors': [],
-        }
-        for item in category_summary:
-            if item['income'] > 0 or item['expense'] > 0:
-                category_chart_data['labels'].append(item['name'])
-                category_chart_data['income'].append(float(item['income']))
-                category_chart_data['expense'].append(float(item['expense']))
-                category_chart_data['colors'].append(item['chart_color'])
-
-        account_chart_data = {
-            'labels': [],
-            'income': [],
-            'expense': [],
-            'balance': [],
+    def get_report_context(self, start_date, end_date, report):
+        export_url = reverse('reports_export')
+        ledger_export_url = reverse('reports_ledger_export')
+        if self.request.GET:
+            export_url = f'{export_url}?{self.request.GET.urlencode()}'
+            ledger_export_url = f'{ledger_export_url}?{self.request.GET.urlencode()}'
+        # The normalized range, so the charts read the report cached by this page.
+        chart_query = urlencode({'data_inicio': start_date.isoformat(), 'data_fim': end_date.isoformat()})
+        return {
+            'data_inicio': start_date.isoformat(),
+            'data_fim': end_date.isoformat(),
+            'total_income': report.total_income,
+            'total_expense': report.total_expense,
+            'balance': report.balance,
+            'category_summary': report.category_summary,
+            'account_summary': report.account_summary,
+            'has_transactions': report.has_transactions,
+            'category_chart_url': f'{reverse("reports_chart", args=["categories"])}?{chart_query}',
+            'account_chart_url': f'{reverse("reports_chart", args=["accounts"])}?{chart_query}',
+            'export_url': export_url,
+            'ledger_export_url': ledger_export_url,
         }
-        for item in account_summary:
-            if item['income'] > 0 or item['expense'] > 0:
-                account_chart_data['labels'].append(item['name'])
-                account_chart_data['income'].append(float(item['income']))
-                account_chart_data['expense'].append(float(item['expense']))
-                account_chart_data['balance'].append(float(item['balance']))
-        return category_chart_data, account_chart_data
 
 
 class ReportsView(LoginRequiredMixin, ReportDataMixin, TemplateView):
     template_name = 'core/reports.html'
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         start_date, end_date = self.get_date_range()
+        context.update(self.get_report_context(start_date, end_date, self.get_report(start_date, end_date)))
+        context.update(fragment_cache_context(self.request.user.pk))
+        return context
 
-        transactions = self.get_transactions_queryset(start_date, end_date)
-        summary, balance = self.get_summary_totals(transactions)
-        category_summary = self.build_category_summary(transactions)
-        account_summary = self.build_account_summary(transactions)
-        category_chart_data, account_chart_data = self.build_chart_payloads(
-            category_summary, account_summary
-        )
-        export_url = reverse('reports_export')
-        if self.request.GET:
-            export_url = f'{export_url}?{self.request.GET.urlencode()}'
 
-        context.update(
-            {
-                'data_inicio': start_date.isoformat(),
-                'data_fim': end_date.isoformat(),
-                'total_income': summary['total_income'],
-                'total_expense': summary['total_expense'],
-                'balance': balance,
-                'category_summary': category_summary,
-                'account_summary': account_summary,
-                'has_transactions': transactions.exists(),
-                'reports_category_chart': category_chart_data,
-                'reports_account_chart': account_chart_data,
-                'export_url': export_url,
-            }
-        )
-        return context
+class AsyncReportsView(AsyncLoginRequiredMixin, ReportDataMixin, TemplateView):
+    """``ReportsView`` for ASGI servers; the rollup and edge-month queries run concurrently."""
+
+    template_name = 'core/reports.html'
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        start_date, end_date = self.get_date_range()
+        report = await self.aget_report(user, start_date, end_date)
+        context = self.get_context_data(**kwargs)
+        context.update(self.get_report_context(start_date, end_date, report))
+        context.update(await sync_to_async(fragment_cache_context)(user.pk))
+        return self.render_to_response(context)
+
+
+class ReportsChartView(ReportDataMixin, ChartDataView):
+    charts = ('categories', 'accounts')
+
+    def get_key_parts(self):
+        return self.get_date_range()
+
+    def get_chart_data(self, chart, start_date, end_date):
+        report = self.get_report(start_date, end_date)
+        return report.category_chart if chart == 'categories' else report.account_chart
 
 
 class ReportsExportView(LoginRequiredMixin, ReportDataMixin, View):
     def get(self, request, *args, **kwargs):
         start_date, end_date = self.get_date_range()
-        transactions = self.get_transactions_queryset(start_date, end_date)
-        summary, balance = self.get_summary_totals(transactions)
-        category_summary = self.build_category_summary(transactions)
-        account_summary = self.build_account_summary(transactions)
+        report = self.get_report(start_date, end_date)
+        category_summary = report.category_summary
+        account_summary = report.account_summary
 
         response = HttpResponse(content_type='text/csv')
         filename = f'relatorio-financeiro-{start_date.strftime("%Y%m%d")}-{end_date.strftime("%Y%m%d")}.csv'
@@ -419,9 +441,9 @@ class ReportsExportView(LoginRequiredMixin, ReportDataMixin, View):
                 '',
                 '',
                 '',
-                f'Receitas: {summary["total_income"]:.2f}',
-                f'Despesas: {summary["total_expense"]:.2f}',
-                f'Saldo: {balance:.2f}',
+                f'Receitas: {report.total_income:.2f}',
+                f'Despesas: {report.total_expense:.2f}',
+                f'Saldo: {report.balance:.2f}',
             ]
         )
         writer.writerow([])
@@ -458,3 +480,79 @@ class ReportsExportView(LoginRequiredMixin, ReportDataMixin, View):
             writer.writerow(['Sem dados', 'Não há movimentações no período filtrado', '', '', '', ''])
 
         return response
+
+
+class Echo:
+    """Pseudo-buffer whose ``write`` hands the row back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+class ReportsLedgerExportView(LoginRequiredMixin, ReportDataMixin, View):
+    def get(self, request, *args, **kwargs):
+        start_date, end_date = self.get_date_range()
+        rows = (
+            Transaction.objects.filter(
+                user=request.user,
+                transaction_date__range=(start_date, end_date),
+            )
+            .order_by('transaction_date', 'created_at', 'id')
+            .values_list(
+                'transaction_date',
+                'description',
+                'type',
+                'amount',
+                'account__name',
+                'category__name',
+            )
+            .iterator(chunk_size=LEDGER_CHUNK_SIZE)
+        )
+        filename = f'lancamentos-{start_date.strftime("%Y%m%d")}-{end_date.strftime("%Y%m%d")}.csv'
+        response = StreamingHttpResponse(self.stream_rows(rows), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def stream_rows(self, rows):
+        writer = csv.writer(Echo(), delimiter=';')
+        type_labels = dict(TransactionType.choices)
+        yield writer.writerow(['Data', 'Descrição', 'Tipo', 'Valor', 'Conta', 'Categoria'])
+        for transaction_date, description, transaction_type, amount, account_name, category_name in rows:
+            yield writer.writerow(
+                [
+                    transaction_date.strftime('%d/%m/%Y'),
+                    description,
+                    type_labels.get(transaction_type, transaction_type),
+                    f'{amount:.2f}',
+                    account_name,
+                    category_name or 'Sem categoria',
+                ]
+            )
+
+
+class RequestMetricsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Latency percentiles per URL name, as collected by ``RequestMetricsMiddleware`` in this process."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        summaries = request_summaries()
+        if request.GET.get('format') == 'json':
+            return JsonResponse(summaries)
+        return HttpResponse(format_summary_table(summaries), content_type='text/plain; charset=utf-8')
+
+
+class HealthCheckView(View):
+    """Liveness and readiness probe for load balancers: 200 while the database answers, 503 otherwise."""
+
+    def get(self, request, *args, **kwargs):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError:
+            response = JsonResponse({'status': 'unavailable', 'database': 'error'}, status=503)
+        else:
+            response = JsonResponse({'status': 'ok', 'database': 'ok'})
+        add_never_cache_headers(response)
+        return response
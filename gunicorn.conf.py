@@ -0,0 +1,48 @@
+"""Gunicorn settings for production, picked up automatically from the working directory:
+
+    gunicorn core.wsgi:application
+
+Every value can be overridden with an environment variable (listed next to it)
+or on the command line.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', f'0.0.0.0:{os.getenv("PORT", "8000")}')
+
+# The usual (2 x CPUs) + 1: enough processes to keep every core busy while
+# others wait on the database.
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+# `uvicorn_worker.UvicornWorker` (pip install uvicorn-worker) serves core.asgi:application instead.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+
+# Import Django, the URLconf and the templates once in the master (core.wsgi
+# warms the template cache) and fork the workers from it, so they start
+# ready and share those pages copy-on-write.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+
+# Recycle workers after a number of requests, with jitter so they do not all
+# restart together, to bound slow memory growth.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+# A worker silent for `timeout` seconds is killed; on reload or SIGTERM workers
+# get `graceful_timeout` seconds to finish in-flight requests.
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# An empty GUNICORN_ACCESS_LOG turns the access log off.
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Database connections must never be shared across processes. Nothing opens
+    # one while the app is preloaded, but drop any the master may hold to be safe.
+    if preload_app:
+        from django.db import connections
+
+        connections.close_all()
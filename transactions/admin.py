@@ -1,11 +1,36 @@
 from django.contrib import admin
 
-from .models import Transaction
+from .models import MonthlySummary, RecurringTransaction, Transaction
+from .search import search_filter
 
 
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ('transaction_date', 'description', 'account', 'category', 'type', 'amount')
     list_filter = ('type', 'transaction_date', 'account')
-    search_fields = ('description', 'account__name', 'category__name', 'user__email')
+    search_fields = ('account__name', 'category__name', 'user__email')
     ordering = ('-transaction_date',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Descriptions go through the full-text index instead of an icontains scan.
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            results |= queryset.filter(search_filter(search_term))
+        return results, may_have_duplicates
+
+
+@admin.register(MonthlySummary)
+class MonthlySummaryAdmin(admin.ModelAdmin):
+    list_display = ('month', 'user', 'account', 'category', 'type', 'total_amount', 'transaction_count')
+    list_filter = ('type', 'month')
+    search_fields = ('user__email', 'account__name', 'category__name')
+    ordering = ('-month',)
+
+
+@admin.register(RecurringTransaction)
+class RecurringTransactionAdmin(admin.ModelAdmin):
+    list_display = ('description', 'user', 'account', 'type', 'amount', 'frequency', 'interval', 'next_occurrence', 'is_active')
+    list_filter = ('is_active', 'frequency', 'type')
+    search_fields = ('description', 'user__email', 'account__name')
+    readonly_fields = ('occurrence_count', 'last_occurrence', 'next_occurrence')
+    ordering = ('next_occurrence',)
@@ -0,0 +1,23 @@
+import calendar
+from datetime import date
+
+
+def month_bounds(year, month):
+    """Return the first and last day of a month as an inclusive date range.
+
+    Filtering with ``transaction_date__range`` keeps the lookup sargable, unlike
+    ``__month`` which wraps the column in a date-extract function.
+    """
+    last_day = calendar.monthrange(year, month)[1]
+    return date(year, month, 1), date(year, month, last_day)
+
+
+def shift_month(month_start, months):
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def add_months(day, months):
+    """``day`` moved by ``months``, clamped to the end of shorter months (Jan 31 + 1 -> Feb 28/29)."""
+    month_start = shift_month(day.replace(day=1), months)
+    return month_start.replace(day=min(day.day, calendar.monthrange(month_start.year, month_start.month)[1]))
@@ -0,0 +1,191 @@
+"""Filters of the transaction list.
+
+``TransactionFilterForm`` validates the query string and ``TransactionFilter``
+holds the result: it builds the list queryset and the income/expense totals of
+the filter. Invalid values are dropped rather than failing the page, as the
+month/year filter always did.
+"""
+import hashlib
+from dataclasses import astuple, dataclass
+from datetime import date
+from decimal import Decimal
+
+from django import forms
+from django.db.models import Q
+
+from accounts.models import Account
+from categories.models import Category
+
+from .dates import month_bounds
+from .models import Transaction, TransactionType
+from .rollups import grouped_totals, transaction_totals
+from .search import search_filter, search_terms
+
+FIELD_CLASS = 'mt-1 w-full bg-gray-900 border border-gray-700 rounded-md px-3 py-2 text-white'
+
+MONTH_CHOICES = [
+    (1, 'Janeiro'),
+    (2, 'Fevereiro'),
+    (3, 'Março'),
+    (4, 'Abril'),
+    (5, 'Maio'),
+    (6, 'Junho'),
+    (7, 'Julho'),
+    (8, 'Agosto'),
+    (9, 'Setembro'),
+    (10, 'Outubro'),
+    (11, 'Novembro'),
+    (12, 'Dezembro'),
+]
+
+
+@dataclass(frozen=True)
+class TransactionFilter:
+    """Validated filters of the transaction list; ``None`` and ``''`` match anything."""
+
+    start_date: date | None = None
+    end_date: date | None = None
+    type: str = ''
+    min_amount: Decimal | None = None
+    max_amount: Decimal | None = None
+    account_id: int | None = None
+    category_id: int | None = None
+    text: str = ''
+
+    @property
+    def is_empty(self):
+        return not any(value not in (None, '') for value in astuple(self))
+
+    @property
+    def uses_rollups(self):
+        """Whether the totals can come from ``MonthlySummary``, which has no amounts or descriptions."""
+        return self.min_amount is None and self.max_amount is None and not self.text
+
+    def rollup_condition(self):
+        """Filters that exist on both ``Transaction`` and ``MonthlySummary``."""
+        condition = Q()
+        if self.type:
+            condition &= Q(type=self.type)
+        if self.account_id:
+            condition &= Q(account_id=self.account_id)
+        if self.category_id:
+            condition &= Q(category_id=self.category_id)
+        return condition
+
+    def condition(self, user=None):
+        """``Q`` of every filter; ``user`` scopes the text search index lookup."""
+        condition = Q()
+        if self.start_date:
+            condition &= Q(transaction_date__gte=self.start_date)
+        if self.end_date:
+            condition &= Q(transaction_date__lte=self.end_date)
+        condition &= self.rollup_condition()
+        if self.min_amount is not None:
+            condition &= Q(amount__gte=self.min_amount)
+        if self.max_amount is not None:
+            condition &= Q(amount__lte=self.max_amount)
+        if self.text:
+            condition &= search_filter(self.text, user=user)
+        return condition
+
+    def apply(self, queryset, user=None):
+        """Filter ``queryset``, which should already be limited to ``user``.
+
+        In list order, ``transaction_account_date_idx`` or
+        ``transaction_category_date_idx`` serve the account and category
+        filters and ``transaction_user_date_idx`` everything else; the other
+        conditions are checked on the rows the index walks.
+        """
+        return queryset.filter(self.condition(user))
+
+    def totals(self, user):
+        """``total_income``, ``total_expense`` and ``transaction_count`` of the filter.
+
+        Without amount or text filters, whole months are summed from the
+        rollups and only the edge months touch raw transactions, so the cost
+        does not grow with the length of the range.
+        """
+        if self.uses_rollups:
+            return grouped_totals(user, self.start_date, self.end_date, condition=self.rollup_condition())[0]
+        return transaction_totals(self.apply(Transaction.objects.filter(user=user), user))
+
+    def cache_key(self):
+        """Equal for filters that select the same rows, e.g. texts ``"Ação"`` and ``"acao"``."""
+        if self.is_empty:
+            return 'all'
+        values = [
+            self.start_date or '',
+            self.end_date or '',
+            self.type,
+            '' if self.min_amount is None else self.min_amount.normalize(),
+            '' if self.max_amount is None else self.max_amount.normalize(),
+            self.account_id or '',
+            self.category_id or '',
+            ' '.join(search_terms(self.text)),
+        ]
+        return hashlib.sha256('|'.join(map(str, values)).encode()).hexdigest()[:24]
+
+
+class TransactionFilterForm(forms.Form):
+    month = forms.TypedChoiceField(
+        label='Mês', required=False, coerce=int, empty_value=None, choices=[('', 'Todos')] + MONTH_CHOICES
+    )
+    year = forms.IntegerField(label='Ano', required=False, min_value=1900, max_value=9999)
+    data_inicio = forms.DateField(label='De', required=False)
+    data_fim = forms.DateField(label='Até', required=False)
+    type = forms.ChoiceField(label='Tipo', required=False, choices=[('', 'Todos')] + TransactionType.choices)
+    account = forms.ModelChoiceField(label='Conta', required=False, queryset=Account.objects.none(), empty_label='Todas')
+    category = forms.ModelChoiceField(
+        label='Categoria', required=False, queryset=Category.objects.none(), empty_label='Todas'
+    )
+    min_amount = forms.DecimalField(label='Valor mínimo', required=False, min_value=0, max_digits=12, decimal_places=2)
+    max_amount = forms.DecimalField(label='Valor máximo', required=False, min_value=0, max_digits=12, decimal_places=2)
+    q = forms.CharField(label='Descrição', required=False, max_length=255)
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['account'].queryset = Account.objects.filter(user=user).order_by('name')
+        self.fields['category'].queryset = Category.objects.filter(user=user).order_by('name')
+        self.fields['year'].widget.attrs['placeholder'] = 'Todos'
+        for name in ('data_inicio', 'data_fim'):
+            self.fields[name].widget.input_type = 'date'
+        for field in self.fields.values():
+            field.widget.attrs['class'] = FIELD_CLASS
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date, end_date = cleaned_data.get('data_inicio'), cleaned_data.get('data_fim')
+        if start_date and end_date and start_date > end_date:
+            self.add_error('data_fim', 'A data final deve ser posterior à inicial.')
+        min_amount, max_amount = cleaned_data.get('min_amount'), cleaned_data.get('max_amount')
+        if min_amount is not None and max_amount is not None and min_amount > max_amount:
+            self.add_error('max_amount', 'O valor máximo deve ser maior que o mínimo.')
+        return cleaned_data
+
+    def period(self):
+        """``(start, end)`` from the month and year, narrowed by explicit dates."""
+        data = self.cleaned_data
+        start_date, end_date = data.get('data_inicio'), data.get('data_fim')
+        year, month = data.get('year'), data.get('month')
+        if year:
+            month_start, month_end = month_bounds(year, month) if month else (date(year, 1, 1), date(year, 12, 31))
+            start_date = max(start_date, month_start) if start_date else month_start
+            end_date = min(end_date, month_end) if end_date else month_end
+        return start_date, end_date
+
+    def to_filter(self):
+        """The ``TransactionFilter`` of the valid fields; invalid ones are left out."""
+        self.is_valid()
+        data = self.cleaned_data
+        start_date, end_date = self.period()
+        account, category = data.get('account'), data.get('category')
+        return TransactionFilter(
+            start_date=start_date,
+            end_date=end_date,
+            type=data.get('type') or '',
+            min_amount=data.get('min_amount'),
+            max_amount=data.get('max_amount'),
+            account_id=account.pk if account else None,
+            category_id=category.pk if category else None,
+            text=(data.get('q') or '').strip(),
+        )
@@ -1,14 +1,47 @@
+from datetime import timedelta
 from decimal import Decimal
 
 from django import forms
+from django.utils import timezone
 
 from accounts.models import Account
 from categories.models import Category, CategoryType
 
-from .models import Transaction, TransactionType
+from .models import RecurringTransaction, Transaction, TransactionType
 
+INPUT_CLASS = 'w-full bg-gray-800 border border-gray-700 rounded-md px-3 py-2 text-white'
 
-class TransactionForm(forms.ModelForm):
+
+class TransactionFieldsMixin:
+    """Account/category choices of the user and the checks shared by one-off and recurring transactions."""
+
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        if self.user:
+            self.fields['account'].queryset = Account.objects.filter(user=self.user).order_by('name')
+            self.fields['category'].queryset = Category.objects.filter(user=self.user).order_by('name')
+        self.fields['category'].required = False
+
+    def clean_amount(self):
+        amount = self.cleaned_data.get('amount') or Decimal('0.00')
+        if amount <= 0:
+            raise forms.ValidationError('Informe um valor positivo para a transação.')
+        return amount
+
+    def clean(self):
+        cleaned_data = super().clean()
+        category = cleaned_data.get('category')
+        transaction_type = cleaned_data.get('type')
+        if category and transaction_type:
+            if transaction_type == TransactionType.INCOME and category.type != CategoryType.INCOME:
+                self.add_error('category', 'Selecione uma categoria do tipo receita.')
+            if transaction_type == TransactionType.EXPENSE and category.type != CategoryType.EXPENSE:
+                self.add_error('category', 'Selecione uma categoria do tipo despesa.')
+        return cleaned_data
+
+
+class TransactionForm(TransactionFieldsMixin, forms.ModelForm):
     class Meta:
         model = Transaction
         fields = ('transaction_date', 'type', 'account', 'category', 'amount', 'description')
@@ -35,27 +68,69 @@ class TransactionForm(forms.ModelForm):
             'description': forms.TextInput(attrs={'class': 'w-full bg-gray-800 border border-gray-700 rounded-md px-3 py-2 text-white'}),
         }
 
-    def __init__(self, *args, **kwargs):
-        self.user = kwargs.pop('user', None)
-        super().__init__(*args, **kwargs)
-        if self.user:
-            self.fields['account'].queryset = Account.objects.filter(user=self.user).order_by('name')
-            self.fields['category'].queryset = Category.objects.filter(user=self.user).order_by('name')
-        self.fields['category'].required = False
 
-    def clean_amount(self):
-        amount = self.cleaned_data.get('amount') or Decimal('0.00')
-        if amount <= 0:
-            raise forms.ValidationError('Informe um valor positivo para a transação.')
-        return amount
+class RecurringTransactionForm(TransactionFieldsMixin, forms.ModelForm):
+    class Meta:
+        model = RecurringTransaction
+        fields = (
+            'description',
+            'type',
+            'account',
+            'category',
+            'amount',
+            'frequency',
+            'interval',
+            'start_date',
+            'end_date',
+            'max_occurrences',
+            'is_active',
+        )
+        labels = {
+            'description': 'Descrição',
+            'type': 'Tipo',
+            'account': 'Conta',
+            'category': 'Categoria',
+            'amount': 'Valor',
+            'frequency': 'Frequência',
+            'interval': 'Repetir a cada',
+            'start_date': 'Primeira ocorrência',
+            'end_date': 'Última data',
+            'max_occurrences': 'Número de ocorrências',
+            'is_active': 'Ativa',
+        }
+        help_texts = {
+            'interval': 'Ex.: 2 com frequência mensal lança a cada dois meses.',
+            'start_date': 'Nos meses mais curtos, dias 29 a 31 passam para o último dia do mês.',
+            'end_date': 'Opcional. Nenhuma ocorrência é lançada depois desta data.',
+            'max_occurrences': 'Opcional. Encerra após este número de lançamentos.',
+            'is_active': 'Ao reativar, as ocorrências do período pausado não são lançadas.',
+        }
+        widgets = {
+            'description': forms.TextInput(attrs={'class': INPUT_CLASS}),
+            'type': forms.Select(attrs={'class': INPUT_CLASS}),
+            'account': forms.Select(attrs={'class': INPUT_CLASS}),
+            'category': forms.Select(attrs={'class': INPUT_CLASS}),
+            'amount': forms.NumberInput(attrs={'class': INPUT_CLASS, 'min': '0', 'step': '0.01'}),
+            'frequency': forms.Select(attrs={'class': INPUT_CLASS}),
+            'interval': forms.NumberInput(attrs={'class': INPUT_CLASS, 'min': '1'}),
+            'start_date': forms.DateInput(attrs={'type': 'date', 'class': INPUT_CLASS}, format='%Y-%m-%d'),
+            'end_date': forms.DateInput(attrs={'type': 'date', 'class': INPUT_CLASS}, format='%Y-%m-%d'),
+            'max_occurrences': forms.NumberInput(attrs={'class': INPUT_CLASS, 'min': '1'}),
+            'is_active': forms.CheckboxInput(attrs={'class': 'h-4 w-4 rounded border-gray-700 bg-gray-800'}),
+        }
 
     def clean(self):
         cleaned_data = super().clean()
-        category = cleaned_data.get('category')
-        transaction_type = cleaned_data.get('type')
-        if category and transaction_type:
-            if transaction_type == TransactionType.INCOME and category.type != CategoryType.INCOME:
-                self.add_error('category', 'Selecione uma categoria do tipo receita.')
-            if transaction_type == TransactionType.EXPENSE and category.type != CategoryType.EXPENSE:
-                self.add_error('category', 'Selecione uma categoria do tipo despesa.')
+        start_date, end_date = cleaned_data.get('start_date'), cleaned_data.get('end_date')
+        if start_date and end_date and end_date < start_date:
+            self.add_error('end_date', 'A última data deve ser igual ou posterior à primeira ocorrência.')
         return cleaned_data
+
+    def save(self, commit=True):
+        schedule = self.instance
+        if schedule.pk and 'is_active' in self.changed_data and schedule.is_active:
+            # Resume from today: what fell due while paused is not posted.
+            yesterday = timezone.localdate() - timedelta(days=1)
+            if schedule.last_occurrence is None or schedule.last_occurrence < yesterday:
+                schedule.last_occurrence = yesterday
+        return super().save(commit=commit)
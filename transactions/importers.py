@@ -0,0 +1,280 @@
+import csv
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction as db_transaction
+
+from accounts.balances import rebuild_balance_snapshots, recalculate_account_balance
+from accounts.models import Account
+from categories.models import Category, CategoryType
+from core.cache import bump_data_version
+
+from .models import Transaction, TransactionType
+from .rollups import accumulate, apply_rollup_deltas
+
+DEFAULT_CHUNK_SIZE = 1000
+_AMOUNT_FIELD = Transaction._meta.get_field('amount')
+AMOUNT_LIMIT = Decimal(10) ** (_AMOUNT_FIELD.max_digits - _AMOUNT_FIELD.decimal_places)
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%Y%m%d')
+TYPE_ALIASES = {
+    'income': TransactionType.INCOME,
+    'receita': TransactionType.INCOME,
+    'credit': TransactionType.INCOME,
+    'expense': TransactionType.EXPENSE,
+    'despesa': TransactionType.EXPENSE,
+    'debit': TransactionType.EXPENSE,
+}
+CSV_COLUMN_ALIASES = {
+    'data': 'date',
+    'transaction_date': 'date',
+    'descricao': 'description',
+    'descrição': 'description',
+    'valor': 'amount',
+    'tipo': 'type',
+    'conta': 'account',
+    'categoria': 'category',
+}
+OFX_TRANSACTION_RE = re.compile(r'<STMTTRN>(.*?)</STMTTRN>', re.IGNORECASE | re.DOTALL)
+OFX_TAG_RE = re.compile(r'<(\w+)>([^<\r\n]*)')
+OFX_TRANSACTION_OPEN = '<STMTTRN>'
+OFX_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    rejected: list = field(default_factory=list)
+    elapsed: float = 0.0
+    account_ids: set = field(default_factory=set)
+
+    @property
+    def processed(self):
+        return self.created + len(self.rejected)
+
+    @property
+    def rows_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return self.processed / self.elapsed
+
+
+class RowError(Exception):
+    pass
+
+
+def read_csv_rows(stream):
+    """Yield ``(line_number, row)`` pairs from a CSV export, one row at a time."""
+    sample = stream.read(4096)
+    delimiter = ';' if sample.count(';') > sample.count(',') else ','
+    lines = _chain_sample(sample, stream)
+    reader = csv.DictReader(lines, delimiter=delimiter)
+    reader.fieldnames = [
+        CSV_COLUMN_ALIASES.get(name.strip().lower(), name.strip().lower())
+        for name in reader.fieldnames or []
+    ]
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _chain_sample(sample, stream):
+    buffered = sample + stream.readline()
+    yield from buffered.splitlines(keepends=True)
+    yield from stream
+
+
+def read_ofx_rows(stream, chunk_size=OFX_CHUNK_SIZE):
+    """Yield ``(index, row)`` pairs for every ``<STMTTRN>`` block of an OFX statement.
+
+    OFX 1.x is SGML with unclosed tags, so it is scanned in chunks instead of
+    being handed to an XML parser; only the unfinished block at the end of the
+    last chunk is kept between reads.
+    """
+    buffer = ''
+    index = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        consumed = 0
+        for match in OFX_TRANSACTION_RE.finditer(buffer):
+            index += 1
+            yield index, _ofx_row(match.group(1))
+            consumed = match.end()
+        if not chunk:
+            return
+        buffer = buffer[consumed:]
+        opening = buffer.upper().find(OFX_TRANSACTION_OPEN)
+        buffer = buffer[opening:] if opening >= 0 else buffer[-len(OFX_TRANSACTION_OPEN):]
+
+
+def _ofx_row(block):
+    tags = {name.upper(): value.strip() for name, value in OFX_TAG_RE.findall(block)}
+    amount = tags.get('TRNAMT', '')
+    return {
+        'date': tags.get('DTPOSTED', '')[:8],
+        'amount': amount,
+        'type': 'expense' if amount.startswith('-') else 'income',
+        'description': tags.get('MEMO') or tags.get('NAME', ''),
+    }
+
+
+def _normalize_amount(value):
+    """Rewrite ``value`` with ``.`` as the only separator, for ``Decimal``.
+
+    When both separators appear the last one is the decimal mark
+    (``1.234,56`` and ``1,234.56``); a separator repeated on its own groups
+    thousands (``1.234.567``) and a single one is the decimal mark (``12,50``).
+    Misplaced thousands groups raise ``InvalidOperation``.
+    """
+    sign = value[:1] if value.startswith(('+', '-')) else ''
+    value = value[len(sign):]
+    if ',' in value and '.' in value:
+        decimal_mark = max(',', '.', key=value.rfind)
+    elif value.count(',') == 1 or value.count('.') == 1:
+        decimal_mark = ',' if ',' in value else '.'
+    else:
+        decimal_mark = None
+    integer, fraction = value.rsplit(decimal_mark, 1) if decimal_mark else (value, '')
+    for separator in ',.':
+        if separator in integer:
+            groups = integer.split(separator)
+            if not 1 <= len(groups[0]) <= 3 or any(len(group) != 3 for group in groups[1:]):
+                raise InvalidOperation
+            integer = ''.join(groups)
+    if len(fraction) > 2:
+        # ``1,234`` or ``10.005``: either a thousands group or more precision than
+        # the field keeps, and rounding it away would import the wrong value.
+        raise InvalidOperation
+    return f'{sign}{integer}.{fraction}' if fraction else f'{sign}{integer}'
+
+
+class TransactionImporter:
+    """Validate rows against the user's accounts/categories and insert them in bulk.
+
+    ``bulk_create`` skips the per-row signals, so every affected account balance
+    is recomputed once after the last chunk is written, its balance snapshots are
+    rebuilt from the earliest imported day and the monthly rollups receive one
+    coalesced delta per key.
+    """
+
+    def __init__(self, user, default_account=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.user = user
+        self.default_account = default_account
+        self.chunk_size = max(1, chunk_size)
+        self.accounts = {}
+        self.categories = {}
+        self.rollup_deltas = {}
+        self.earliest_date = None
+
+    def load_lookups(self):
+        for account in Account.objects.filter(user=self.user):
+            self.accounts[account.name.casefold()] = account
+        for category in Category.objects.filter(user=self.user):
+            self.categories[(category.name.casefold(), category.type)] = category
+
+    def run(self, rows):
+        result = ImportResult()
+        started = time.perf_counter()
+        self.load_lookups()
+        with db_transaction.atomic():
+            for batch in self._batches(rows, result):
+                Transaction.objects.bulk_create(batch, batch_size=self.chunk_size)
+                result.created += len(batch)
+            for account_id in result.account_ids:
+                recalculate_account_balance(account_id)
+            if result.account_ids:
+                rebuild_balance_snapshots(
+                    Account.objects.filter(pk__in=result.account_ids), since=self.earliest_date
+                )
+            apply_rollup_deltas(self.rollup_deltas)
+            bump_data_version(self.user.pk)
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def _batches(self, rows, result):
+        batch = []
+        for line_number, row in rows:
+            try:
+                instance = self.build_transaction(row)
+            except RowError as exc:
+                result.rejected.append((line_number, str(exc)))
+                continue
+            result.account_ids.add(instance.account_id)
+            accumulate(self.rollup_deltas, instance.current_state(), 1)
+            if self.earliest_date is None or instance.transaction_date < self.earliest_date:
+                self.earliest_date = instance.transaction_date
+            batch.append(instance)
+            if len(batch) >= self.chunk_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def build_transaction(self, row):
+        transaction_type = self._parse_type(row.get('type'), row.get('amount'))
+        account = self._resolve_account(row.get('account'))
+        return Transaction(
+            user=self.user,
+            account=account,
+            category=self._resolve_category(row.get('category'), transaction_type),
+            amount=self._parse_amount(row.get('amount')),
+            description=(row.get('description') or '').strip()[:255],
+            transaction_date=self._parse_date(row.get('date')),
+            type=transaction_type,
+        )
+
+    def _parse_date(self, value):
+        value = (value or '').strip()
+        for date_format in DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+        raise RowError(f'Data inválida: "{value}".')
+
+    def _parse_amount(self, value):
+        value = (value or '').strip().replace(' ', '')
+        try:
+            amount = abs(Decimal(_normalize_amount(value)))
+            if not amount.is_finite():
+                raise InvalidOperation
+            amount = amount.quantize(Decimal('0.01'))
+        except InvalidOperation:
+            raise RowError(f'Valor inválido: "{value}".')
+        if amount <= 0:
+            raise RowError('Informe um valor positivo para a transação.')
+        if amount >= AMOUNT_LIMIT:
+            raise RowError(f'Valor acima do limite: "{value}".')
+        return amount
+
+    def _parse_type(self, value, amount):
+        if not (value or '').strip():
+            # Bank exports usually carry the direction in the amount sign only.
+            return TransactionType.EXPENSE if (amount or '').strip().startswith('-') else TransactionType.INCOME
+        transaction_type = TYPE_ALIASES.get((value or '').strip().casefold())
+        if transaction_type is None:
+            raise RowError(f'Tipo inválido: "{value}".')
+        return transaction_type
+
+    def _resolve_account(self, name):
+        name = (name or '').strip()
+        if not name:
+            if self.default_account is None:
+                raise RowError('Conta não informada.')
+            return self.default_account
+        account = self.accounts.get(name.casefold())
+        if account is None:
+            raise RowError(f'Conta "{name}" não encontrada.')
+        return account
+
+    def _resolve_category(self, name, transaction_type):
+        name = (name or '').strip()
+        if not name:
+            return None
+        category_type = CategoryType.INCOME if transaction_type == TransactionType.INCOME else CategoryType.EXPENSE
+        category = self.categories.get((name.casefold(), category_type))
+        if category is None:
+            raise RowError(f'Categoria "{name}" do tipo {category_type.label.lower()} não encontrada.')
+        return category
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Account
+from transactions.importers import DEFAULT_CHUNK_SIZE, TransactionImporter, read_csv_rows, read_ofx_rows
+
+READERS = {
+    'csv': read_csv_rows,
+    'ofx': read_ofx_rows,
+}
+
+
+class Command(BaseCommand):
+    help = 'Bulk import transactions from a CSV or OFX file for one user.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or OFX file to import.')
+        parser.add_argument('--user', required=True, help='E-mail of the owner of the transactions.')
+        parser.add_argument('--format', choices=sorted(READERS), help='Input format (defaults to the file extension).')
+        parser.add_argument('--account', help='Account name used for rows without one (required for OFX).')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per bulk insert.')
+        parser.add_argument('--encoding', default='utf-8-sig')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'File not found: {path}')
+        input_format = options['format'] or path.suffix.lstrip('.').lower()
+        if input_format not in READERS:
+            raise CommandError(f'Unsupported format "{input_format}". Use --format csv or --format ofx.')
+
+        try:
+            user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'User "{options["user"]}" not found.')
+
+        default_account = None
+        if options['account']:
+            default_account = Account.objects.filter(user=user, name__iexact=options['account']).first()
+            if default_account is None:
+                raise CommandError(f'Account "{options["account"]}" not found for {user.email}.')
+
+        importer = TransactionImporter(user, default_account=default_account, chunk_size=options['chunk_size'])
+        with path.open(encoding=options['encoding'], newline='') as stream:
+            result = importer.run(READERS[input_format](stream))
+
+        for line_number, reason in result.rejected:
+            self.stdout.write(self.style.WARNING(f'Row {line_number} rejected: {reason}'))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {result.created} transaction(s), rejected {len(result.rejected)} '
+                f'in {result.elapsed:.2f}s ({result.rows_per_second:.0f} rows/s).'
+            )
+        )
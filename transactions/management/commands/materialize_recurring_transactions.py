@@ -0,0 +1,54 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.recurring import DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE, materialize_due_transactions
+
+
+class Command(BaseCommand):
+    help = (
+        'Post the due occurrences of recurring transactions. Safe to rerun: posted occurrences are never '
+        'posted again. Meant to run daily from cron or a scheduler.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Post occurrences due up to this date (YYYY-MM-DD, default: today).')
+        parser.add_argument('--user', help='Only post schedules belonging to this e-mail.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Schedules per database transaction.')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per bulk insert.')
+        parser.add_argument(
+            '--time-budget', type=float, help='Stop starting new batches after this many seconds; the rest stays due.'
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f'Invalid date "{options["date"]}", expected YYYY-MM-DD.')
+        users = None
+        if options['user']:
+            users = get_user_model().objects.filter(email=options['user'])
+            if not users.exists():
+                raise CommandError(f'User "{options["user"]}" not found.')
+
+        result = materialize_due_transactions(
+            today=today,
+            users=users,
+            batch_size=options['batch_size'],
+            time_budget=options['time_budget'],
+            chunk_size=options['chunk_size'],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Posted {result.created} transaction(s) from {result.schedules} schedule(s) of '
+                f'{len(result.user_ids)} user(s) in {result.batches} batch(es), {result.elapsed:.2f}s '
+                f'({result.rows_per_second:.0f} rows/s, {result.schedules_per_second:.0f} schedules/s).'
+            )
+        )
+        if result.remaining:
+            self.stdout.write(
+                self.style.WARNING(f'Time budget reached: {result.remaining} schedule(s) still due for the next run.')
+            )
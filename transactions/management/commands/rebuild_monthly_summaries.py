@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.rollups import rebuild_monthly_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly transaction rollups from raw transactions (backfills and repairs).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild rollups for this e-mail.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert.')
+
+    def handle(self, *args, **options):
+        users = None
+        if options['user']:
+            users = get_user_model().objects.filter(email=options['user'])
+            if not users.exists():
+                raise CommandError(f'User "{options["user"]}" not found.')
+
+        created = rebuild_monthly_summaries(users=users, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {created} monthly summary row(s).'))
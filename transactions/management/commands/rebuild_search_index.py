@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from transactions.search import install_search_index, search_index_missing
+
+
+class Command(BaseCommand):
+    help = 'Recreate the full-text search index over transaction descriptions and re-read every description.'
+
+    def handle(self, *args, **options):
+        missing = search_index_missing()
+        if missing:
+            self.stdout.write(self.style.WARNING(f'Missing: {", ".join(missing)}'))
+        install_search_index(rebuild=True)
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
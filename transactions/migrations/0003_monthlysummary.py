@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def backfill_monthly_summaries(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    MonthlySummary = apps.get_model('transactions', 'MonthlySummary')
+    rows = (
+        Transaction.objects.annotate(month=TruncMonth('transaction_date'))
+        .values('user_id', 'account_id', 'category_id', 'month', 'type')
+        .annotate(total_amount=Sum('amount'), transaction_count=Count('id'))
+        .order_by()
+    )
+    MonthlySummary.objects.bulk_create((MonthlySummary(**row) for row in rows.iterator()), batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('accounts', '0002_account_current_balance'),
+        ('categories', '0001_initial'),
+        ('transactions', '0002_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('type', models.CharField(choices=[('income', 'Receita'), ('expense', 'Despesa')], max_length=20)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('transaction_count', models.IntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to='accounts.account')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to='categories.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Monthly summary',
+                'verbose_name_plural': 'Monthly summaries',
+                'ordering': ['-month'],
+                'indexes': [models.Index(fields=['user', 'month', 'type'], name='monthly_summary_user_month_idx')],
+                'constraints': [
+                    models.UniqueConstraint(
+                        condition=models.Q(('category__isnull', False)),
+                        fields=('user', 'account', 'category', 'month', 'type'),
+                        name='monthly_summary_unique_key',
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(('category__isnull', True)),
+                        fields=('user', 'account', 'month', 'type'),
+                        name='monthly_summary_unique_uncategorized_key',
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_monthly_summaries, migrations.RunPython.noop),
+    ]
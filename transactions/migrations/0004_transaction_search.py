@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    from transactions.search import install_search_index
+
+    install_search_index(schema_editor.connection, rebuild=True)
+
+
+def uninstall_search_index(apps, schema_editor):
+    from transactions.search import uninstall_search_index
+
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('transactions', '0003_monthlysummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
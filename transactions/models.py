@@ -1,17 +1,28 @@
+from collections import namedtuple
+from datetime import timedelta
 from decimal import Decimal
 
 from django.conf import settings
+from django.core.validators import MinValueValidator
 from django.db import models
 
 from accounts.models import Account
 from categories.models import Category
 
+from .dates import add_months
+
 
 class TransactionType(models.TextChoices):
     INCOME = 'income', 'Receita'
     EXPENSE = 'expense', 'Despesa'
 
 
+TransactionState = namedtuple(
+    'TransactionState',
+    ['user_id', 'account_id', 'category_id', 'amount', 'type', 'transaction_date'],
+)
+
+
 class Transaction(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -34,13 +45,251 @@ class Transaction(models.Model):
     description = models.CharField(max_length=255, blank=True)
     transaction_date = models.DateField()
     type = models.CharField(max_length=20, choices=TransactionType.choices)
+    recurring = models.ForeignKey(
+        'RecurringTransaction',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='transactions',
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-transaction_date', '-created_at']
+        constraints = [
+            # One occurrence per schedule and day, so a rerun can never post it twice.
+            models.UniqueConstraint(
+                fields=['recurring', 'transaction_date'],
+                condition=models.Q(recurring__isnull=False),
+                name='transaction_recurring_date_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'transaction_date', 'created_at'], name='transaction_user_date_idx'),
+            models.Index(fields=['user', 'transaction_date', 'type', 'amount'], name='transaction_user_totals_idx'),
+            models.Index(fields=['account', 'type', 'amount'], name='transaction_account_type_idx'),
+            # List order within one account or category, for the list filters.
+            models.Index(fields=['account', 'transaction_date', 'created_at'], name='transaction_account_date_idx'),
+            models.Index(fields=['category', 'transaction_date', 'created_at'], name='transaction_category_date_idx'),
+        ]
         verbose_name = 'Transaction'
         verbose_name_plural = 'Transactions'
 
     def __str__(self):
         return f'{self.get_type_display()} · {self.amount} · {self.transaction_date}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._take_snapshot()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # The next save's delta must start from the values just read.
+        if fields is None:
+            self._take_snapshot()
+        elif self.loaded_state is not None:
+            refreshed = {self._meta.get_field(name).attname for name in fields}
+            self._loaded_state = self.loaded_state._replace(
+                **{attname: getattr(self, attname) for attname in TransactionState._fields if attname in refreshed}
+            )
+
+    def save(self, *args, **kwargs):
+        if self.loaded_state is None and not self._state.adding:
+            self._loaded_state = self.fetch_stored_state()
+        super().save(*args, **kwargs)
+        self._take_snapshot()
+
+    def _take_snapshot(self):
+        loaded = self.__dict__
+        if all(attname in loaded for attname in TransactionState._fields):
+            self._loaded_state = self.current_state()
+        else:
+            self._loaded_state = None
+
+    def current_state(self):
+        return TransactionState(*(getattr(self, attname) for attname in TransactionState._fields))
+
+    @property
+    def loaded_state(self):
+        """State as last read from or written to the database, ``None`` for unsaved rows.
+
+        The snapshot is taken in ``from_db`` and refreshed after every save, so
+        signal handlers can tell what changed without querying the row again.
+        """
+        return getattr(self, '_loaded_state', None)
+
+    def fetch_stored_state(self):
+        if self._state.adding or self.pk is None:
+            return None
+        row = (
+            Transaction.objects.filter(pk=self.pk)
+            .values_list(*TransactionState._fields)
+            .first()
+        )
+        return TransactionState(*row) if row else None
+
+
+class MonthlySummary(models.Model):
+    """Per-month rollup of transactions, kept current by ``transactions.signals``."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='monthly_summaries',
+    )
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.CASCADE,
+        related_name='monthly_summaries',
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='monthly_summaries',
+    )
+    month = models.DateField()
+    type = models.CharField(max_length=20, choices=TransactionType.choices)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    transaction_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-month']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'account', 'category', 'month', 'type'],
+                condition=models.Q(category__isnull=False),
+                name='monthly_summary_unique_key',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'account', 'month', 'type'],
+                condition=models.Q(category__isnull=True),
+                name='monthly_summary_unique_uncategorized_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'month', 'type'], name='monthly_summary_user_month_idx'),
+        ]
+        verbose_name = 'Monthly summary'
+        verbose_name_plural = 'Monthly summaries'
+
+    def __str__(self):
+        return f'{self.month:%m/%Y} · {self.get_type_display()} · {self.total_amount}'
+
+
+class RecurrenceFrequency(models.TextChoices):
+    DAILY = 'daily', 'Diária'
+    WEEKLY = 'weekly', 'Semanal'
+    MONTHLY = 'monthly', 'Mensal'
+    YEARLY = 'yearly', 'Anual'
+
+
+class RecurringTransaction(models.Model):
+    """A transaction repeated on a schedule, like an RRULE with FREQ, INTERVAL, UNTIL and COUNT.
+
+    Occurrences are counted from ``start_date``; monthly and yearly ones keep
+    its day, moved to the last day of shorter months. ``transactions.recurring``
+    posts the due occurrences as ``Transaction`` rows and moves
+    ``next_occurrence`` forward, which is ``None`` once the schedule is over.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='recurring_transactions',
+    )
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.CASCADE,
+        related_name='recurring_transactions',
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='recurring_transactions',
+    )
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    description = models.CharField(max_length=255, blank=True)
+    type = models.CharField(max_length=20, choices=TransactionType.choices)
+    frequency = models.CharField(max_length=20, choices=RecurrenceFrequency.choices, default=RecurrenceFrequency.MONTHLY)
+    interval = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1)])
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    max_occurrences = models.PositiveIntegerField(null=True, blank=True, validators=[MinValueValidator(1)])
+    is_active = models.BooleanField(default=True)
+    occurrence_count = models.PositiveIntegerField(default=0)
+    last_occurrence = models.DateField(null=True, blank=True)
+    next_occurrence = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['next_occurrence', 'description']
+        indexes = [
+            models.Index(
+                fields=['next_occurrence'], condition=models.Q(is_active=True), name='recurring_due_idx'
+            ),
+        ]
+        verbose_name = 'Recurring transaction'
+        verbose_name_plural = 'Recurring transactions'
+
+    def __str__(self):
+        return f'{self.description or self.get_type_display()} · {self.amount} · {self.get_frequency_display()}'
+
+    def save(self, *args, **kwargs):
+        self.reschedule()
+        super().save(*args, **kwargs)
+
+    def occurrence(self, index):
+        """Date of occurrence ``index`` (0 is ``start_date``), ignoring the end of the schedule."""
+        steps = index * self.interval
+        if self.frequency == RecurrenceFrequency.DAILY:
+            return self.start_date + timedelta(days=steps)
+        if self.frequency == RecurrenceFrequency.WEEKLY:
+            return self.start_date + timedelta(weeks=steps)
+        if self.frequency == RecurrenceFrequency.YEARLY:
+            return add_months(self.start_date, 12 * steps)
+        return add_months(self.start_date, steps)
+
+    def first_occurrence_after(self, day):
+        """The first occurrence later than ``day``, or ``None`` when the schedule ends first."""
+        if self.max_occurrences is not None and self.occurrence_count >= self.max_occurrences:
+            return None
+        if day is None or day < self.start_date:
+            candidate = self.start_date
+        else:
+            if self.frequency in (RecurrenceFrequency.DAILY, RecurrenceFrequency.WEEKLY):
+                unit = 1 if self.frequency == RecurrenceFrequency.DAILY else 7
+                index = (day - self.start_date).days // (unit * self.interval)
+            else:
+                months = (day.year - self.start_date.year) * 12 + day.month - self.start_date.month
+                index = months // (self.interval * (12 if self.frequency == RecurrenceFrequency.YEARLY else 1))
+            # The estimate is at most one step short (month-end clamping).
+            while self.occurrence(index) <= day:
+                index += 1
+            candidate = self.occurrence(index)
+        if self.end_date is not None and candidate > self.end_date:
+            return None
+        return candidate
+
+    def reschedule(self):
+        """Recompute ``next_occurrence`` after the last posted one, e.g. once the rule changed."""
+        self.next_occurrence = self.first_occurrence_after(self.last_occurrence)
+
+    def build_transaction(self, day):
+        return Transaction(
+            user_id=self.user_id,
+            account_id=self.account_id,
+            category_id=self.category_id,
+            amount=self.amount,
+            description=self.description,
+            transaction_date=day,
+            type=self.type,
+            recurring=self,
+        )
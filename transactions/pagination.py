@@ -0,0 +1,113 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from django.core import signing
+from django.db.models import Q
+
+CURSOR_SALT = 'transactions.pagination'
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_key(key, direction):
+    transaction_date, created_at, pk = key
+    return signing.dumps(
+        (direction, (transaction_date.isoformat(), created_at.isoformat(), pk)), salt=CURSOR_SALT, compress=True
+    )
+
+
+def encode_cursor(transaction, direction):
+    return encode_key((transaction.transaction_date, transaction.created_at, transaction.pk), direction)
+
+
+def decode_cursor(token):
+    """Return ``(direction, (transaction_date, created_at, id))`` or ``None`` for a bad token."""
+    try:
+        direction, (transaction_date, created_at, pk) = signing.loads(token, salt=CURSOR_SALT)
+        if direction not in (NEXT, PREVIOUS):
+            return None
+        return direction, (date.fromisoformat(transaction_date), datetime.fromisoformat(created_at), int(pk))
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+def after_key(key):
+    """Rows strictly after ``key`` in ``(-transaction_date, -created_at, -id)`` order.
+
+    The leading ``transaction_date`` bound is redundant, but it lets the planner
+    seek into the ``(user, transaction_date, created_at)`` index instead of
+    scanning from the newest row.
+    """
+    transaction_date, created_at, pk = key
+    return Q(transaction_date__lte=transaction_date) & (
+        Q(transaction_date__lt=transaction_date)
+        | Q(transaction_date=transaction_date, created_at__lt=created_at)
+        | Q(transaction_date=transaction_date, created_at=created_at, pk__lt=pk)
+    )
+
+
+def before_key(key):
+    transaction_date, created_at, pk = key
+    return Q(transaction_date__gte=transaction_date) & (
+        Q(transaction_date__gt=transaction_date)
+        | Q(transaction_date=transaction_date, created_at__gt=created_at)
+        | Q(transaction_date=transaction_date, created_at=created_at, pk__gt=pk)
+    )
+
+
+@dataclass
+class KeysetPage:
+    object_list: list = field(default_factory=list)
+    next_cursor: str = ''
+    previous_cursor: str = ''
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return bool(self.next_cursor)
+
+    def has_previous(self):
+        return bool(self.previous_cursor)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def paginate_by_keyset(queryset, page_size, token=None):
+    """Slice ``queryset`` into a page that starts right after (or before) a cursor.
+
+    Pages are keyed on ``(transaction_date, created_at, id)`` and each one is a
+    single ``LIMIT page_size + 1`` query: there is no ``COUNT(*)`` and no
+    ``OFFSET``, so deep pages cost the same as the first one.
+    """
+    cursor = decode_cursor(token) if token else None
+    descending = queryset.order_by('-transaction_date', '-created_at', '-pk')
+    if cursor is None:
+        rows = list(descending[: page_size + 1])
+        has_more, has_before = len(rows) > page_size, False
+        rows = rows[:page_size]
+    elif cursor[0] == NEXT:
+        rows = list(descending.filter(after_key(cursor[1]))[: page_size + 1])
+        has_more, has_before = len(rows) > page_size, True
+        rows = rows[:page_size]
+        if not rows:
+            # Everything after the cursor is gone; link back to the rows before it.
+            return KeysetPage(previous_cursor=encode_key(cursor[1], PREVIOUS))
+    else:
+        ascending = queryset.order_by('transaction_date', 'created_at', 'pk')
+        rows = list(ascending.filter(before_key(cursor[1]))[: page_size + 1])
+        has_more, has_before = True, len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        if not rows:
+            # Everything before the cursor is gone; start over from the top.
+            return paginate_by_keyset(queryset, page_size)
+    page = KeysetPage(object_list=rows)
+    if rows and has_more:
+        page.next_cursor = encode_cursor(rows[-1], NEXT)
+    if rows and has_before:
+        page.previous_cursor = encode_cursor(rows[0], PREVIOUS)
+    return page
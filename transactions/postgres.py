@@ -0,0 +1,107 @@
+"""Aggregation paths that only run on PostgreSQL.
+
+The portable ``grouped_totals`` issues one query per source (rollups and edge
+months) and per grouping. On PostgreSQL both sources are combined with
+``UNION ALL`` and every grouping is computed by one ``GROUPING SETS`` query.
+"""
+from django.db import connection
+
+from accounts.models import Account
+from categories.models import Category
+
+from .models import MonthlySummary, Transaction, TransactionType
+from .rollups import ZERO, split_period
+
+DIMENSIONS = {
+    'month': 'source.month',
+    'account__id': 'account.id',
+    'account__name': 'account.name',
+    'account__type': 'account.type',
+    'category__id': 'category.id',
+    'category__name': 'category.name',
+    'category__color': 'category.color',
+    'category__type': 'category.type',
+}
+
+
+def is_postgresql():
+    return connection.vendor == 'postgresql'
+
+
+def _source_sql(user, start_date, end_date):
+    full_months, partial_ranges = split_period(start_date, end_date)
+    parts = []
+    params = []
+    if full_months:
+        parts.append(
+            'SELECT month, account_id, category_id, type, total_amount AS amount, transaction_count AS row_count '
+            f'FROM {MonthlySummary._meta.db_table} '
+            'WHERE user_id = %s AND month BETWEEN %s AND %s AND transaction_count > 0'
+        )
+        params.extend([user.pk, *full_months])
+    if partial_ranges:
+        conditions = ' OR '.join('transaction_date BETWEEN %s AND %s' for _ in partial_ranges)
+        parts.append(
+            "SELECT date_trunc('month', transaction_date)::date AS month, account_id, category_id, type, "
+            f'amount, 1 AS row_count FROM {Transaction._meta.db_table} '
+            f'WHERE user_id = %s AND ({conditions})'
+        )
+        params.append(user.pk)
+        for period in partial_ranges:
+            params.extend(period)
+    return ' UNION ALL '.join(parts), params
+
+
+def grouping_set_totals(user, start_date, end_date, grouping_sets):
+    """Totals for several groupings of an inclusive date range in a single query.
+
+    ``grouping_sets`` maps a label to a tuple of lookups from ``DIMENSIONS``
+    (``()`` for the grand total). Returns ``{label: rows}`` where each row has
+    the same keys as a ``grouped_totals`` row.
+    """
+    columns = list(dict.fromkeys(field for fields in grouping_sets.values() for field in fields))
+    unknown = set(columns) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f'Unsupported grouping fields: {", ".join(sorted(unknown))}')
+    expressions = [DIMENSIONS[field] for field in columns]
+    # GROUPING() sets one bit per column left out of a row's grouping set, with
+    # the first column as the most significant bit.
+    labels_by_mask = {}
+    for label, fields in grouping_sets.items():
+        mask = sum(1 << (len(columns) - 1 - index) for index, field in enumerate(columns) if field not in fields)
+        labels_by_mask.setdefault(mask, []).append(label)
+
+    source, params = _source_sql(user, start_date, end_date)
+    sets = ', '.join(
+        '(' + ', '.join(DIMENSIONS[field] for field in fields) + ')' for fields in grouping_sets.values()
+    )
+    select = ''.join(f'{expression}, ' for expression in expressions)
+    grouping = f'GROUPING({", ".join(expressions)})' if expressions else '0'
+    sql = (
+        f'WITH source AS ({source}) '
+        f'SELECT {select}'
+        'COALESCE(SUM(source.amount) FILTER (WHERE source.type = %s), 0), '
+        'COALESCE(SUM(source.amount) FILTER (WHERE source.type = %s), 0), '
+        f'COALESCE(SUM(source.row_count), 0), {grouping} '
+        'FROM source '
+        f'JOIN {Account._meta.db_table} AS account ON account.id = source.account_id '
+        f'LEFT JOIN {Category._meta.db_table} AS category ON category.id = source.category_id '
+        f'GROUP BY GROUPING SETS ({sets})'
+    )
+    results = {label: [] for label in grouping_sets}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, TransactionType.INCOME, TransactionType.EXPENSE])
+        for record in cursor.fetchall():
+            *values, total_income, total_expense, transaction_count, mask = record
+            for label in labels_by_mask.get(mask, ()):
+                row = {field: value for field, value in zip(columns, values) if field in grouping_sets[label]}
+                row.update(
+                    total_income=total_income,
+                    total_expense=total_expense,
+                    transaction_count=transaction_count,
+                )
+                results[label].append(row)
+    for label, fields in grouping_sets.items():
+        if not fields and not results[label]:
+            results[label].append({'total_income': ZERO, 'total_expense': ZERO, 'transaction_count': 0})
+    return results
@@ -0,0 +1,253 @@
+import asyncio
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .dates import shift_month
+from .models import MonthlySummary, Transaction, TransactionType
+
+ZERO = Decimal('0.00')
+SUMMARY_KEY_FIELDS = ('user_id', 'account_id', 'category_id', 'month', 'type')
+
+
+def summary_key(state):
+    return (
+        state.user_id,
+        state.account_id,
+        state.category_id,
+        state.transaction_date.replace(day=1),
+        state.type,
+    )
+
+
+def accumulate(deltas, state, sign):
+    """Add ``sign`` times the contribution of ``state`` to a ``{key: [amount, count]}`` map."""
+    entry = deltas.setdefault(summary_key(state), [ZERO, 0])
+    entry[0] += sign * Decimal(str(state.amount))
+    entry[1] += sign
+
+
+def apply_summary_delta(key, amount_delta, count_delta):
+    lookup = dict(zip(SUMMARY_KEY_FIELDS, key))
+    updated = MonthlySummary.objects.filter(**lookup).update(
+        total_amount=F('total_amount') + amount_delta,
+        transaction_count=F('transaction_count') + count_delta,
+    )
+    if updated or count_delta <= 0:
+        # Removals never create rows: the row may already be gone when the
+        # account, category or user is being deleted in cascade.
+        return
+    try:
+        with db_transaction.atomic():
+            MonthlySummary.objects.create(total_amount=amount_delta, transaction_count=count_delta, **lookup)
+    except IntegrityError:
+        MonthlySummary.objects.filter(**lookup).update(
+            total_amount=F('total_amount') + amount_delta,
+            transaction_count=F('transaction_count') + count_delta,
+        )
+
+
+def apply_rollup_deltas(deltas):
+    for key, (amount_delta, count_delta) in deltas.items():
+        if amount_delta or count_delta:
+            apply_summary_delta(key, amount_delta, count_delta)
+
+
+def apply_rollup_deltas_in_bulk(deltas, batch_size=1000):
+    """Apply many deltas with a fixed number of queries; call it inside a transaction.
+
+    The summaries of the keys are locked, then replaced by rows carrying the new
+    totals. If another writer creates one of the keys in the meantime, the
+    deltas are applied one key at a time instead.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+    if not deltas:
+        return
+    summaries = MonthlySummary.objects.select_for_update().filter(
+        user_id__in={key[0] for key in deltas}, month__in={key[3] for key in deltas}
+    )
+    current = {}
+    for summary in summaries:
+        key = tuple(getattr(summary, name) for name in SUMMARY_KEY_FIELDS)
+        if key in deltas:
+            current[key] = summary
+    rows = []
+    for key, (amount_delta, count_delta) in deltas.items():
+        summary = current.get(key)
+        if summary is None and count_delta <= 0:
+            continue
+        rows.append(
+            MonthlySummary(
+                total_amount=(summary.total_amount if summary else ZERO) + amount_delta,
+                transaction_count=(summary.transaction_count if summary else 0) + count_delta,
+                **dict(zip(SUMMARY_KEY_FIELDS, key)),
+            )
+        )
+    try:
+        with db_transaction.atomic():
+            MonthlySummary.objects.filter(pk__in=[summary.pk for summary in current.values()]).delete()
+            MonthlySummary.objects.bulk_create(rows, batch_size=batch_size)
+    except IntegrityError:
+        apply_rollup_deltas(deltas)
+
+
+def apply_transaction_rollup(previous, current):
+    deltas = {}
+    if previous:
+        accumulate(deltas, previous, -1)
+    if current:
+        accumulate(deltas, current, 1)
+    apply_rollup_deltas(deltas)
+
+
+def fold_category_into_uncategorized(category):
+    """Move a category's rollups to the uncategorized key before it is deleted.
+
+    Transactions of a deleted category are set to NULL with a plain UPDATE, so
+    no transaction signal fires for them.
+    """
+    summaries = MonthlySummary.objects.filter(category=category, transaction_count__gt=0)
+    for summary in summaries:
+        key = (summary.user_id, summary.account_id, None, summary.month, summary.type)
+        apply_summary_delta(key, summary.total_amount, summary.transaction_count)
+
+
+def rebuild_monthly_summaries(users=None, batch_size=1000):
+    """Recompute rollups from raw transactions, for every user or only ``users``."""
+    transactions = Transaction.objects.all()
+    summaries = MonthlySummary.objects.all()
+    if users is not None:
+        transactions = transactions.filter(user__in=users)
+        summaries = summaries.filter(user__in=users)
+    rows = (
+        transactions.annotate(month=TruncMonth('transaction_date'))
+        .values(*SUMMARY_KEY_FIELDS)
+        .annotate(total_amount=Sum('amount'), transaction_count=Count('id'))
+        .order_by()
+    )
+    with db_transaction.atomic():
+        summaries.delete()
+        created = MonthlySummary.objects.bulk_create(
+            (MonthlySummary(**row) for row in rows.iterator()),
+            batch_size=batch_size,
+        )
+    return len(created)
+
+
+def split_period(start_date, end_date):
+    """Split an inclusive date range into whole months and partial edge ranges.
+
+    Returns ``(full_months, partial_ranges)`` where ``full_months`` is a
+    ``(first_month, last_month)`` pair of month starts or ``None``. Either bound
+    may be ``None`` for an open range, which leaves that side of
+    ``full_months`` open as well.
+    """
+    first_full = None
+    if start_date is not None:
+        first_full = start_date if start_date.day == 1 else shift_month(start_date.replace(day=1), 1)
+    end_exclusive = None
+    if end_date is not None:
+        after_end = end_date + timedelta(days=1)
+        end_exclusive = after_end if after_end.day == 1 else end_date.replace(day=1)
+    if first_full is not None and end_exclusive is not None and first_full >= end_exclusive:
+        return None, [(start_date, end_date)]
+    partial_ranges = []
+    if first_full is not None and start_date < first_full:
+        partial_ranges.append((start_date, first_full - timedelta(days=1)))
+    if end_exclusive is not None and end_exclusive <= end_date:
+        partial_ranges.append((end_exclusive, end_date))
+    last_full = shift_month(end_exclusive, -1) if end_exclusive is not None else None
+    return (first_full, last_full), partial_ranges
+
+
+def _totals(amount_field, count_expression):
+    return {
+        'total_income': Coalesce(Sum(amount_field, filter=Q(type=TransactionType.INCOME)), ZERO),
+        'total_expense': Coalesce(Sum(amount_field, filter=Q(type=TransactionType.EXPENSE)), ZERO),
+        'transaction_count': count_expression,
+    }
+
+
+def _period_condition(field, start_date, end_date):
+    condition = Q()
+    if start_date is not None:
+        condition &= Q(**{f'{field}__gte': start_date})
+    if end_date is not None:
+        condition &= Q(**{f'{field}__lte': end_date})
+    return condition
+
+
+def _totals_sources(user, start_date, end_date, condition=None):
+    condition = condition or Q()
+    full_months, partial_ranges = split_period(start_date, end_date)
+    sources = []
+    if full_months:
+        sources.append(
+            (
+                MonthlySummary.objects.filter(
+                    _period_condition('month', *full_months), condition, user=user, transaction_count__gt=0
+                ),
+                _totals('total_amount', Coalesce(Sum('transaction_count'), 0)),
+            )
+        )
+    if partial_ranges:
+        edges = Q()
+        for period in partial_ranges:
+            edges |= Q(transaction_date__range=period)
+        sources.append((Transaction.objects.filter(edges, condition, user=user), _totals('amount', Count('id'))))
+    return sources
+
+
+def _merge_totals(row_sets, fields):
+    merged = {}
+    for rows in row_sets:
+        for row in rows:
+            group = tuple(row[field] for field in fields)
+            entry = merged.get(group)
+            if entry is None:
+                merged[group] = dict(row)
+                continue
+            entry['total_income'] += row['total_income']
+            entry['total_expense'] += row['total_expense']
+            entry['transaction_count'] += row['transaction_count']
+    if not fields and not merged:
+        merged[()] = {'total_income': ZERO, 'total_expense': ZERO, 'transaction_count': 0}
+    return list(merged.values())
+
+
+def grouped_totals(user, start_date, end_date, fields=(), condition=None):
+    """Income/expense totals for an inclusive date range, grouped by ``fields``.
+
+    Whole months are read from ``MonthlySummary``; only the partial months at the
+    edges of the range touch raw transactions. ``fields`` and the lookups of the
+    optional ``condition`` must be valid on both models (for example
+    ``category__name`` or ``account_id``). ``None`` leaves a bound open.
+    """
+    row_sets = []
+    for queryset, aggregates in _totals_sources(user, start_date, end_date, condition):
+        if fields:
+            row_sets.append(queryset.values(*fields).annotate(**aggregates).order_by())
+        else:
+            row_sets.append([queryset.aggregate(**aggregates)])
+    return _merge_totals(row_sets, fields)
+
+
+def transaction_totals(queryset):
+    """Income/expense totals and row count of a ``Transaction`` queryset."""
+    return queryset.aggregate(**_totals('amount', Count('id')))
+
+
+async def _afetch_totals(queryset, aggregates, fields):
+    if fields:
+        return [row async for row in queryset.values(*fields).annotate(**aggregates).order_by()]
+    return [await queryset.aaggregate(**aggregates)]
+
+
+async def agrouped_totals(user, start_date, end_date, fields=()):
+    """Async ``grouped_totals``; the rollup and edge-month queries are awaited together."""
+    sources = _totals_sources(user, start_date, end_date)
+    row_sets = await asyncio.gather(*(_afetch_totals(queryset, aggregates, fields) for queryset, aggregates in sources))
+    return _merge_totals(row_sets, fields)
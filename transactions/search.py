@@ -0,0 +1,213 @@
+"""Full-text search over transaction descriptions.
+
+SQLite keeps an FTS5 index (``transactions_transaction_fts``) over the
+descriptions, as an external-content table: the text stays in the transactions
+table and triggers apply every insert, update and delete to the index, so bulk
+inserts and ``QuerySet.update()`` stay in sync as well. PostgreSQL uses a GIN
+expression index on ``to_tsvector('portuguese', ...)`` of the description,
+which the database maintains on its own.
+
+Both fold accents and case on the indexed text and on the query, and match every
+query word as a prefix: "alug" finds "Aluguel" and "acao" finds "Ação". Other
+backends fall back to ``icontains``.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Transaction
+
+FTS_TABLE = 'transactions_transaction_fts'
+SEARCH_CONFIG = 'portuguese'
+# Ranked matches kept for one query; pages are sliced from them.
+SEARCH_RESULT_LIMIT = 500
+# Most recent matches considered for ranking, which bounds the cost of common words.
+SEARCH_CANDIDATE_LIMIT = 5000
+MAX_SEARCH_TERMS = 8
+MAX_TERM_LENGTH = 32
+
+# PostgreSQL has no accent folding without the unaccent extension, which needs
+# a superuser to install; ``translate`` is built in and immutable, so it can be
+# part of the index expression.
+ACCENTED = 'áàâãäåéèêëíìîïóòôõöúùûüçñý'
+UNACCENTED = 'aaaaaaeeeeiiiiooooouuuucny'
+PG_DOCUMENT = f"to_tsvector('{SEARCH_CONFIG}', translate(lower(description), '{ACCENTED}', '{UNACCENTED}'))"
+
+SQLITE_INSTALL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        description,
+        content='transactions_transaction',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON transactions_transaction BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON transactions_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF description ON transactions_transaction
+    WHEN old.description IS NOT new.description BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+]
+
+SQLITE_TRIGGERS = [f'{FTS_TABLE}_insert', f'{FTS_TABLE}_delete', f'{FTS_TABLE}_update']
+
+SQLITE_UNINSTALL = [f'DROP TRIGGER IF EXISTS {trigger}' for trigger in SQLITE_TRIGGERS] + [
+    f'DROP TABLE IF EXISTS {FTS_TABLE}'
+]
+
+PG_INSTALL = [f'CREATE INDEX IF NOT EXISTS transaction_search_idx ON transactions_transaction USING GIN ({PG_DOCUMENT})']
+
+PG_UNINSTALL = ['DROP INDEX IF EXISTS transaction_search_idx']
+
+
+def search_terms(text):
+    """Lower-case, accent-free words of ``text``, at most ``MAX_SEARCH_TERMS``."""
+    folded = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+    return [term[:MAX_TERM_LENGTH] for term in re.findall(r'[a-z0-9]+', folded)[:MAX_SEARCH_TERMS]]
+
+
+def install_search_index(schema_connection=None, rebuild=False):
+    """Create the index for the connection's backend where it is missing.
+
+    Safe to run again: objects already in place are kept. On SQLite, a migration
+    that rebuilds the transactions table (most ``AlterField`` operations) drops
+    the triggers, so it must call this afterwards; ``search_index_missing``
+    reports the gap and ``rebuild_search_index`` repairs it. ``rebuild=True``
+    re-reads every description into the index.
+    """
+    schema_connection = schema_connection or connection
+    if schema_connection.vendor == 'sqlite':
+        statements = SQLITE_INSTALL
+        if rebuild:
+            statements = statements + [f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"]
+    elif schema_connection.vendor == 'postgresql':
+        statements = PG_UNINSTALL + PG_INSTALL if rebuild else PG_INSTALL
+    else:
+        return
+    with schema_connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def uninstall_search_index(schema_connection=None):
+    schema_connection = schema_connection or connection
+    statements = {'sqlite': SQLITE_UNINSTALL, 'postgresql': PG_UNINSTALL}.get(schema_connection.vendor, [])
+    with schema_connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def search_index_missing():
+    """Names of the search index objects missing from the database."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            expected = [FTS_TABLE] + SQLITE_TRIGGERS
+            cursor.execute('SELECT name FROM sqlite_master WHERE type IN (%s, %s)', ['table', 'trigger'])
+        elif connection.vendor == 'postgresql':
+            expected = ['transaction_search_idx']
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'transactions_transaction'")
+        else:
+            return []
+        present = {row[0] for row in cursor.fetchall()}
+    return [name for name in expected if name not in present]
+
+
+def _match_expression(terms):
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _tsquery(terms):
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def search_filter(text, user=None):
+    """``Q`` matching transactions whose description contains every word of ``text``.
+
+    With ``user``, the index lookup itself only returns that user's rows, so the
+    subquery does not grow with everyone else's matches.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return Q(pk__in=[])
+    if connection.vendor == 'sqlite':
+        if user is None:
+            sql = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+            params = [_match_expression(terms)]
+        else:
+            sql = (
+                f'SELECT t.id FROM {FTS_TABLE} JOIN transactions_transaction t ON t.id = {FTS_TABLE}.rowid '
+                f'WHERE {FTS_TABLE} MATCH %s AND t.user_id = %s'
+            )
+            params = [_match_expression(terms), user.pk]
+        return Q(pk__in=RawSQL(sql, params))
+    if connection.vendor == 'postgresql':
+        sql = f'SELECT id FROM transactions_transaction WHERE {PG_DOCUMENT} @@ to_tsquery(%s, %s)'
+        params = [SEARCH_CONFIG, _tsquery(terms)]
+        if user is not None:
+            sql += ' AND user_id = %s'
+            params.append(user.pk)
+        return Q(pk__in=RawSQL(sql, params))
+    condition = Q() if user is None else Q(user=user)
+    for term in terms:
+        condition &= Q(description__icontains=term)
+    return condition
+
+
+def ranked_transaction_ids(user, text, limit=SEARCH_RESULT_LIMIT, candidates=SEARCH_CANDIDATE_LIMIT):
+    """Ids of the user's best ``limit`` matches for ``text``, most relevant first.
+
+    Only the ``candidates`` most recently recorded matches are ranked, so a word
+    found in half the history costs the same as a rare one. Relevance is BM25
+    on SQLite and ``ts_rank`` on PostgreSQL; ties go to the most recent
+    transaction.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    if connection.vendor == 'sqlite':
+        sql = (
+            'SELECT id FROM ('
+            f'SELECT t.id, t.transaction_date, {FTS_TABLE}.rank AS score FROM {FTS_TABLE} '
+            f'JOIN transactions_transaction t ON t.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND t.user_id = %s ORDER BY {FTS_TABLE}.rowid DESC LIMIT %s'
+            ') ORDER BY score, transaction_date DESC, id DESC LIMIT %s'
+        )
+        params = [_match_expression(terms), user.pk, candidates, limit]
+    elif connection.vendor == 'postgresql':
+        sql = (
+            'SELECT id FROM ('
+            'SELECT id, transaction_date, description FROM transactions_transaction '
+            f'WHERE user_id = %s AND {PG_DOCUMENT} @@ to_tsquery(%s, %s) ORDER BY id DESC LIMIT %s'
+            f') candidates, to_tsquery(%s, %s) query '
+            f'ORDER BY ts_rank({PG_DOCUMENT}, query) DESC, transaction_date DESC, id DESC LIMIT %s'
+        )
+        tsquery = _tsquery(terms)
+        params = [user.pk, SEARCH_CONFIG, tsquery, candidates, SEARCH_CONFIG, tsquery, limit]
+    else:
+        queryset = Transaction.objects.filter(search_filter(text), user=user)
+        return list(queryset.order_by('-transaction_date', '-pk').values_list('pk', flat=True)[:limit])
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def fetch_in_order(ids):
+    """The transactions with ``ids``, in that order, with account and category loaded."""
+    rows = Transaction.objects.filter(pk__in=ids).select_related('account', 'category').in_bulk()
+    return [rows[pk] for pk in ids if pk in rows]
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from categories.models import Category
+
+from .models import Transaction
+from .rollups import apply_transaction_rollup, fold_category_into_uncategorized
+
+
+@receiver(post_save, sender=Transaction)
+def update_monthly_summary_on_save(sender, instance, created, **kwargs):
+    previous_state = None if created else instance.loaded_state
+    apply_transaction_rollup(previous_state, instance.current_state())
+
+
+@receiver(post_delete, sender=Transaction)
+def update_monthly_summary_on_delete(sender, instance, **kwargs):
+    apply_transaction_rollup(instance.loaded_state or instance.current_state(), None)
+
+
+@receiver(pre_delete, sender=Category)
+def fold_monthly_summary_on_category_delete(sender, instance, **kwargs):
+    fold_category_into_uncategorized(instance)
@@ -1,15 +1,37 @@
+import os
+import tempfile
 from datetime import date
 from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.contrib.messages import get_messages
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db import transaction as db_transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
-from accounts.models import Account, AccountType
+from accounts.balances import find_drifted_accounts, rebuild_balance_snapshots
+from accounts.models import Account, AccountBalanceSnapshot, AccountType
 from categories.models import CATEGORY_COLOR_CHOICES, Category, CategoryType
+from transactions.filters import TransactionFilter, TransactionFilterForm
 from transactions.forms import TransactionForm
-from transactions.models import Transaction, TransactionType
+from transactions.importers import TransactionImporter, read_csv_rows, read_ofx_rows
+from transactions.models import MonthlySummary, RecurrenceFrequency, RecurringTransaction, Transaction, TransactionType
+from transactions.pagination import paginate_by_keyset
+from transactions.recurring import materialize_due_transactions
+from transactions.rollups import grouped_totals, rebuild_monthly_summaries, split_period
+from transactions.views import TransactionSearchView
+from transactions.search import (
+    ranked_transaction_ids,
+    search_filter,
+    search_index_missing,
+    search_terms,
+)
 
 
 class TransactionTests(TestCase):
@@ -144,3 +166,884 @@ class TransactionTests(TestCase):
         transactions = list(response.context['transactions'])
         self.assertEqual(len(transactions), 1)
         self.assertEqual(transactions[0].transaction_date.month, 1)
+
+    def test_list_view_conditional_get_covers_filters_and_writes(self):
+        self._create_transaction(transaction_date=date(2024, 1, 10), amount=Decimal('60.00'))
+        self.client.force_login(self.user)
+        january = {'month': '1', 'year': '2024'}
+        etag = self.client.get(reverse('transactions:list'), january)['ETag']
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('transactions:list'), january, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        february = {'month': '2', 'year': '2024'}
+        response = self.client.get(reverse('transactions:list'), february, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+        self._create_transaction(transaction_date=date(2024, 1, 20), amount=Decimal('15.00'))
+        response = self.client.get(reverse('transactions:list'), january, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['transactions']), 2)
+
+
+class TransactionPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='pages@example.com', password='testpass123')
+        cls.account = Account.objects.create(user=cls.user, name='Conta Corrente', type=AccountType.CHECKING)
+        # Several rows share a date and bulk_create gives them near-identical
+        # created_at values, so the id tie-breaker is exercised.
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=cls.user,
+                account=cls.account,
+                amount=Decimal('10.00') + index,
+                transaction_date=date(2024, 1, 1 + index % 5),
+                type=TransactionType.EXPENSE,
+            )
+            for index in range(37)
+        )
+        rebuild_monthly_summaries(users=[cls.user])
+        cls.expected_ids = list(
+            Transaction.objects.filter(user=cls.user)
+            .order_by('-transaction_date', '-created_at', '-pk')
+            .values_list('pk', flat=True)
+        )
+
+    def test_cursors_walk_every_row_forward_and_back(self):
+        queryset = Transaction.objects.filter(user=self.user)
+        pages = [paginate_by_keyset(queryset, 10)]
+        while pages[-1].has_next():
+            pages.append(paginate_by_keyset(queryset, 10, pages[-1].next_cursor))
+        self.assertEqual([len(page) for page in pages], [10, 10, 10, 7])
+        self.assertEqual([row.pk for page in pages for row in page], self.expected_ids)
+        self.assertFalse(pages[0].has_previous())
+
+        page = pages[-1]
+        seen = [row.pk for row in page]
+        while page.has_previous():
+            page = paginate_by_keyset(queryset, 10, page.previous_cursor)
+            seen = [row.pk for row in page] + seen
+        self.assertEqual(seen, self.expected_ids)
+
+    def test_empty_next_page_links_back(self):
+        queryset = Transaction.objects.filter(user=self.user)
+        first = paginate_by_keyset(queryset, 10)
+        # The rows after the first page are deleted once its link was built.
+        Transaction.objects.filter(pk__in=self.expected_ids[10:]).delete()
+        page = paginate_by_keyset(queryset, 10, first.next_cursor)
+        self.assertEqual(list(page), [])
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+        # The link leads to the rows before the cursor's row, which comes next again.
+        page = paginate_by_keyset(queryset, 10, page.previous_cursor)
+        self.assertEqual([row.pk for row in page], self.expected_ids[:9])
+        page = paginate_by_keyset(queryset, 10, page.next_cursor)
+        self.assertEqual([row.pk for row in page], self.expected_ids[9:10])
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        page = paginate_by_keyset(Transaction.objects.filter(user=self.user), 10, 'not-a-cursor')
+        self.assertEqual([row.pk for row in page], self.expected_ids[:10])
+
+    def test_list_view_pages_without_count_or_offset(self):
+        self.client.force_login(self.user)
+        url = reverse('transactions:list')
+        response = self.client.get(url)
+        response = self.client.get(url, {'cursor': response.context['page_obj'].next_cursor})
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, {'cursor': response.context['page_obj'].next_cursor})
+        self.assertEqual([row.pk for row in response.context['transactions']], self.expected_ids[30:])
+        self.assertFalse(response.context['page_obj'].has_next())
+        self.assertEqual(response.context['transaction_count'], 37)
+        statements = ' '.join(query['sql'].upper() for query in captured.captured_queries)
+        self.assertNotIn('OFFSET', statements)
+        self.assertNotIn('COUNT(', statements)
+
+
+class TransactionFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='filters@example.com', password='testpass123')
+        cls.account = Account.objects.create(user=cls.user, name='Conta Corrente', type=AccountType.CHECKING)
+        cls.card = Account.objects.create(user=cls.user, name='Cartão', type=AccountType.CREDIT)
+        cls.rent = Category.objects.create(user=cls.user, name='Moradia', type=CategoryType.EXPENSE)
+        cls.salary = Category.objects.create(user=cls.user, name='Salário', type=CategoryType.INCOME)
+        other_user = get_user_model().objects.create_user(email='other-filters@example.com', password='testpass123')
+        cls.other_account = Account.objects.create(user=other_user, name='Conta', type=AccountType.CHECKING)
+        rows = [
+            (cls.account, cls.rent, 'Aluguel de janeiro', '1500.00', date(2024, 1, 5), TransactionType.EXPENSE),
+            (cls.account, cls.rent, 'Conta de luz', '180.00', date(2024, 1, 20), TransactionType.EXPENSE),
+            (cls.card, cls.rent, 'Aluguel de fevereiro', '1500.00', date(2024, 2, 5), TransactionType.EXPENSE),
+            (cls.account, cls.salary, 'Salário', '5000.00', date(2024, 2, 28), TransactionType.INCOME),
+            (cls.card, None, 'Ação de graças', '45.90', date(2024, 3, 12), TransactionType.EXPENSE),
+            (cls.account, cls.rent, 'Aluguel de março', '1500.00', date(2024, 3, 15), TransactionType.EXPENSE),
+        ]
+        for account, category, description, amount, transaction_date, transaction_type in rows:
+            Transaction.objects.create(
+                user=cls.user,
+                account=account,
+                category=category,
+                description=description,
+                amount=Decimal(amount),
+                transaction_date=transaction_date,
+                type=transaction_type,
+            )
+
+    def _filter(self, **params):
+        return TransactionFilterForm(params, user=self.user).to_filter()
+
+    def _descriptions(self, transaction_filter):
+        queryset = transaction_filter.apply(Transaction.objects.filter(user=self.user)).order_by('transaction_date')
+        return list(queryset.values_list('description', flat=True))
+
+    def test_form_parses_every_filter(self):
+        transaction_filter = self._filter(
+            month='1',
+            year='2024',
+            data_inicio='2024-01-10',
+            type='expense',
+            account=str(self.account.pk),
+            category=str(self.rent.pk),
+            min_amount='100',
+            max_amount='200',
+            q=' luz ',
+        )
+        self.assertEqual(
+            transaction_filter,
+            TransactionFilter(
+                start_date=date(2024, 1, 10),
+                end_date=date(2024, 1, 31),
+                type='expense',
+                min_amount=Decimal('100'),
+                max_amount=Decimal('200'),
+                account_id=self.account.pk,
+                category_id=self.rent.pk,
+                text='luz',
+            ),
+        )
+        self.assertEqual(self._descriptions(transaction_filter), ['Conta de luz'])
+
+    def test_invalid_values_are_dropped(self):
+        transaction_filter = self._filter(
+            month='13',
+            year='2024',
+            data_inicio='ontem',
+            type='transfer',
+            account=str(self.other_account.pk),
+            min_amount='50',
+            max_amount='10',
+        )
+        self.assertEqual(
+            transaction_filter,
+            TransactionFilter(start_date=date(2024, 1, 1), end_date=date(2024, 12, 31), min_amount=Decimal('50')),
+        )
+        self.assertTrue(self._filter().is_empty)
+
+    def test_combined_filters_and_totals_match_raw_rows(self):
+        cases = [
+            ({'data_inicio': '2024-01-15', 'data_fim': '2024-03-12'}, 4),
+            ({'year': '2024', 'type': 'expense', 'account': str(self.account.pk)}, 3),
+            ({'category': str(self.rent.pk), 'data_inicio': '2024-02-01'}, 2),
+            ({'min_amount': '1000', 'q': 'aluguel'}, 3),
+            ({'q': 'acao', 'account': str(self.card.pk)}, 1),
+        ]
+        for params, expected_count in cases:
+            with self.subTest(params=params):
+                transaction_filter = self._filter(**params)
+                rows = transaction_filter.apply(Transaction.objects.filter(user=self.user))
+                totals = transaction_filter.totals(self.user)
+                self.assertEqual(totals['transaction_count'], expected_count)
+                self.assertEqual(totals['transaction_count'], rows.count())
+                self.assertEqual(
+                    totals['total_income'], sum(row.amount for row in rows if row.type == TransactionType.INCOME)
+                )
+                self.assertEqual(
+                    totals['total_expense'], sum(row.amount for row in rows if row.type == TransactionType.EXPENSE)
+                )
+
+    def test_cache_key_is_shared_by_equivalent_filters(self):
+        self.assertEqual(self._filter().cache_key(), 'all')
+        self.assertEqual(
+            self._filter(q='Ação', min_amount='10').cache_key(), self._filter(q='acao', min_amount='10.00').cache_key()
+        )
+        self.assertNotEqual(self._filter(min_amount='10').cache_key(), self._filter(max_amount='10').cache_key())
+
+    def test_list_view_filters_rows_and_caches_totals(self):
+        self.client.force_login(self.user)
+        params = {'type': 'expense', 'category': str(self.rent.pk), 'min_amount': '1000'}
+        response = self.client.get(reverse('transactions:list'), params)
+        self.assertEqual(
+            [row.description for row in response.context['transactions']],
+            ['Aluguel de março', 'Aluguel de fevereiro', 'Aluguel de janeiro'],
+        )
+        self.assertEqual(response.context['total_expense'], Decimal('4500.00'))
+        self.assertEqual(response.context['total_income'], Decimal('0.00'))
+        self.assertEqual(response.context['transaction_count'], 3)
+        self.assertTrue(response.context['is_filtered'])
+
+        with patch.object(TransactionFilter, 'totals') as totals:
+            response = self.client.get(reverse('transactions:list'), dict(params, min_amount='1000.00'))
+        totals.assert_not_called()
+        self.assertEqual(response.context['total_expense'], Decimal('4500.00'))
+
+    def test_unfiltered_list_cards_show_the_current_month(self):
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            amount=Decimal('35.00'),
+            description='Padaria',
+            transaction_date=timezone.localdate(),
+            type=TransactionType.EXPENSE,
+        )
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('transactions:list'))
+        self.assertFalse(response.context['is_filtered'])
+        self.assertEqual(response.context['total_expense'], Decimal('35.00'))
+        self.assertEqual(response.context['total_income'], Decimal('0.00'))
+        self.assertEqual(response.context['transaction_count'], Transaction.objects.filter(user=self.user).count())
+        self.assertContains(response, 'Despesas no mês')
+
+
+class TransactionSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='snapshot@example.com', password='testpass123')
+        cls.account = Account.objects.create(
+            user=cls.user,
+            name='Conta Corrente',
+            initial_balance=Decimal('100.00'),
+            type=AccountType.CHECKING,
+        )
+        cls.secondary_account = Account.objects.create(
+            user=cls.user,
+            name='Poupança',
+            initial_balance=Decimal('0.00'),
+            type=AccountType.SAVINGS,
+        )
+        cls.transaction = Transaction.objects.create(
+            user=cls.user,
+            account=cls.account,
+            amount=Decimal('30.00'),
+            transaction_date=date(2024, 3, 1),
+            type=TransactionType.EXPENSE,
+        )
+
+    def test_loaded_instance_remembers_stored_values(self):
+        transaction = Transaction.objects.get(pk=self.transaction.pk)
+        transaction.amount = Decimal('45.00')
+        self.assertEqual(transaction.loaded_state.account_id, self.account.pk)
+        self.assertEqual(transaction.loaded_state.amount, Decimal('30.00'))
+        self.assertEqual(transaction.loaded_state.type, TransactionType.EXPENSE)
+        transaction.save()
+        self.assertEqual(transaction.loaded_state.amount, Decimal('45.00'))
+
+    def test_update_issues_fixed_number_of_queries(self):
+        transaction = Transaction.objects.get(pk=self.transaction.pk)
+        transaction.amount = Decimal('50.00')
+        # UPDATE transaction + UPDATE account balance + UPDATE balance snapshots
+        # from the transaction's day on + UPDATE monthly rollup.
+        with self.assertNumQueries(4):
+            transaction.save()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('50.00'))
+
+    def test_account_move_issues_fixed_number_of_queries(self):
+        transaction = Transaction.objects.get(pk=self.transaction.pk)
+        transaction.account = self.secondary_account
+        # UPDATE transaction + one balance UPDATE per affected account + the
+        # snapshots of both accounts + one rollup UPDATE per month key. The new
+        # account has no snapshot or rollup row for that day yet, so each is
+        # inserted inside a savepoint (the snapshot after reading its opening
+        # balance).
+        with self.assertNumQueries(15):
+            transaction.save()
+        self.account.refresh_from_db()
+        self.secondary_account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('100.00'))
+        self.assertEqual(self.secondary_account.current_balance, Decimal('-30.00'))
+
+    def test_deferred_instance_falls_back_to_stored_state(self):
+        transaction = Transaction.objects.only('id', 'description').get(pk=self.transaction.pk)
+        self.assertIsNone(transaction.loaded_state)
+        transaction.amount = Decimal('10.00')
+        transaction.save()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('90.00'))
+
+
+class TransactionImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='import@example.com', password='testpass123')
+        cls.account = Account.objects.create(
+            user=cls.user,
+            name='Conta Corrente',
+            initial_balance=Decimal('100.00'),
+            type=AccountType.CHECKING,
+        )
+        cls.expense_category = Category.objects.create(
+            user=cls.user,
+            name='Mercado',
+            type=CategoryType.EXPENSE,
+            color=CATEGORY_COLOR_CHOICES[0][0],
+        )
+
+    def test_csv_import_creates_rows_and_recomputes_balance_once(self):
+        csv_content = (
+            'data;descricao;valor;tipo;conta;categoria\n'
+            '05/01/2024;Salário;1.000,00;receita;Conta Corrente;\n'
+            '2024-01-06;Feira;-50,00;;Conta Corrente;Mercado\n'
+            '2024-01-07;Sem conta;10,00;despesa;Inexistente;\n'
+            'ontem;Data ruim;10,00;despesa;Conta Corrente;\n'
+        )
+        importer = TransactionImporter(self.user, chunk_size=1)
+        result = importer.run(read_csv_rows(StringIO(csv_content)))
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([line for line, _ in result.rejected], [4, 5])
+        self.assertIn('Conta "Inexistente" não encontrada.', result.rejected[0][1])
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+        feira = Transaction.objects.get(description='Feira')
+        self.assertEqual(feira.type, TransactionType.EXPENSE)
+        self.assertEqual(feira.category, self.expense_category)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('1050.00'))
+
+    def test_import_query_count_does_not_grow_per_row(self):
+        def queries_for(count, day):
+            rows = [
+                (index, {'date': day, 'amount': '1.00', 'type': 'despesa', 'account': 'Conta Corrente'})
+                for index in range(count)
+            ]
+            importer = TransactionImporter(self.user, chunk_size=500)
+            with CaptureQueriesContext(connection) as captured:
+                result = importer.run(iter(rows))
+            self.assertEqual(result.created, count)
+            return len(captured)
+
+        # Each run lands in a month of its own, so both create their rollup row.
+        self.assertEqual(queries_for(5, '2024-02-01'), queries_for(50, '2024-03-01'))
+
+    def test_ofx_import_uses_default_account(self):
+        ofx_content = (
+            '<OFX><BANKTRANLIST>'
+            '<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240110120000<TRNAMT>-25.50<MEMO>UBER *TRIP</STMTTRN>'
+            '<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240111<TRNAMT>300.00<NAME>PIX RECEBIDO</STMTTRN>'
+            '</BANKTRANLIST></OFX>'
+        )
+        importer = TransactionImporter(self.user, default_account=self.account)
+        result = importer.run(read_ofx_rows(StringIO(ofx_content)))
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.rejected, [])
+        uber = Transaction.objects.get(description='UBER *TRIP')
+        self.assertEqual(uber.transaction_date, date(2024, 1, 10))
+        self.assertEqual(uber.amount, Decimal('25.50'))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('374.50'))
+
+    def test_ofx_blocks_split_across_reads_are_parsed_once(self):
+        ofx_content = '<OFX>' + ''.join(
+            f'<STMTTRN><DTPOSTED>202401{day:02d}<TRNAMT>-{day}.00<MEMO>Compra {day}</STMTTRN>\n' for day in range(1, 21)
+        ) + '</OFX>'
+        expected = list(read_ofx_rows(StringIO(ofx_content)))
+        self.assertEqual(len(expected), 20)
+        for chunk_size in (1, 7, 64):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(read_ofx_rows(StringIO(ofx_content), chunk_size=chunk_size)), expected)
+
+    def test_amount_separators_and_limits(self):
+        cases = [
+            ('-12,50', Decimal('12.50')),
+            ('-1.234,56', Decimal('1234.56')),
+            ('-1,234.56', Decimal('1234.56')),
+            ('-1.234.567', Decimal('1234567.00')),
+            ('9999999999.99', Decimal('9999999999.99')),
+            ('NaN', None),
+            ('-Infinity', None),
+            ('1,234', None),
+            ('12.34.5', None),
+            ('1,2345.00', None),
+            ('10000000000', None),
+        ]
+        rows = [
+            (index, {'date': '2024-04-01', 'amount': amount, 'account': 'Conta Corrente'})
+            for index, (amount, _) in enumerate(cases, start=1)
+        ]
+        # Only the largest amount is income, so the account balance stays in range.
+        result = TransactionImporter(self.user).run(iter(rows))
+
+        rejected = {line for line, _ in result.rejected}
+        self.assertEqual(rejected, {index for index, (_, expected) in enumerate(cases, start=1) if expected is None})
+        self.assertEqual(
+            sorted(Transaction.objects.filter(user=self.user).values_list('amount', flat=True)),
+            sorted(expected for _, expected in cases if expected is not None),
+        )
+
+    def test_import_command_matches_account_name_case_insensitively(self):
+        ofx_content = '<OFX><STMTTRN><DTPOSTED>20240110<TRNAMT>-20.00<MEMO>Padaria</STMTTRN></OFX>'
+        with tempfile.NamedTemporaryFile('w', suffix='.ofx', delete=False) as handle:
+            handle.write(ofx_content)
+        self.addCleanup(os.remove, handle.name)
+        output = StringIO()
+        call_command('import_transactions', handle.name, user=self.user.email, account='conta corrente', stdout=output)
+        self.assertIn('Imported 1 transaction(s)', output.getvalue())
+        self.assertEqual(Transaction.objects.get(description='Padaria').account, self.account)
+
+
+class MonthlySummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='rollup@example.com', password='testpass123')
+        cls.account = Account.objects.create(user=cls.user, name='Conta Corrente', type=AccountType.CHECKING)
+        cls.other_account = Account.objects.create(user=cls.user, name='Poupança', type=AccountType.SAVINGS)
+        cls.category = Category.objects.create(user=cls.user, name='Mercado', type=CategoryType.EXPENSE)
+
+    def _create_transaction(self, **overrides):
+        defaults = {
+            'user': self.user,
+            'account': self.account,
+            'category': self.category,
+            'amount': Decimal('20.00'),
+            'transaction_date': date(2024, 1, 10),
+            'type': TransactionType.EXPENSE,
+        }
+        defaults.update(overrides)
+        return Transaction.objects.create(**defaults)
+
+    def _summaries(self):
+        return sorted(
+            (row.account_id, row.category_id or 0, row.month, row.type, row.total_amount, row.transaction_count)
+            for row in MonthlySummary.objects.filter(user=self.user, transaction_count__gt=0)
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self._summaries()
+        rebuild_monthly_summaries(users=[self.user])
+        self.assertEqual(incremental, self._summaries())
+
+    def test_writes_keep_rollups_in_sync(self):
+        first = self._create_transaction()
+        second = self._create_transaction(amount=Decimal('5.00'), transaction_date=date(2024, 1, 31))
+        self._create_transaction(type=TransactionType.INCOME, category=None, amount=Decimal('100.00'))
+        self.assertEqual(
+            MonthlySummary.objects.get(category=self.category, month=date(2024, 1, 1)).total_amount,
+            Decimal('25.00'),
+        )
+
+        first.transaction_date = date(2024, 2, 3)
+        first.account = self.other_account
+        first.save()
+        second.amount = Decimal('7.50')
+        second.save()
+        self.assertMatchesRebuild()
+
+        second.delete()
+        self.assertMatchesRebuild()
+
+    def test_category_delete_moves_rollups_to_uncategorized(self):
+        self._create_transaction()
+        self._create_transaction(category=None, amount=Decimal('1.00'))
+        self.category.delete()
+        summary = MonthlySummary.objects.get(user=self.user, category__isnull=True)
+        self.assertEqual(summary.total_amount, Decimal('21.00'))
+        self.assertEqual(summary.transaction_count, 2)
+        self.assertMatchesRebuild()
+
+    def test_split_period_separates_whole_and_edge_months(self):
+        self.assertEqual(
+            split_period(date(2024, 1, 15), date(2024, 4, 10)),
+            ((date(2024, 2, 1), date(2024, 3, 1)), [(date(2024, 1, 15), date(2024, 1, 31)), (date(2024, 4, 1), date(2024, 4, 10))]),
+        )
+        self.assertEqual(split_period(date(2024, 2, 1), date(2024, 2, 29)), ((date(2024, 2, 1), date(2024, 2, 1)), []))
+        self.assertEqual(split_period(date(2024, 2, 2), date(2024, 2, 28)), (None, [(date(2024, 2, 2), date(2024, 2, 28))]))
+        self.assertEqual(split_period(date(2024, 1, 15), None), ((date(2024, 2, 1), None), [(date(2024, 1, 15), date(2024, 1, 31))]))
+        self.assertEqual(split_period(None, None), ((None, None), []))
+
+    def test_grouped_totals_match_raw_rows(self):
+        self._create_transaction(transaction_date=date(2024, 1, 5))
+        self._create_transaction(transaction_date=date(2024, 1, 20), amount=Decimal('3.00'))
+        self._create_transaction(transaction_date=date(2024, 2, 14), type=TransactionType.INCOME, category=None)
+        self._create_transaction(transaction_date=date(2024, 3, 2), amount=Decimal('9.00'))
+        self._create_transaction(transaction_date=date(2024, 3, 28), amount=Decimal('11.00'))
+
+        totals = grouped_totals(self.user, date(2024, 1, 15), date(2024, 3, 10))[0]
+        self.assertEqual(totals['total_income'], Decimal('20.00'))
+        self.assertEqual(totals['total_expense'], Decimal('12.00'))
+        self.assertEqual(totals['transaction_count'], 3)
+
+        by_category = {
+            row['category__name']: row['total_expense']
+            for row in grouped_totals(self.user, date(2024, 1, 1), date(2024, 3, 31), fields=('category__name',))
+        }
+        self.assertEqual(by_category, {'Mercado': Decimal('43.00'), None: Decimal('0.00')})
+
+    def test_rebuild_command_backfills_rows(self):
+        self._create_transaction()
+        MonthlySummary.objects.all().delete()
+        call_command('rebuild_monthly_summaries', stdout=StringIO())
+        self.assertEqual(MonthlySummary.objects.get(user=self.user).total_amount, Decimal('20.00'))
+
+    def test_import_updates_rollups(self):
+        rows = [(1, {'date': '2024-05-02', 'amount': '-12,00', 'account': 'Conta Corrente', 'category': 'Mercado'})]
+        TransactionImporter(self.user).run(iter(rows))
+        self.assertMatchesRebuild()
+        self.assertEqual(MonthlySummary.objects.get(month=date(2024, 5, 1)).total_amount, Decimal('12.00'))
+
+
+class TransactionSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='search@example.com', password='testpass123')
+        cls.other_user = get_user_model().objects.create_user(email='other-search@example.com', password='testpass123')
+        cls.account = Account.objects.create(user=cls.user, name='Conta Corrente', type=AccountType.CHECKING)
+        cls.other_account = Account.objects.create(user=cls.other_user, name='Conta', type=AccountType.CHECKING)
+        rows = [
+            (cls.account, 'Aluguel apartamento', date(2021, 5, 10)),
+            (cls.account, 'UBER *TRIP centro', date(2023, 1, 3)),
+            (cls.account, 'Uber Eats pedido', date(2024, 6, 1)),
+            (cls.account, 'Ação judicial', date(2024, 2, 1)),
+            (cls.account, 'Uber uber volta', date(2022, 8, 8)),
+            (cls.other_account, 'Uber', date(2024, 1, 1)),
+        ]
+        cls.transactions = {}
+        for account, description, transaction_date in rows:
+            cls.transactions[description] = Transaction.objects.create(
+                user=account.user,
+                account=account,
+                amount=Decimal('10.00'),
+                description=description,
+                transaction_date=transaction_date,
+                type=TransactionType.EXPENSE,
+            )
+
+    def _search(self, text):
+        descriptions = {transaction.pk: name for name, transaction in self.transactions.items()}
+        return [descriptions.get(pk, pk) for pk in ranked_transaction_ids(self.user, text)]
+
+    def test_index_is_installed_by_migrations(self):
+        self.assertEqual(search_index_missing(), [])
+
+    def test_terms_fold_accents_and_case(self):
+        self.assertEqual(search_terms('  AÇÃO, Judicial!  '), ['acao', 'judicial'])
+        self.assertEqual(search_terms('***'), [])
+
+    def test_accent_and_case_insensitive_prefix_matching(self):
+        self.assertEqual(self._search('alug'), ['Aluguel apartamento'])
+        self.assertEqual(self._search('ACAO'), ['Ação judicial'])
+        self.assertEqual(self._search('ação judi'), ['Ação judicial'])
+        self.assertEqual(self._search('uber centro'), ['UBER *TRIP centro'])
+        self.assertEqual(self._search('mercado'), [])
+
+    def test_results_are_ranked_then_most_recent_first(self):
+        # The other user's "Uber" never shows up.
+        self.assertEqual(
+            self._search('uber'),
+            ['Uber uber volta', 'Uber Eats pedido', 'UBER *TRIP centro'],
+        )
+        # Only the most recently recorded matches are ranked.
+        self.assertEqual(
+            [self.transactions[name].pk for name in ('Uber uber volta', 'Uber Eats pedido')],
+            ranked_transaction_ids(self.user, 'uber', candidates=2),
+        )
+
+    def test_index_follows_writes(self):
+        transaction = self.transactions['Aluguel apartamento']
+        transaction.description = 'Condomínio'
+        transaction.save()
+        self.assertEqual(self._search('alug'), [])
+        self.assertEqual(len(self._search('condominio')), 1)
+
+        Transaction.objects.filter(pk=transaction.pk).update(description='Aluguel casa')
+        self.assertEqual(len(self._search('casa')), 1)
+        Transaction.objects.bulk_create(
+            [
+                Transaction(
+                    user=self.user,
+                    account=self.account,
+                    amount=Decimal('5.00'),
+                    description='Casa de câmbio',
+                    transaction_date=date(2024, 3, 1),
+                    type=TransactionType.EXPENSE,
+                )
+            ]
+        )
+        self.assertEqual(len(self._search('casa')), 2)
+        Transaction.objects.filter(description__startswith='Casa').delete()
+        self.assertEqual(len(self._search('casa')), 1)
+
+    def test_search_filter_matches_every_user(self):
+        matches = Transaction.objects.filter(search_filter('uber')).values_list('user', flat=True)
+        self.assertEqual(sorted(matches), sorted([self.user.pk] * 3 + [self.other_user.pk]))
+
+    def test_search_is_scoped_to_the_user_before_ranking_and_limiting(self):
+        # The other user's matches are newer, better ranked and more than the limits.
+        Transaction.objects.bulk_create(
+            [
+                Transaction(
+                    user=self.other_user,
+                    account=self.other_account,
+                    amount=Decimal('10.00'),
+                    description='Uber uber uber',
+                    transaction_date=date(2024, 5, 1),
+                    type=TransactionType.EXPENSE,
+                )
+                for _ in range(10)
+            ]
+        )
+        expected = [self.transactions[name].pk for name in ('Uber uber volta', 'Uber Eats pedido', 'UBER *TRIP centro')]
+        self.assertEqual(ranked_transaction_ids(self.user, 'uber', limit=3, candidates=5), expected)
+        self.assertEqual(ranked_transaction_ids(self.user, 'uber', limit=2, candidates=2), expected[:2])
+        scoped = Transaction.objects.filter(search_filter('uber', user=self.user))
+        self.assertEqual(sorted(scoped.values_list('pk', flat=True)), sorted(expected))
+        self.assertEqual(TransactionFilter(text='uber').totals(self.user)['transaction_count'], 3)
+
+    def test_search_view_paginates_ranked_results(self):
+        self.client.force_login(self.user)
+        url = reverse('transactions:search')
+        with patch.object(TransactionSearchView, 'paginate_by', 2):
+            response = self.client.get(url, {'q': 'Úber'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['result_count'], 3)
+            self.assertEqual(
+                [transaction.description for transaction in response.context['transactions']],
+                ['Uber uber volta', 'Uber Eats pedido'],
+            )
+            # Session + user and the page's rows: the ranked ids come from the cache.
+            with self.assertNumQueries(3):
+                response = self.client.get(url, {'q': 'uber', 'page': 2})
+        self.assertEqual(
+            [transaction.description for transaction in response.context['transactions']], ['UBER *TRIP centro']
+        )
+
+    def test_search_view_without_query_runs_no_search(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('transactions:search'), {'q': ' ?! '})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result_count'], 0)
+        self.assertContains(response, 'Buscar transações')
+
+
+class RecurringTransactionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='recurring@example.com', password='testpass123')
+        cls.account = Account.objects.create(
+            user=cls.user, name='Conta Corrente', initial_balance=Decimal('100.00'), type=AccountType.CHECKING
+        )
+        cls.card = Account.objects.create(user=cls.user, name='Cartão', type=AccountType.CREDIT)
+        cls.salary = Category.objects.create(user=cls.user, name='Salário', type=CategoryType.INCOME)
+        cls.rent = Category.objects.create(user=cls.user, name='Moradia', type=CategoryType.EXPENSE)
+
+    def _schedule(self, **overrides):
+        defaults = {
+            'user': self.user,
+            'account': self.account,
+            'category': self.rent,
+            'amount': Decimal('1200.00'),
+            'description': 'Aluguel',
+            'type': TransactionType.EXPENSE,
+            'frequency': RecurrenceFrequency.MONTHLY,
+            'start_date': date(2024, 1, 31),
+        }
+        defaults.update(overrides)
+        return RecurringTransaction.objects.create(**defaults)
+
+    def _occurrences(self, schedule, count):
+        return [schedule.occurrence(index) for index in range(count)]
+
+    def test_occurrences_follow_the_rule(self):
+        monthly = self._schedule()
+        self.assertEqual(
+            self._occurrences(monthly, 4), [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)]
+        )
+        self.assertEqual(monthly.first_occurrence_after(date(2024, 2, 29)), date(2024, 3, 31))
+        self.assertEqual(monthly.first_occurrence_after(date(2024, 3, 1)), date(2024, 3, 31))
+
+        every_other_week = self._schedule(frequency=RecurrenceFrequency.WEEKLY, interval=2, start_date=date(2024, 1, 1))
+        self.assertEqual(self._occurrences(every_other_week, 3), [date(2024, 1, 1), date(2024, 1, 15), date(2024, 1, 29)])
+        self.assertEqual(every_other_week.first_occurrence_after(date(2024, 1, 15)), date(2024, 1, 29))
+
+        leap_day = self._schedule(frequency=RecurrenceFrequency.YEARLY, start_date=date(2024, 2, 29))
+        self.assertEqual(self._occurrences(leap_day, 2), [date(2024, 2, 29), date(2025, 2, 28)])
+        self.assertEqual(self._schedule(frequency=RecurrenceFrequency.DAILY, interval=3).occurrence(2), date(2024, 2, 6))
+
+    def test_schedule_ends_at_end_date_or_occurrence_limit(self):
+        until = self._schedule(end_date=date(2024, 3, 15))
+        self.assertEqual(until.next_occurrence, date(2024, 1, 31))
+        self.assertIsNone(until.first_occurrence_after(date(2024, 2, 29)))
+
+        counted = self._schedule(max_occurrences=2)
+        materialize_due_transactions(today=date(2024, 12, 31))
+        counted.refresh_from_db()
+        self.assertEqual(counted.transactions.count(), 2)
+        self.assertIsNone(counted.next_occurrence)
+
+    def test_materialize_posts_due_occurrences_and_keeps_derived_data_in_sync(self):
+        rent = self._schedule()
+        salary = self._schedule(
+            account=self.account,
+            category=self.salary,
+            amount=Decimal('5000.00'),
+            description='Salário',
+            type=TransactionType.INCOME,
+            start_date=date(2024, 2, 5),
+        )
+        streaming = self._schedule(
+            account=self.card,
+            category=None,
+            amount=Decimal('39.90'),
+            description='Streaming',
+            frequency=RecurrenceFrequency.WEEKLY,
+            start_date=date(2024, 3, 1),
+        )
+        paused = self._schedule(is_active=False)
+        # Already has a rollup and snapshots, which the run must add to.
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.rent,
+            amount=Decimal('80.00'),
+            description='Condomínio',
+            transaction_date=date(2024, 2, 10),
+            type=TransactionType.EXPENSE,
+        )
+
+        result = materialize_due_transactions(today=date(2024, 3, 31))
+
+        self.assertEqual(result.created, 3 + 2 + 5)
+        self.assertEqual((result.schedules, result.user_ids, result.account_ids), (3, {self.user.pk}, {self.account.pk, self.card.pk}))
+        self.assertEqual(
+            list(rent.transactions.order_by('transaction_date').values_list('transaction_date', flat=True)),
+            [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31)],
+        )
+        for schedule, next_occurrence, count in (
+            (rent, date(2024, 4, 30), 3),
+            (salary, date(2024, 4, 5), 2),
+            (streaming, date(2024, 4, 5), 5),
+            (paused, date(2024, 1, 31), 0),
+        ):
+            schedule.refresh_from_db()
+            self.assertEqual((schedule.next_occurrence, schedule.occurrence_count), (next_occurrence, count))
+
+        self.assertEqual(find_drifted_accounts(), [])
+        self.account.refresh_from_db()
+        self.assertEqual(
+            self.account.current_balance,
+            Decimal('100.00') - Decimal('80.00') - 3 * Decimal('1200.00') + 2 * Decimal('5000.00'),
+        )
+        summaries = sorted(MonthlySummary.objects.values_list('account_id', 'category_id', 'month', 'type', 'total_amount'))
+        snapshots = sorted(AccountBalanceSnapshot.objects.values_list('account_id', 'date', 'balance'))
+        rebuild_monthly_summaries()
+        rebuild_balance_snapshots()
+        self.assertEqual(
+            summaries, sorted(MonthlySummary.objects.values_list('account_id', 'category_id', 'month', 'type', 'total_amount'))
+        )
+        self.assertEqual(snapshots, sorted(AccountBalanceSnapshot.objects.values_list('account_id', 'date', 'balance')))
+
+    def test_reruns_never_post_an_occurrence_twice(self):
+        schedule = self._schedule()
+        self.assertEqual(materialize_due_transactions(today=date(2024, 2, 29)).created, 2)
+        self.assertEqual(materialize_due_transactions(today=date(2024, 2, 29)).created, 0)
+        self.assertEqual(materialize_due_transactions(today=date(2024, 3, 31)).created, 1)
+        self.assertEqual(schedule.transactions.count(), 3)
+        with self.assertRaises(IntegrityError), db_transaction.atomic():
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                amount=Decimal('1.00'),
+                transaction_date=date(2024, 3, 31),
+                type=TransactionType.EXPENSE,
+                recurring=schedule,
+            )
+
+    def test_moved_occurrence_does_not_block_the_run(self):
+        schedule = self._schedule(start_date=date(2024, 1, 5))
+        other_user = get_user_model().objects.create_user(email='other-recurring@example.com', password='testpass123')
+        other_account = Account.objects.create(user=other_user, name='Conta', type=AccountType.CHECKING)
+        other = self._schedule(user=other_user, account=other_account, category=None, start_date=date(2024, 1, 5))
+        materialize_due_transactions(today=date(2024, 1, 31))
+        # The user moves January's occurrence onto February's date.
+        posted = schedule.transactions.get()
+        posted.transaction_date = date(2024, 2, 5)
+        posted.save()
+
+        result = materialize_due_transactions(today=date(2024, 3, 31))
+
+        self.assertEqual(result.created, 1 + 2)
+        self.assertEqual(
+            list(schedule.transactions.order_by('transaction_date').values_list('transaction_date', flat=True)),
+            [date(2024, 2, 5), date(2024, 3, 5)],
+        )
+        self.assertEqual(other.transactions.count(), 3)
+        schedule.refresh_from_db()
+        self.assertEqual((schedule.next_occurrence, schedule.occurrence_count), (date(2024, 4, 5), 2))
+        self.assertEqual(find_drifted_accounts(), [])
+        # Moving the transaction out of January leaves an empty rollup row behind.
+        summaries = MonthlySummary.objects.filter(transaction_count__gt=0)
+        fields = ('account_id', 'category_id', 'month', 'type', 'total_amount')
+        before = sorted(summaries.values_list(*fields))
+        rebuild_monthly_summaries()
+        self.assertEqual(before, sorted(summaries.values_list(*fields)))
+
+    def test_queries_per_batch_do_not_grow_with_schedules(self):
+        def queries_for(schedules):
+            # A fresh user each time, so both runs create their rollups and snapshots.
+            user = get_user_model().objects.create_user(email=f'batch{schedules}@example.com', password='testpass123')
+            account = Account.objects.create(user=user, name='Conta', type=AccountType.CHECKING)
+            for index in range(schedules):
+                self._schedule(
+                    user=user, account=account, category=None, description=f'Assinatura {index}', start_date=date(2024, 1, 10)
+                )
+            with CaptureQueriesContext(connection) as captured:
+                materialize_due_transactions(today=date(2024, 1, 31), users=[user])
+            return len(captured)
+
+        self.assertEqual(queries_for(2), queries_for(20))
+
+    def test_time_budget_and_batches(self):
+        for index in range(3):
+            self._schedule(description=f'Assinatura {index}', start_date=date(2024, 1, 10))
+        result = materialize_due_transactions(today=date(2024, 1, 31), time_budget=0)
+        self.assertEqual((result.created, result.remaining), (0, 3))
+        result = materialize_due_transactions(today=date(2024, 1, 31), batch_size=2)
+        self.assertEqual((result.created, result.batches, result.remaining), (3, 2, 0))
+
+    def test_command_reports_throughput(self):
+        self._schedule()
+        output = StringIO()
+        call_command('materialize_recurring_transactions', date='2024-02-29', stdout=output)
+        self.assertIn('Posted 2 transaction(s) from 1 schedule(s) of 1 user(s)', output.getvalue())
+        self.assertIn('rows/s', output.getvalue())
+
+    def test_views_create_and_resume_without_catching_up(self):
+        self.client.force_login(self.user)
+        data = {
+            'description': 'Academia',
+            'type': TransactionType.EXPENSE,
+            'account': self.card.pk,
+            'category': self.rent.pk,
+            'amount': '99.90',
+            'frequency': RecurrenceFrequency.MONTHLY,
+            'interval': '1',
+            'start_date': '2024-01-10',
+            'is_active': 'on',
+        }
+        response = self.client.post(reverse('transactions:recurring_create'), data)
+        self.assertRedirects(response, reverse('transactions:recurring_list'))
+        schedule = RecurringTransaction.objects.get(user=self.user)
+        self.assertEqual(schedule.next_occurrence, date(2024, 1, 10))
+
+        data.pop('is_active')
+        self.client.post(reverse('transactions:recurring_update', args=[schedule.pk]), data)
+        data['is_active'] = 'on'
+        self.client.post(reverse('transactions:recurring_update', args=[schedule.pk]), data)
+        schedule.refresh_from_db()
+        self.assertGreaterEqual(schedule.next_occurrence, date.today())
+
+        response = self.client.get(reverse('transactions:recurring_list'))
+        self.assertContains(response, 'Academia')
+        other = get_user_model().objects.create_user(email='intruder@example.com', password='testpass123')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse('transactions:recurring_update', args=[schedule.pk])).status_code, 404)
@@ -1,9 +1,14 @@
 from django.urls import path
 
 from .views import (
+    RecurringTransactionCreateView,
+    RecurringTransactionDeleteView,
+    RecurringTransactionListView,
+    RecurringTransactionUpdateView,
     TransactionCreateView,
     TransactionDeleteView,
     TransactionListView,
+    TransactionSearchView,
     TransactionUpdateView,
 )
 
@@ -11,7 +16,12 @@ app_name = 'transactions'
 
 urlpatterns = [
     path('', TransactionListView.as_view(), name='list'),
+    path('busca/', TransactionSearchView.as_view(), name='search'),
     path('nova/', TransactionCreateView.as_view(), name='create'),
     path('<int:pk>/editar/', TransactionUpdateView.as_view(), name='update'),
     path('<int:pk>/remover/', TransactionDeleteView.as_view(), name='delete'),
+    path('recorrentes/', RecurringTransactionListView.as_view(), name='recurring_list'),
+    path('recorrentes/nova/', RecurringTransactionCreateView.as_view(), name='recurring_create'),
+    path('recorrentes/<int:pk>/editar/', RecurringTransactionUpdateView.as_view(), name='recurring_update'),
+    path('recorrentes/<int:pk>/remover/', RecurringTransactionDeleteView.as_view(), name='recurring_delete'),
 ]
@@ -1,81 +1,78 @@
 from datetime import date
-from decimal import Decimal
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q, Sum
-from django.db.models.functions import Coalesce
+from django.core.paginator import Paginator
+from django.db.models import F
 from django.urls import reverse_lazy
-from django.views.generic import CreateView, DeleteView, ListView, UpdateView
-
-from .forms import TransactionForm
-from .models import Transaction, TransactionType
-
-MONTH_NAMES = {
-    1: 'Janeiro',
-    2: 'Fevereiro',
-    3: 'Março',
-    4: 'Abril',
-    5: 'Maio',
-    6: 'Junho',
-    7: 'Julho',
-    8: 'Agosto',
-    9: 'Setembro',
-    10: 'Outubro',
-    11: 'Novembro',
-    12: 'Dezembro',
-}
-
-
-class TransactionListView(LoginRequiredMixin, ListView):
+from django.utils import timezone
+from django.views.generic import CreateView, DeleteView, ListView, TemplateView, UpdateView
+
+from core.cache import get_or_build
+from core.conditional import ConditionalGetMixin
+
+from .dates import month_bounds
+from .filters import TransactionFilter, TransactionFilterForm
+from .forms import RecurringTransactionForm, TransactionForm
+from .models import RecurringTransaction, Transaction
+from .pagination import paginate_by_keyset
+from .search import SEARCH_RESULT_LIMIT, fetch_in_order, ranked_transaction_ids, search_terms
+
+
+class TransactionListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Transaction
     template_name = 'transactions/transaction_list.html'
     context_object_name = 'transactions'
     paginate_by = 15
+    cursor_param = 'cursor'
+
+    def get_filter_form(self):
+        if not hasattr(self, '_filter_form'):
+            self._filter_form = TransactionFilterForm(self.request.GET, user=self.request.user)
+        return self._filter_form
+
+    def get_transaction_filter(self):
+        if not hasattr(self, '_transaction_filter'):
+            self._transaction_filter = self.get_filter_form().to_filter()
+        return self._transaction_filter
 
     def get_queryset(self):
-        queryset = (
-            Transaction.objects.filter(user=self.request.user)
+        queryset = Transaction.objects.filter(user=self.request.user)
+        return (
+            self.get_transaction_filter()
+            .apply(queryset, self.request.user)
             .select_related('account', 'category')
-            .order_by('-transaction_date', '-created_at')
+            .order_by('-transaction_date', '-created_at', '-pk')
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        page = paginate_by_keyset(queryset, page_size, self.request.GET.get(self.cursor_param))
+        return None, page, page.object_list, page.has_other_pages()
+
+    def get_totals(self, transaction_filter):
+        """Income, expense and row count of ``transaction_filter``, cached per data version."""
+        user = self.request.user
+        return get_or_build(
+            'transaction_totals', user.pk, lambda: transaction_filter.totals(user), transaction_filter.cache_key()
         )
-        month = self.request.GET.get('month')
-        year = self.request.GET.get('year')
-        if month and year:
-            try:
-                month = int(month)
-                year = int(year)
-                queryset = queryset.filter(transaction_date__year=year, transaction_date__month=month)
-            except ValueError:
-                pass
-        return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        today = date.today()
-        selected_month = self.request.GET.get('month')
-        selected_year = self.request.GET.get('year')
-        month = int(selected_month) if selected_month and selected_month.isdigit() else today.month
-        year = int(selected_year) if selected_year and selected_year.isdigit() else today.year
-
-        monthly_queryset = (
-            Transaction.objects.filter(user=self.request.user, transaction_date__year=year, transaction_date__month=month)
-            .select_related('account', 'category')
-        )
-        totals = monthly_queryset.aggregate(
-            total_income=Coalesce(Sum('amount', filter=Q(type=TransactionType.INCOME)), Decimal('0.00')),
-            total_expense=Coalesce(Sum('amount', filter=Q(type=TransactionType.EXPENSE)), Decimal('0.00')),
-        )
+        transaction_filter = self.get_transaction_filter()
+        totals = self.get_totals(transaction_filter)
+        card_totals = totals
+        if transaction_filter.is_empty:
+            # Unfiltered, the list shows everything but the cards keep showing the current month.
+            today = timezone.localdate()
+            start_date, end_date = month_bounds(today.year, today.month)
+            card_totals = self.get_totals(TransactionFilter(start_date=start_date, end_date=end_date))
         context.update(
             {
-                'month': month,
-                'year': year,
-                'selected_month': month,
-                'selected_year': year,
-                'month_options': [(m, MONTH_NAMES[m]) for m in range(1, 13)],
-                'year_options': list(range(today.year - 2, today.year + 1)),
-                'total_income': totals['total_income'],
-                'total_expense': totals['total_expense'],
+                'filter_form': self.get_filter_form(),
+                'is_filtered': not transaction_filter.is_empty,
+                'total_income': card_totals['total_income'],
+                'total_expense': card_totals['total_expense'],
+                'transaction_count': totals['transaction_count'],
                 'query_string': self._build_query_string(),
             }
         )
@@ -83,11 +80,50 @@ class TransactionListView(LoginRequiredMixin, ListView):
 
     def _build_query_string(self):
         params = self.request.GET.copy()
-        if 'page' in params:
-            del params['page']
+        if self.cursor_param in params:
+            del params[self.cursor_param]
         return params.urlencode()
 
 
+class TransactionSearchView(LoginRequiredMixin, ConditionalGetMixin, TemplateView):
+    """Ranked full-text search over the user's transaction descriptions.
+
+    The ranked ids of a query are cached per data version, so moving between
+    pages only loads the rows of the page.
+    """
+
+    template_name = 'transactions/transaction_search.html'
+    paginate_by = 15
+
+    def get_ranked_ids(self, query):
+        user = self.request.user
+        terms = search_terms(query)
+        if not terms:
+            return []
+        return get_or_build(
+            'transaction_search', user.pk, lambda: ranked_transaction_ids(user, query), '-'.join(terms)
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        ids = self.get_ranked_ids(query)
+        page = Paginator(ids, self.paginate_by).get_page(self.request.GET.get('page'))
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        context.update(
+            {
+                'query': query,
+                'transactions': fetch_in_order(page.object_list),
+                'page_obj': page,
+                'result_count': len(ids),
+                'result_limit_reached': len(ids) >= SEARCH_RESULT_LIMIT,
+                'query_string': params.urlencode(),
+            }
+        )
+        return context
+
+
 class TransactionCreateView(LoginRequiredMixin, CreateView):
     model = Transaction
     form_class = TransactionForm
@@ -142,3 +178,73 @@ class TransactionDeleteView(LoginRequiredMixin, DeleteView):
     def delete(self, request, *args, **kwargs):
         messages.success(request, 'Transação removida com sucesso!')
         return super().delete(request, *args, **kwargs)
+
+
+class RecurringTransactionListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
+    model = RecurringTransaction
+    template_name = 'transactions/recurring_list.html'
+    context_object_name = 'schedules'
+    paginate_by = 15
+
+    def get_queryset(self):
+        return (
+            RecurringTransaction.objects.filter(user=self.request.user)
+            .select_related('account', 'category')
+            .order_by('-is_active', F('next_occurrence').asc(nulls_last=True), 'description', 'pk')
+        )
+
+
+class RecurringTransactionCreateView(LoginRequiredMixin, CreateView):
+    model = RecurringTransaction
+    form_class = RecurringTransactionForm
+    template_name = 'transactions/recurring_form.html'
+    success_url = reverse_lazy('transactions:recurring_list')
+
+    def get_initial(self):
+        initial = super().get_initial()
+        initial.setdefault('start_date', timezone.localdate())
+        return initial
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
+    def form_valid(self, form):
+        form.instance.user = self.request.user
+        response = super().form_valid(form)
+        messages.success(self.request, 'Transação recorrente criada com sucesso!')
+        return response
+
+
+class RecurringTransactionUpdateView(LoginRequiredMixin, UpdateView):
+    model = RecurringTransaction
+    form_class = RecurringTransactionForm
+    template_name = 'transactions/recurring_form.html'
+    success_url = reverse_lazy('transactions:recurring_list')
+
+    def get_queryset(self):
+        return RecurringTransaction.objects.filter(user=self.request.user)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        messages.success(self.request, 'Transação recorrente atualizada com sucesso!')
+        return response
+
+
+class RecurringTransactionDeleteView(LoginRequiredMixin, DeleteView):
+    model = RecurringTransaction
+    template_name = 'transactions/recurring_confirm_delete.html'
+    success_url = reverse_lazy('transactions:recurring_list')
+
+    def get_queryset(self):
+        return RecurringTransaction.objects.filter(user=self.request.user)
+
+    def form_valid(self, form):
+        messages.success(self.request, 'Transação recorrente removida com sucesso!')
+        return super().form_valid(form)